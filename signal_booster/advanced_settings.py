@@ -492,7 +492,10 @@ class AdvancedSettings:
         if "qos" in config and config["qos"].get("enabled", False):
             try:
                 from signal_booster.network.optimizers import prioritize_traffic
-                if prioritize_traffic():
+                applied = prioritize_traffic()
+                if applied is None:
+                    logger.info("QoS settings skipped, the network is not congested")
+                elif applied:
                     results["applied_optimizations"].append("QoS settings")
                 else:
                     results["failed_optimizations"].append("QoS settings")
@@ -562,7 +565,10 @@ class AdvancedSettings:
         if "qos" in config and config["qos"].get("enabled", False):
             try:
                 from signal_booster.network.optimizers import prioritize_traffic
-                if prioritize_traffic():
+                applied = prioritize_traffic()
+                if applied is None:
+                    logger.info("QoS settings skipped, the network is not congested")
+                elif applied:
                     results["applied_optimizations"].append("QoS settings")
                 else:
                     results["failed_optimizations"].append("QoS settings")
@@ -632,7 +638,10 @@ class AdvancedSettings:
         if "qos" in config and config["qos"].get("enabled", False):
             try:
                 from signal_booster.network.optimizers import prioritize_traffic
-                if prioritize_traffic():
+                applied = prioritize_traffic()
+                if applied is None:
+                    logger.info("QoS settings skipped, the network is not congested")
+                elif applied:
                     results["applied_optimizations"].append("QoS settings")
                 else:
                     results["failed_optimizations"].append("QoS settings")
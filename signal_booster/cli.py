@@ -133,7 +133,7 @@ def monitor_dashboard(booster: SignalBooster):
                 # Add latency information
                 try:
                     latency = net_utils.measure_latency()
-                    table.add_row("Ping (min/avg/max)", f"{latency['min']:.1f}/{latency['avg']:.1f}/{latency['max']:.1f} ms")
+                    table.add_row("Ping (min/avg/max)", f"{latency.min:.1f}/{latency.avg:.1f}/{latency.max:.1f} ms")
                 except:
                     pass
                 
@@ -251,10 +251,10 @@ def test():
     table.add_column("Metric", style="cyan")
     table.add_column("Value", style="green")
     
-    table.add_row("Download Speed", f"{speed['download']:.2f} Mbps")
-    table.add_row("Upload Speed", f"{speed['upload']:.2f} Mbps")
-    table.add_row("Ping", f"{speed['ping']:.2f} ms")
-    table.add_row("Latency (min/avg/max)", f"{latency['min']:.1f}/{latency['avg']:.1f}/{latency['max']:.1f} ms")
+    table.add_row("Download Speed", f"{speed.download:.2f} Mbps")
+    table.add_row("Upload Speed", f"{speed.upload:.2f} Mbps")
+    table.add_row("Ping", f"{speed.ping:.2f} ms")
+    table.add_row("Latency (min/avg/max)", f"{latency.min:.1f}/{latency.avg:.1f}/{latency.max:.1f} ms")
     
     console.print(table)
     console.print()
@@ -322,16 +322,16 @@ def info():
     latency_table.add_column("Metric", style="cyan")
     latency_table.add_column("Value", style="green")
     
-    latency_table.add_row("Minimum Latency", f"{latency['min']:.1f} ms")
-    latency_table.add_row("Average Latency", f"{latency['avg']:.1f} ms")
-    latency_table.add_row("Maximum Latency", f"{latency['max']:.1f} ms")
+    latency_table.add_row("Minimum Latency", f"{latency.min:.1f} ms")
+    latency_table.add_row("Average Latency", f"{latency.avg:.1f} ms")
+    latency_table.add_row("Maximum Latency", f"{latency.max:.1f} ms")
     
     # Latency quality assessment
-    if latency['avg'] < 20:
+    if latency.avg < 20:
         latency_quality = "Excellent"
-    elif latency['avg'] < 50:
+    elif latency.avg < 50:
         latency_quality = "Good"
-    elif latency['avg'] < 100:
+    elif latency.avg < 100:
         latency_quality = "Fair"
     else:
         latency_quality = "Poor"
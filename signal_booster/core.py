@@ -658,7 +658,7 @@ class SignalBooster:
             latency_results = net_utils.measure_latency()
             if latency_results:
                 # Calculate jitter (variation in latency)
-                jitter = latency_results["max"] - latency_results["min"]
+                jitter = latency_results.max - latency_results.min
                 
                 # Normalize jitter to a 0-100 scale (higher means more congestion)
                 # 0ms jitter = 0% congestion, 100ms jitter = 100% congestion
@@ -667,7 +667,7 @@ class SignalBooster:
                 
                 # Use average latency as another factor
                 # < 10ms = 0% congestion, >200ms = 100% congestion
-                latency_factor = min(100, max(0, (latency_results["avg"] - 10) / 190 * 100))
+                latency_factor = min(100, max(0, (latency_results.avg - 10) / 190 * 100))
                 congestion_factors.append(latency_factor)
             
             # Factor 2: Check network interface statistics for packet loss and errors
@@ -1736,8 +1736,8 @@ pass out proto udp from any to any port 16384:32767 queue realtime  # WebRTC
             bandwidth_info = net_utils.measure_speed()
             
             # Return the upload speed
-            if bandwidth_info and bandwidth_info["upload"] > 0:
-                return bandwidth_info["upload"]
+            if bandwidth_info and bandwidth_info.upload > 0:
+                return bandwidth_info.upload
                 
             # If we couldn't get an accurate measurement, estimate based on download speed
             current_download = 0
@@ -1764,8 +1764,8 @@ pass out proto udp from any to any port 16384:32767 queue realtime  # WebRTC
             latency_results = net_utils.measure_latency(host="8.8.8.8", count=3)
             
             # If we got valid results, return the average latency
-            if latency_results and latency_results["avg"] > 0:
-                return latency_results["avg"]
+            if latency_results and latency_results.avg > 0:
+                return latency_results.avg
                 
             # If we don't have a valid measurement, return a reasonable default
             return 50.0  # Default to 50ms
@@ -2043,13 +2043,13 @@ pass out proto udp from any to any port 16384:32767 queue realtime  # WebRTC
                 try:
                     bandwidth_info = net_utils.measure_speed()
                     if bandwidth_info:
-                        if bandwidth_info.get("download", 0) > 0:
-                            current_speed = bandwidth_info["download"]
+                        if bandwidth_info.download > 0:
+                            current_speed = bandwidth_info.download
                             # Store this for future reference
                             self.current_speed = current_speed
                         
-                        if bandwidth_info.get("upload", 0) > 0:
-                            upload_speed = bandwidth_info["upload"]
+                        if bandwidth_info.upload > 0:
+                            upload_speed = bandwidth_info.upload
                 except Exception as e:
                     logger.error(f"Error in speed measurement: {e}")
                     
@@ -2057,8 +2057,8 @@ pass out proto udp from any to any port 16384:32767 queue realtime  # WebRTC
                 try:
                     # Use network_utils directly to avoid potential circular imports
                     latency_results = net_utils.measure_latency(host="8.8.8.8", count=3)
-                    if latency_results and latency_results.get("avg", 0) > 0:
-                        current_latency = latency_results["avg"]
+                    if latency_results and latency_results.avg > 0:
+                        current_latency = latency_results.avg
                 except Exception as e:
                     logger.error(f"Error getting latency for metrics: {e}")
             
@@ -14,6 +14,8 @@ from signal_booster.network.utils import (
     find_best_wifi_channel
 )
 
+from signal_booster.network.common import invalidate_network_cache
+
 from signal_booster.network.optimizers import (
     optimize_tcp_settings,
     optimize_wifi_settings,
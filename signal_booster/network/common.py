@@ -9,7 +9,12 @@ import platform
 import socket
 import shutil
 import re
+import time
 import logging
+import copy
+import functools
+import threading
+import atexit
 from typing import List, Dict, Tuple, Optional, Any, Union
 
 import psutil
@@ -34,6 +39,33 @@ except ImportError:
     logger.warning("netifaces not available, network interface detection will be limited")
     HAS_NETIFACES = False
 
+# pyroute2 is only useful on Linux; fall back to the tc/ip tools without it
+HAS_PYROUTE2 = False
+if platform.system() == "Linux":
+    try:
+        import pyroute2
+        HAS_PYROUTE2 = True
+    except ImportError:
+        logger.debug("pyroute2 not available, traffic control will use the tc command")
+
+# bcc compiles the eBPF traffic classifier; u32 filters are used without it
+HAS_BCC = False
+if platform.system() == "Linux":
+    try:
+        import bcc
+        HAS_BCC = True
+    except ImportError:
+        logger.debug("bcc not available, traffic classification will use u32 filters")
+
+# PyObjC's CoreWLAN bindings give macOS WiFi scan results without airport
+HAS_COREWLAN = False
+if platform.system() == "Darwin":
+    try:
+        import CoreWLAN
+        HAS_COREWLAN = True
+    except ImportError:
+        logger.debug("CoreWLAN (pyobjc) not available, WiFi scans will use the airport command")
+
 # Windows-specific imports
 if platform.system() == "Windows":
     try:
@@ -41,15 +73,93 @@ if platform.system() == "Windows":
     except ImportError:
         import _winreg as winreg
 
-def run_command(command, check=False, capture_output=True, universal_lines=True):
+# Every ttl_cache wrapper, so a reconfiguration can drop them all at once
+_ttl_caches = []
+
+# Cached values of these types are handed out as they are; anything else
+# (lists, dicts) is copied so one caller cannot change what the next one sees
+_IMMUTABLE_TYPES = (int, float, complex, str, bytes, bool, type(None), tuple, frozenset)
+
+def _cached_copy(value):
+    """Return a cached value in a form the caller may modify freely."""
+    return value if isinstance(value, _IMMUTABLE_TYPES) else copy.deepcopy(value)
+
+def ttl_cache(ttl: float = 5.0, cache_if=None, shared: bool = False):
+    """
+    Cache the result of a function for a short time, per set of arguments.
+    
+    Discovery helpers such as interface listing spawn subprocesses; a full
+    optimization run calls them several times within a few seconds.
+    Expired entries are dropped whenever a new one is stored, callers get
+    their own copy of mutable results (unless shared), and concurrent
+    callers with a cold cache run the function only once.
+    
+    Args:
+        ttl: Seconds a cached result stays valid
+        cache_if: Optional predicate on the result; results it rejects (such
+            as failed measurements) are returned but not cached
+        shared: Hand every caller the cached object itself instead of a
+            copy; for live objects such as clients, which must not be copied
+        
+    Returns:
+        Decorator wrapping the function with a TTL cache
+    """
+    def decorator(func):
+        # Maps the call arguments to (timestamp, value)
+        cache = {}
+        lock = threading.Lock()
+        result = (lambda value: value) if shared else _cached_copy
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            entry = cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                return result(entry[1])
+            
+            with lock:
+                # Another thread may have refreshed the entry while we waited
+                entry = cache.get(key)
+                if entry is not None and time.monotonic() - entry[0] < ttl:
+                    return result(entry[1])
+                value = func(*args, **kwargs)
+                if cache_if is not None and not cache_if(value):
+                    return value
+                now = time.monotonic()
+                for stale in [k for k, (timestamp, _) in cache.items() if now - timestamp >= ttl]:
+                    del cache[stale]
+                cache[key] = (now, value)
+            return result(value)
+        
+        wrapper.cache_clear = cache.clear
+        _ttl_caches.append(wrapper)
+        return wrapper
+    return decorator
+
+def invalidate_network_cache():
+    """
+    Drop every cached network result (interfaces, gateway, speed, MTU...).
+    
+    Call this after changing the network configuration so the next query
+    sees the new state instead of waiting for the cache to expire.
+    """
+    for wrapper in _ttl_caches:
+        wrapper.cache_clear()
+
+def run_command(command, check=False, capture_output=True, universal_lines=True, close_fds=True):
     """
     Run a system command and handle errors.
     
     Args:
         command: Command to run (list)
         check: Raise exception on failure
-        capture_output: Capture stdout/stderr
+        capture_output: Capture stdout/stderr; pass False for fire-and-forget
+            commands where only the return code matters, which discards the
+            output without piping and decoding it
         universal_lines: Return strings instead of bytes
+        close_fds: Close inherited descriptors in the child; trusted internal
+            tools can pass False to skip that work (our own descriptors are
+            opened close-on-exec anyway)
         
     Returns:
         Tuple of (stdout, stderr, returncode)
@@ -61,15 +171,78 @@ def run_command(command, check=False, capture_output=True, universal_lines=True)
                 check=check,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                universal_newlines=universal_lines
+                universal_newlines=universal_lines,
+                close_fds=close_fds
             )
             return result.stdout, result.stderr, result.returncode
         else:
             result = subprocess.run(
                 command,
-                check=check
+                check=check,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                close_fds=close_fds
             )
             return None, None, result.returncode
     except Exception as e:
         logger.error(f"Error running command {command}: {e}")
-        return None, str(e), 1 
\ No newline at end of file
+        return None, str(e), 1
+
+# Persistent PowerShell host shared by run_powershell; starting powershell.exe
+# costs several hundred milliseconds per call
+_POWERSHELL_SENTINEL = "__SIGNAL_BOOSTER_DONE__"
+_powershell = {'process': None, 'lock': threading.Lock()}
+
+def _close_powershell():
+    """Shut down the shared PowerShell session at interpreter exit."""
+    process = _powershell['process']
+    if process is not None and process.poll() is None:
+        try:
+            process.stdin.write("exit\n")
+            process.stdin.flush()
+            process.wait(timeout=5)
+        except Exception:
+            process.kill()
+
+atexit.register(_close_powershell)
+
+def run_powershell(script):
+    """
+    Run a single-line PowerShell script in a long-lived PowerShell session.
+    
+    Args:
+        script: PowerShell code to run (one line)
+        
+    Returns:
+        Tuple of (output, None, returncode); stderr is merged into output
+    """
+    with _powershell['lock']:
+        try:
+            process = _powershell['process']
+            if process is None or process.poll() is not None:
+                process = subprocess.Popen(
+                    ["powershell", "-NoProfile", "-NoLogo", "-NoExit", "-Command", "-"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    universal_newlines=True,
+                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+                )
+                _powershell['process'] = process
+            
+            # Report success of the script after its output, then wait for it
+            process.stdin.write(f"{script}; Write-Output \"{_POWERSHELL_SENTINEL} $([int](-not $?))\"\n")
+            process.stdin.flush()
+            
+            output = []
+            for line in process.stdout:
+                if line.startswith(_POWERSHELL_SENTINEL):
+                    return "".join(output), None, int(line.split()[1])
+                output.append(line)
+            # The session died; start a new one next time
+            _powershell['process'] = None
+            return "".join(output), "PowerShell session exited", 1
+        except Exception as e:
+            logger.error(f"Error running PowerShell script: {e}")
+            _powershell['process'] = None
+            return None, str(e), 1
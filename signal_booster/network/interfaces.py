@@ -3,21 +3,82 @@ Network interface utilities for Signal Booster.
 This module provides functions for working with network interfaces.
 """
 
+import json
+import struct
+import time
+from collections import namedtuple
+
 from signal_booster.network.common import *
 
-def _is_wireless_interface(interface: str) -> bool:
-    """Check if the interface is wireless."""
-    # This is a simplified check - actual implementation would be more complex
-    # and OS-specific
-    if platform.system() == "Windows":
-        return "wi-fi" in interface.lower() or "wireless" in interface.lower()
-    elif platform.system() == "Linux":
-        return interface.startswith("wl")
-    elif platform.system() == "Darwin":  # macOS
-        return interface.startswith("en") and not interface.startswith("eth")
+# Netlink constants used for the Linux interface dump (see linux/rtnetlink.h)
+_NETLINK_ROUTE = 0
+_NLM_F_REQUEST = 0x1
+_NLM_F_DUMP = 0x300
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_RTM_NEWLINK = 16
+_RTM_GETLINK = 18
+_RTM_NEWADDR = 20
+_RTM_GETADDR = 22
+_IFLA_ADDRESS = 1
+_IFLA_IFNAME = 3
+_IFA_ADDRESS = 1
+_IFA_LOCAL = 2
+
+_NLMSGHDR = struct.Struct('=IHHII')   # len, type, flags, seq, pid
+_IFINFOMSG = struct.Struct('=BxHiII')  # family, type, index, flags, change
+_IFADDRMSG = struct.Struct('=BBBBI')   # family, prefixlen, flags, scope, index
+_RTATTR = struct.Struct('=HH')         # len, type
+
+# Probe for the command-line tools once instead of paying a failed fork per call
+_HAS_IP = shutil.which("ip") is not None
+_HAS_IFCONFIG = shutil.which("ifconfig") is not None
+_HAS_SYSTEM_PROFILER = shutil.which("system_profiler") is not None
+_HAS_ROUTE = shutil.which("route") is not None
+
+# ifconfig output: an unindented "<name>: flags=..." header followed by indented lines
+_RE_IFCONFIG_BLOCK = re.compile(r'^(\S[^:\s]*):[^\n]*\n((?:[ \t]+[^\n]*\n?)*)', re.M)
+_RE_IFCONFIG_INET = re.compile(r'\binet\s+(\S+)(?:[^\n]*?\bnetmask\s+(\S+))?')
+_RE_IFCONFIG_ETHER = re.compile(r'\bether\s+(\S+)')
+
+# macOS link speeds, memoized from a single system_profiler call
+_MACOS_SNAPSHOT_TTL = 30.0
+_macos_snapshot = {'timestamp': float('-inf'), 'speeds': {}}
+_RE_MEDIA_SUBTYPE = re.compile(r'(\d+)(G?)base', re.IGNORECASE)
+
+_OS = platform.system()
+
+
+def _is_wireless_windows(interface: str) -> bool:
+    """Check if a Windows adapter name looks wireless."""
+    lower = interface.lower()
+    return "wi-fi" in lower or "wireless" in lower
+
+
+def _is_wireless_linux(interface: str) -> bool:
+    """Check if a Linux interface name looks wireless."""
+    return interface.startswith("wl")
+
+
+def _is_wireless_macos(interface: str) -> bool:
+    """Check if a macOS interface name looks wireless."""
+    return interface.startswith("en") and not interface.startswith("eth")
+
+
+def _is_wireless_unknown(interface: str) -> bool:
+    """Wireless detection is not supported on this platform."""
     return False
 
 
+# Check if the interface is wireless. This is a simplified, name-based check
+# that is specialized for the current platform once at import time.
+_is_wireless_interface = {
+    'Windows': _is_wireless_windows,
+    'Linux': _is_wireless_linux,
+    'Darwin': _is_wireless_macos,
+}.get(_OS, _is_wireless_unknown)
+
+
 def _get_interface_speed(interface_name: str) -> float:
     """
     Get the speed of a network interface in Mbps.
@@ -28,70 +89,77 @@ def _get_interface_speed(interface_name: str) -> float:
     Returns:
         Speed in Mbps
     """
-    speed = 0
-    
     try:
-        if platform.system() == "Windows":
-            # Use PowerShell to get interface speed
-            stdout, _, _ = run_command([
-                "powershell", 
-                "-Command", 
-                f"(Get-NetAdapter -Name '*{interface_name}*' | Select-Object -First 1).LinkSpeed"
-            ])
-            
-            # Parse the output (format is typically "1 Gbps" or "100 Mbps")
-            if stdout:
-                if "Gbps" in stdout:
-                    speed_value = float(stdout.split()[0])
-                    speed = speed_value * 1000  # Convert Gbps to Mbps
-                elif "Mbps" in stdout:
-                    speed = float(stdout.split()[0])
-                    
-        elif platform.system() == "Linux":
-            # Check /sys/class/net/interface/speed
-            speed_file = f"/sys/class/net/{interface_name}/speed"
-            if os.path.exists(speed_file):
-                with open(speed_file, "r") as f:
-                    speed = float(f.read().strip())
-                    
-        elif platform.system() == "Darwin":  # macOS
-            # Use networksetup to get interface speed
-            # First need to map interface name to service name
-            stdout, _, _ = run_command(["networksetup", "-listallhardwareports"])
-            
-            # Parse output to find the service name
-            service_name = None
-            if stdout:
-                lines = stdout.split('\n')
-                for i, line in enumerate(lines):
-                    if f"Device: {interface_name}" in line and i > 0:
-                        # Service name is typically on the line after "Hardware Port:"
-                        for j in range(i-1, -1, -1):
-                            if "Hardware Port:" in lines[j]:
-                                service_name = lines[j].split(":", 1)[1].strip()
-                                break
-                        break
-                
-                if service_name:
-                    # Get the interface details
-                    stdout, _, _ = run_command(["networksetup", "-getinfo", service_name])
-                    
-                    # Look for speed information
-                    if stdout:
-                        for line in stdout.split('\n'):
-                            if "Link Speed" in line and ":" in line:
-                                speed_text = line.split(":", 1)[1].strip().lower()
-                                if "gbps" in speed_text:
-                                    speed = float(speed_text.split()[0]) * 1000  # Convert Gbps to Mbps
-                                elif "mbps" in speed_text:
-                                    speed = float(speed_text.split()[0])
-                                break
+        return _IMPL.speed(interface_name)
     except Exception as e:
         logger.error(f"Error getting interface speed: {e}")
-    
+    return 0
+
+
+def _get_windows_speed(interface_name: str) -> float:
+    """Get interface speed in Mbps on Windows."""
+    # psutil reads the link speed (already in Mbps) from the adapter table,
+    # without starting PowerShell for every adapter. Like the old
+    # Get-NetAdapter -Name '*name*' query, fall back to a partial name match
+    stats = psutil.net_if_stats()
+    nic = stats.get(interface_name)
+    if nic is None:
+        nic = next((stats[name] for name in stats if interface_name in name), None)
+    return float(nic.speed) if nic is not None else 0
+
+
+def _get_linux_speed(interface_name: str) -> float:
+    """Get interface speed in Mbps on Linux."""
+    speed = 0
+    # Check /sys/class/net/interface/speed
+    speed_file = f"/sys/class/net/{interface_name}/speed"
+    if os.path.exists(speed_file):
+        with open(speed_file, "r") as f:
+            speed = float(f.read().strip())
     return speed
 
 
+def _macos_network_snapshot() -> Dict[str, float]:
+    """
+    Build a {device: link speed in Mbps} map from one system_profiler dump.
+    
+    The result is memoized for _MACOS_SNAPSHOT_TTL seconds so that looking up
+    several interfaces costs a single subprocess.
+    
+    Returns:
+        Dictionary mapping BSD device names (en0, en1, ...) to Mbps
+    """
+    now = time.monotonic()
+    if now - _macos_snapshot['timestamp'] < _MACOS_SNAPSHOT_TTL:
+        return _macos_snapshot['speeds']
+    
+    speeds = {}
+    stdout, _, _ = run_command(["system_profiler", "-json", "SPNetworkDataType"])
+    if stdout:
+        for entry in json.loads(stdout).get("SPNetworkDataType", []):
+            device = entry.get("interface")
+            if not device:
+                continue
+            # Media subtype looks like "1000baseT", "100baseTX" or "10GbaseT"
+            media = entry.get("Ethernet", {}).get("MediaSubType", "")
+            match = _RE_MEDIA_SUBTYPE.match(media)
+            if match:
+                speed = float(match.group(1))
+                speeds[device] = speed * 1000 if match.group(2) else speed
+    
+    _macos_snapshot['timestamp'] = now
+    _macos_snapshot['speeds'] = speeds
+    return speeds
+
+
+def _get_macos_speed(interface_name: str) -> float:
+    """Get interface speed in Mbps on macOS."""
+    if not _HAS_SYSTEM_PROFILER:
+        return 0
+    return _macos_network_snapshot().get(interface_name, 0)
+
+
+@ttl_cache()
 def get_network_interfaces() -> Dict[str, Dict[str, Any]]:
     """
     Get all available network interfaces.
@@ -99,20 +167,10 @@ def get_network_interfaces() -> Dict[str, Dict[str, Any]]:
     Returns:
         Dictionary of interfaces with their details
     """
-    interfaces = {}
-    
-    # If netifaces is not available, use a platform-specific approach
-    if not HAS_NETIFACES:
-        if platform.system() == "Windows":
-            interfaces = _get_windows_interfaces()
-        elif platform.system() == "Linux":
-            interfaces = _get_linux_interfaces()
-        elif platform.system() == "Darwin":  # macOS
-            interfaces = _get_macos_interfaces()
-    else:
-        interfaces = _get_interfaces_with_netifaces()
-    
-    return interfaces
+    # If netifaces is not available, use the platform-specific approach
+    if HAS_NETIFACES:
+        return _get_interfaces_with_netifaces()
+    return _IMPL.list()
 
 
 def _get_windows_interfaces() -> Dict[str, Dict[str, Any]]:
@@ -152,92 +210,221 @@ def _get_windows_interfaces() -> Dict[str, Dict[str, Any]]:
     return interfaces
 
 
+def _netlink_align(length: int) -> int:
+    """Round a netlink length up to the 4-byte boundary."""
+    return (length + 3) & ~3
+
+
+def _netlink_attrs(data: bytes, offset: int, end: int) -> Dict[int, bytes]:
+    """Walk the rtattr list in data[offset:end] and return {type: payload}."""
+    attrs = {}
+    while offset + _RTATTR.size <= end:
+        attr_len, attr_type = _RTATTR.unpack_from(data, offset)
+        if attr_len < _RTATTR.size:
+            break
+        attrs[attr_type] = data[offset + _RTATTR.size:offset + attr_len]
+        offset += _netlink_align(attr_len)
+    return attrs
+
+
+def _netlink_dump(sock: socket.socket, msg_type: int, body: bytes, seq: int) -> List[Tuple[int, bytes, int, int]]:
+    """
+    Send a netlink dump request and collect every reply message.
+    
+    Args:
+        sock: Bound NETLINK_ROUTE socket
+        msg_type: Request type (RTM_GETLINK / RTM_GETADDR)
+        body: Family-specific request header
+        seq: Sequence number for this request
+        
+    Returns:
+        List of (type, buffer, payload offset, message end) tuples
+    """
+    header = _NLMSGHDR.pack(_NLMSGHDR.size + len(body), msg_type,
+                            _NLM_F_REQUEST | _NLM_F_DUMP, seq, 0)
+    sock.send(header + body)
+    
+    messages = []
+    while True:
+        data = sock.recv(65536)
+        offset = 0
+        while offset + _NLMSGHDR.size <= len(data):
+            msg_len, reply_type, _, reply_seq, _ = _NLMSGHDR.unpack_from(data, offset)
+            if msg_len < _NLMSGHDR.size:
+                return messages
+            if reply_seq == seq:
+                if reply_type == _NLMSG_DONE:
+                    return messages
+                if reply_type == _NLMSG_ERROR:
+                    raise OSError("netlink dump request failed")
+                messages.append((reply_type, data, offset + _NLMSGHDR.size, offset + msg_len))
+            offset += _netlink_align(msg_len)
+
+
+def _get_linux_interfaces_netlink() -> Dict[str, Dict[str, Any]]:
+    """
+    Get network interfaces on Linux with a netlink RTM_GETLINK/RTM_GETADDR dump.
+    
+    This avoids spawning ifconfig/ip and parsing their text output.
+    
+    Returns:
+        Dictionary of interfaces with their details (empty on failure)
+    """
+    interfaces = {}
+    if not hasattr(socket, "AF_NETLINK"):
+        return interfaces
+    
+    try:
+        with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, _NETLINK_ROUTE) as sock:
+            sock.bind((0, 0))
+            
+            # Links: index -> name, MAC
+            by_index = {}
+            link_req = _IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+            for msg_type, data, offset, end in _netlink_dump(sock, _RTM_GETLINK, link_req, 1):
+                if msg_type != _RTM_NEWLINK:
+                    continue
+                _, _, if_index, _, _ = _IFINFOMSG.unpack_from(data, offset)
+                attrs = _netlink_attrs(data, offset + _IFINFOMSG.size, end)
+                if _IFLA_IFNAME not in attrs:
+                    continue
+                if_name = attrs[_IFLA_IFNAME].rstrip(b'\0').decode('utf-8', errors='ignore')
+                mac = attrs.get(_IFLA_ADDRESS, b'')
+                interfaces[if_name] = {
+                    'name': if_name,
+                    'ip_address': '',
+                    'netmask': '',
+                    'is_wireless': os.path.exists(f"/sys/class/net/{if_name}/wireless"),
+                    'mac_address': ':'.join(f"{b:02x}" for b in mac) if len(mac) == 6 else ''
+                }
+                by_index[if_index] = if_name
+            
+            # IPv4 addresses: first address per interface wins, as with ifconfig
+            addr_req = _IFADDRMSG.pack(socket.AF_INET, 0, 0, 0, 0)
+            for msg_type, data, offset, end in _netlink_dump(sock, _RTM_GETADDR, addr_req, 2):
+                if msg_type != _RTM_NEWADDR:
+                    continue
+                family, prefixlen, _, _, if_index = _IFADDRMSG.unpack_from(data, offset)
+                if_name = by_index.get(if_index)
+                if family != socket.AF_INET or not if_name or interfaces[if_name]['ip_address']:
+                    continue
+                attrs = _netlink_attrs(data, offset + _IFADDRMSG.size, end)
+                addr = attrs.get(_IFA_LOCAL) or attrs.get(_IFA_ADDRESS)
+                if not addr or len(addr) != 4:
+                    continue
+                mask = (0xFFFFFFFF << (32 - prefixlen)) & 0xFFFFFFFF
+                interfaces[if_name]['ip_address'] = socket.inet_ntoa(addr)
+                interfaces[if_name]['netmask'] = socket.inet_ntoa(struct.pack('!I', mask))
+    except Exception as e:
+        logger.debug(f"Netlink interface dump unavailable: {e}")
+        return {}
+    
+    return interfaces
+
+
 def _get_linux_interfaces() -> Dict[str, Dict[str, Any]]:
     """Get network interfaces on Linux."""
+    interfaces = _get_linux_interfaces_netlink()
+    if interfaces:
+        return interfaces
+    
+    # Prefer ip over ifconfig, and skip whichever tool is not installed
+    if _HAS_IP:
+        interfaces = _get_linux_interfaces_ip()
+        if interfaces:
+            return interfaces
+    
+    if _HAS_IFCONFIG:
+        interfaces = _get_linux_interfaces_ifconfig()
+    
+    return interfaces
+
+
+def _get_linux_interfaces_ip() -> Dict[str, Dict[str, Any]]:
+    """Get network interfaces on Linux by parsing `ip addr`."""
     interfaces = {}
     try:
-        # Use ifconfig on Linux
-        stdout, _, _ = run_command(["ifconfig", "-a"])
+        stdout, _, _ = run_command(["ip", "addr"])
         if stdout:
-            sections = stdout.split('\n\n')
-            for section in sections:
-                if not section.strip():
-                    continue
-                lines = section.split('\n')
-                if lines:
-                    if_name = lines[0].split(':')[0].strip()
-                    is_wireless = if_name.startswith('wl') or 'wlan' in if_name
-                    ip_address = ''
-                    mac_address = ''
-                    netmask = ''
-                    
-                    for line in lines:
+            current_if = None
+            for line in stdout.split('\n'):
+                if line.startswith(' '):
+                    # Continuation of previous interface
+                    if current_if:
+                        # Look for inet (IPv4) address
                         if 'inet ' in line:
                             parts = line.strip().split()
-                            inet_idx = parts.index('inet')
-                            if inet_idx + 1 < len(parts):
-                                ip_address = parts[inet_idx + 1]
-                            # Try to find netmask
-                            if 'netmask' in line:
-                                netmask_idx = parts.index('netmask')
-                                if netmask_idx + 1 < len(parts):
-                                    netmask = parts[netmask_idx + 1]
-                        elif 'ether ' in line:
+                            addr_idx = parts.index('inet')
+                            if addr_idx + 1 < len(parts):
+                                # Format is typically "inet 192.168.1.1/24"
+                                ip_cidr = parts[addr_idx + 1]
+                                if '/' in ip_cidr:
+                                    ip = ip_cidr.split('/')[0]
+                                    interfaces[current_if]['ip_address'] = ip
+                        # Look for link/ether (MAC) address
+                        elif 'link/ether' in line:
                             parts = line.strip().split()
-                            ether_idx = parts.index('ether')
-                            if ether_idx + 1 < len(parts):
-                                mac_address = parts[ether_idx + 1]
-                    
-                    interfaces[if_name] = {
-                        'name': if_name,
-                        'ip_address': ip_address,
-                        'netmask': netmask,
-                        'is_wireless': is_wireless,
-                        'mac_address': mac_address
-                    }
+                            if len(parts) >= 2:
+                                mac = parts[1]
+                                interfaces[current_if]['mac_address'] = mac
+                else:
+                    # New interface
+                    match = re.search(r'^\d+:\s+([^:]+):', line)
+                    if match:
+                        current_if = match.group(1)
+                        is_wireless = current_if.startswith('wl') or 'wlan' in current_if
+                        interfaces[current_if] = {
+                            'name': current_if,
+                            'ip_address': '',
+                            'netmask': '',
+                            'is_wireless': is_wireless,
+                            'mac_address': ''
+                        }
     except Exception as e:
-        logger.error(f"Error getting network interfaces with ifconfig: {e}")
+        logger.error(f"Error getting network interfaces with ip: {e}")
+    
+    return interfaces
+
+
+def _iter_ifconfig_blocks(stdout: str):
+    """
+    Iterate over the interface blocks of ifconfig output.
+    
+    Args:
+        stdout: Raw ifconfig output
         
-        # Try with ip command if ifconfig fails
-        try:
-            stdout, _, _ = run_command(["ip", "addr"])
-            if stdout:
-                current_if = None
-                for line in stdout.split('\n'):
-                    if line.startswith(' '):
-                        # Continuation of previous interface
-                        if current_if:
-                            # Look for inet (IPv4) address
-                            if 'inet ' in line:
-                                parts = line.strip().split()
-                                addr_idx = parts.index('inet')
-                                if addr_idx + 1 < len(parts):
-                                    # Format is typically "inet 192.168.1.1/24"
-                                    ip_cidr = parts[addr_idx + 1]
-                                    if '/' in ip_cidr:
-                                        ip = ip_cidr.split('/')[0]
-                                        interfaces[current_if]['ip_address'] = ip
-                            # Look for link/ether (MAC) address
-                            elif 'link/ether' in line:
-                                parts = line.strip().split()
-                                if len(parts) >= 2:
-                                    mac = parts[1]
-                                    interfaces[current_if]['mac_address'] = mac
-                    else:
-                        # New interface
-                        match = re.search(r'^\d+:\s+([^:]+):', line)
-                        if match:
-                            current_if = match.group(1)
-                            is_wireless = current_if.startswith('wl') or 'wlan' in current_if
-                            interfaces[current_if] = {
-                                'name': current_if,
-                                'ip_address': '',
-                                'netmask': '',
-                                'is_wireless': is_wireless,
-                                'mac_address': ''
-                            }
-        except Exception as e:
-            logger.error(f"Error getting network interfaces with ip: {e}")
+    Yields:
+        Tuples of (name, ip_address, netmask, mac_address)
+    """
+    for block in _RE_IFCONFIG_BLOCK.finditer(stdout):
+        body = block.group(2)
+        inet = _RE_IFCONFIG_INET.search(body)
+        ether = _RE_IFCONFIG_ETHER.search(body)
+        yield (
+            block.group(1),
+            inet.group(1) if inet else '',
+            (inet.group(2) or '') if inet else '',
+            ether.group(1) if ether else ''
+        )
+
+
+def _get_linux_interfaces_ifconfig() -> Dict[str, Dict[str, Any]]:
+    """Get network interfaces on Linux by parsing `ifconfig -a`."""
+    interfaces = {}
+    try:
+        # Use ifconfig on Linux
+        stdout, _, _ = run_command(["ifconfig", "-a"])
+        if stdout:
+            for if_name, ip_address, netmask, mac_address in _iter_ifconfig_blocks(stdout):
+                interfaces[if_name] = {
+                    'name': if_name,
+                    'ip_address': ip_address,
+                    'netmask': netmask,
+                    'is_wireless': if_name.startswith('wl') or 'wlan' in if_name,
+                    'mac_address': mac_address
+                }
+    except Exception as e:
+        logger.error(f"Error getting network interfaces with ifconfig: {e}")
     
     return interfaces
 
@@ -245,51 +432,29 @@ def _get_linux_interfaces() -> Dict[str, Dict[str, Any]]:
 def _get_macos_interfaces() -> Dict[str, Dict[str, Any]]:
     """Get network interfaces on macOS."""
     interfaces = {}
+    if not _HAS_IFCONFIG:
+        return interfaces
+    
     try:
         # Use ifconfig on macOS
         stdout, _, _ = run_command(["ifconfig"])
         if stdout:
-            sections = stdout.split('\n\n')
-            for section in sections:
-                if not section.strip():
-                    continue
-                lines = section.split('\n')
-                if lines:
-                    if_name = lines[0].split(':')[0].strip()
-                    is_wireless = if_name.startswith('en') and not if_name.startswith('eth')
-                    ip_address = ''
-                    mac_address = ''
+            for if_name, ip_address, netmask, mac_address in _iter_ifconfig_blocks(stdout):
+                # On macOS, netmask is often in hex format (0xffffff00)
+                if netmask.startswith('0x'):
+                    # Convert hex netmask to dotted decimal
+                    netmask_int = int(netmask, 16)
+                    netmask = '.'.join([str((netmask_int >> (24 - i * 8)) & 0xFF) for i in range(4)])
+                else:
                     netmask = ''
-                    
-                    for line in lines:
-                        if 'inet ' in line:
-                            parts = line.strip().split()
-                            inet_idx = parts.index('inet')
-                            if inet_idx + 1 < len(parts):
-                                ip_address = parts[inet_idx + 1]
-                            # Try to find netmask
-                            if 'netmask' in line:
-                                netmask_idx = parts.index('netmask')
-                                if netmask_idx + 1 < len(parts):
-                                    # On macOS, netmask is often in hex format (0xffffff00)
-                                    netmask_hex = parts[netmask_idx + 1]
-                                    if netmask_hex.startswith('0x'):
-                                        # Convert hex netmask to dotted decimal
-                                        netmask_int = int(netmask_hex, 16)
-                                        netmask = '.'.join([str((netmask_int >> (24 - i * 8)) & 0xFF) for i in range(4)])
-                        elif 'ether ' in line:
-                            parts = line.strip().split()
-                            ether_idx = parts.index('ether')
-                            if ether_idx + 1 < len(parts):
-                                mac_address = parts[ether_idx + 1]
-                    
-                    interfaces[if_name] = {
-                        'name': if_name,
-                        'ip_address': ip_address,
-                        'netmask': netmask,
-                        'is_wireless': is_wireless,
-                        'mac_address': mac_address
-                    }
+                
+                interfaces[if_name] = {
+                    'name': if_name,
+                    'ip_address': ip_address,
+                    'netmask': netmask,
+                    'is_wireless': if_name.startswith('en') and not if_name.startswith('eth'),
+                    'mac_address': mac_address
+                }
     except Exception as e:
         logger.error(f"Error getting network interfaces with ifconfig: {e}")
     
@@ -332,6 +497,68 @@ def _get_interfaces_with_netifaces() -> Dict[str, Dict[str, Any]]:
     return interfaces
 
 
+def _get_windows_default_interface(interfaces: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    """Find the interface holding the default route on Windows."""
+    if not _HAS_ROUTE:
+        return None
+    stdout, _, _ = run_command(["route", "print", "0.0.0.0"])
+    if stdout:
+        lines = stdout.split('\n')
+        for line in lines:
+            if "0.0.0.0" in line:
+                parts = line.strip().split()
+                if len(parts) >= 5:
+                    interface_idx = parts[4]
+                    # Now find the interface with this index
+                    for name, details in interfaces.items():
+                        if details.get('interface_idx') == interface_idx:
+                            return name
+    return None
+
+
+def _get_linux_default_interface(interfaces: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    """Find the interface holding the default route on Linux."""
+    if not _HAS_IP:
+        return None
+    stdout, _, _ = run_command(["ip", "route", "show", "default"])
+    if stdout:
+        # Example: "default via 192.168.1.1 dev wlan0 proto static"
+        match = re.search(r"dev\s+(\S+)", stdout)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _get_macos_default_interface(interfaces: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    """Find the interface holding the default route on macOS."""
+    if not _HAS_ROUTE:
+        return None
+    stdout, _, _ = run_command(["route", "-n", "get", "default"])
+    if stdout:
+        match = re.search(r"interface:\s+(\S+)", stdout)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _guess_active_ip() -> Optional[str]:
+    """
+    Get the local IPv4 address used for outbound traffic.
+    
+    Connecting a UDP socket only selects a route; no packet is sent.
+    
+    Returns:
+        Local IP address or None if there is no route
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(("8.8.8.8", 80))
+            return sock.getsockname()[0]
+    except OSError:
+        return None
+
+
+@ttl_cache()
 def get_active_interface() -> Optional[str]:
     """
     Determine the currently active network interface.
@@ -344,51 +571,40 @@ def get_active_interface() -> Optional[str]:
     
     # First try to find the interface with the default route
     try:
-        if platform.system() == "Windows":
-            stdout, _, _ = run_command(["route", "print", "0.0.0.0"])
-            if stdout:
-                lines = stdout.split('\n')
-                for line in lines:
-                    if "0.0.0.0" in line:
-                        parts = line.strip().split()
-                        if len(parts) >= 5:
-                            interface_idx = parts[4]
-                            # Now find the interface with this index
-                            for name, details in interfaces.items():
-                                if details.get('interface_idx') == interface_idx:
-                                    return name
-        elif platform.system() == "Linux":
-            stdout, _, _ = run_command(["ip", "route", "show", "default"])
-            if stdout:
-                # Example: "default via 192.168.1.1 dev wlan0 proto static"
-                match = re.search(r"dev\s+(\S+)", stdout)
-                if match:
-                    return match.group(1)
-        elif platform.system() == "Darwin":  # macOS
-            stdout, _, _ = run_command(["route", "-n", "get", "default"])
-            if stdout:
-                match = re.search(r"interface:\s+(\S+)", stdout)
-                if match:
-                    return match.group(1)
+        default_interface = _IMPL.default_route(interfaces)
+        if default_interface:
+            return default_interface
     except Exception as e:
         logger.error(f"Error finding interface with default route: {e}")
     
-    # If default route lookup failed, try connectivity test
-    for interface, details in interfaces.items():
-        if details['ip_address']:
-            try:
-                # Test connectivity
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                sock.settimeout(1)
-                sock.connect(("8.8.8.8", 80))
-                sock.close()
+    # If default route lookup failed, ask the OS which local address it would route through
+    local_ip = _guess_active_ip()
+    if local_ip:
+        for interface, details in interfaces.items():
+            if details['ip_address'] == local_ip:
                 return interface
-            except:
-                pass
     
     # Fall back to the first interface with an IP
     for interface, details in interfaces.items():
         if details['ip_address']:
             return interface
             
-    return None 
\ No newline at end of file
+    return None
+
+
+# Platform dispatch table, resolved once at import time
+_PlatformImpl = namedtuple('_PlatformImpl', ['list', 'speed', 'default_route'])
+
+_NULL_IMPL = _PlatformImpl(
+    list=lambda: {},
+    speed=lambda interface_name: 0,
+    default_route=lambda interfaces: None
+)
+
+_DISPATCH = {
+    'Windows': _PlatformImpl(_get_windows_interfaces, _get_windows_speed, _get_windows_default_interface),
+    'Linux': _PlatformImpl(_get_linux_interfaces, _get_linux_speed, _get_linux_default_interface),
+    'Darwin': _PlatformImpl(_get_macos_interfaces, _get_macos_speed, _get_macos_default_interface),
+}
+
+_IMPL = _DISPATCH.get(_OS, _NULL_IMPL)
@@ -3,129 +3,486 @@ Network optimization utilities for Signal Booster.
 This module provides functions for optimizing network performance.
 """
 
+import asyncio
+import ctypes
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Set
+
 from signal_booster.network.common import *
 from signal_booster.network.interfaces import get_network_interfaces, get_active_interface
 
-def optimize_tcp_settings() -> bool:
+_OS = platform.system()
+
+# Windows TCP congestion providers, newest first
+_CONGESTION_PROVIDERS = ("cubic", "ctcp", "newreno", "reno")
+# MSFT_NetTCPSetting.CongestionProvider values, as netsh spells them
+_CIM_CONGESTION_PROVIDERS = {1: "newreno", 2: "ctcp", 3: "dctcp", 4: "ledbat", 5: "cubic"}
+
+# Equivalent of `netsh interface tcp set global autotuninglevel=normal`
+_AUTOTUNING_LEVEL_NORMAL = 1
+
+# powercfg -list parsing
+_GUID_RE = re.compile(r"([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})", re.IGNORECASE)
+_ULTIMATE_RE = re.compile(r"Ultimate[\s_]Performance", re.IGNORECASE)
+_HIGH_RE = re.compile(r"High[\s_]performance", re.IGNORECASE)
+
+# Network adapter device class, and DriverDesc (lowercase) -> subkey path
+_NET_CLASS_PATH = r"SYSTEM\CurrentControlSet\Control\Class\{4d36e972-e325-11ce-bfc1-08002be10318}"
+_ADAPTER_KEY_CACHE: Dict[str, str] = {}
+
+# Linux TCP sysctls, written straight to /proc/sys
+_LINUX_SYSCTL_OPTS: Tuple[Tuple[str, str], ...] = (
+    # Increase TCP window sizes
+    ("net.ipv4.tcp_rmem", "4096 87380 16777216"),
+    ("net.ipv4.tcp_wmem", "4096 65536 16777216"),
+    ("net.core.rmem_max", "16777216"),
+    ("net.core.wmem_max", "16777216"),
+    
+    # Enable TCP window scaling
+    ("net.ipv4.tcp_window_scaling", "1"),
+    
+    # Enable fast TCP connections
+    ("net.ipv4.tcp_fastopen", "3"),
+    
+    # Disable TCP slow-start after idle
+    ("net.ipv4.tcp_slow_start_after_idle", "0"),
+    
+    # Increase maximum backlog
+    ("net.core.netdev_max_backlog", "2500"),
+    ("net.core.somaxconn", "4096"),
+    
+    # Enable BPF JIT compiler
+    ("net.core.bpf_jit_enable", "1"),
+    
+    # Set congestion control to BBR if available
+    ("net.ipv4.tcp_congestion_control", "bbr"),
+)
+
+# (param, value) pairs already written to /proc/sys by this process
+_APPLIED_SYSCTLS: Set[Tuple[str, str]] = set()
+# /proc/sys path -> whether we may write it, checked once per path
+_SYSCTL_WRITABLE: Dict[str, bool] = {}
+
+# macOS TCP sysctls, applied in a single sysctl -w call
+_MACOS_SYSCTL_OPTS: Tuple[Tuple[str, str], ...] = (
+    # Increase TCP buffer sizes
+    ("net.inet.tcp.sendspace", "262144"),
+    ("net.inet.tcp.recvspace", "262144"),
+    
+    # Increase socket buffer size
+    ("kern.ipc.maxsockbuf", "8388608"),
+    
+    # Disable TCP delayed ACKs for faster response
+    ("net.inet.tcp.delayed_ack", "0"),
+    
+    # Enable TCP window scaling
+    ("net.inet.tcp.rfc1323", "1"),
+    
+    # Set a good default MSS
+    ("net.inet.tcp.mssdflt", "1448"),
+    
+    # Enable TCP Fast Open if available
+    ("net.inet.tcp.fastopen", "1"),
+)
+_MACOS_SYSCTL_ARGV = ["sysctl", "-w"] + [f"{param}={value}" for param, value in _MACOS_SYSCTL_OPTS]
+
+# Radio type, channel and 5 GHz band in `netsh wlan show interfaces` output
+_WLAN_INFO_RE = re.compile(
+    rb"(?:Radio type\s*:\s*(?P<radio>802\.11[a-z]+))|(?:Channel\s*:\s*(?P<ch>\d+))|(?P<b5>5(?:\.0)?\s*GHz)"
+)
+
+# Traffic control tools, resolved once instead of running `which` per call
+_TC_PATH = shutil.which("tc")
+_PFCTL_PATH = shutil.which("pfctl")
+
+# HTB traffic prioritization tree: root handle 1:, and classes as
+# (minor id, rate, ceil, prio)
+_HTB_ROOT = 0x10000
+_HTB_CLASSES = (
+    # Class 1:10 for high priority traffic (interactive, VoIP, etc.)
+    (0x10, "1mbit", "10mbit", 1),
+    # Class 1:20 for medium priority traffic (web browsing, etc.)
+    (0x20, "5mbit", "20mbit", 2),
+    # Class 1:30 for default traffic
+    (0x30, "10mbit", "100mbit", 3),
+)
+_HTB_DEFAULT_CLASS = 0x30
+# tc rate units (decimal, like tc itself)
+_TC_RATE_UNITS = {"bit": 1, "kbit": 1000, "mbit": 1000 ** 2, "gbit": 1000 ** 3}
+# Let classes borrow up to their ceil when the link is idle. Borrowing costs
+# HTB extra per-dequeue work; for plain prioritization on low-end routers a
+# fixed rate (ceil == rate) is cheaper, so it is off by default.
+_HTB_ALLOW_BORROW = False
+_HTB_PRIORITY_CLASS = 0x10
+# High priority for SSH, DNS, etc.
+_HTB_PRIORITY_PORTS = (22, 53)
+
+# Below this congestion level (percent) QoS does nothing useful but still
+# costs HTB per-packet work, so the tree is not installed. After this many
+# consecutive low readings an installed tree is removed.
+_QOS_MIN_CONGESTION = 20.0
+_QOS_LOW_READINGS_BEFORE_REMOVAL = 3
+# analyze_network_congestion pings for about 20 seconds, so readings are
+# reused for this long and refreshed on a daemon thread (which does not
+# hold up interpreter exit)
+_QOS_CONGESTION_TTL = 60.0
+_qos_lock = threading.Lock()
+# Interface -> (timestamp, congestion percent, consecutive low readings)
+_qos_congestion: Dict[str, Tuple[float, float, int]] = {}
+_qos_probing: Set[str] = set()
+# Interface -> whether our QoS setup is installed; unknown interfaces may
+# still carry one from an earlier run
+_qos_installed: Dict[str, bool] = {}
+
+# clsact egress classifier: HTB checks skb->priority against its class ids
+# before running any filters, so setting it here skips the u32 filter walk.
+# Needs clsact (kernel 4.5+).
+_CLSACT_MIN_KERNEL = (4, 5)
+_CLSACT_EGRESS = "ffff:fff3"
+# Fixed filter preference, so our filter can be deleted without touching
+# others sharing the clsact qdisc
+_CLSACT_FILTER_PRIO = 49152
+
+# TCX (kernel 6.6+) attaches the classifier as a bpf_link without any qdisc.
+# The link is pinned so it outlives this process.
+_TCX_MIN_KERNEL = (6, 6)
+_BPF_TCX_EGRESS = 47  # enum bpf_attach_type
+_TCX_PIN_PATH = "/sys/fs/bpf/signal_booster_priority"
+# struct bpf_link_info: the union after type/id/prog_id is 8-byte aligned,
+# and its tcx member starts with the ifindex (0 once the device is gone)
+_BPF_LINK_INFO_SIZE = 128
+_BPF_LINK_INFO_TCX_IFINDEX = 16
+_PRIORITY_BPF_SRC = r"""
+#include <uapi/linux/bpf.h>
+#include <uapi/linux/if_ether.h>
+#include <uapi/linux/ip.h>
+#include <uapi/linux/in.h>
+#include <uapi/linux/pkt_cls.h>
+
+int classify(struct __sk_buff *skb)
+{
+    void *data = (void *)(long)skb->data;
+    void *data_end = (void *)(long)skb->data_end;
+    struct ethhdr *eth = data;
+    struct iphdr *ip;
+    __u16 *ports;
+    __u16 dport;
+
+    if ((void *)(eth + 1) > data_end || eth->h_proto != htons(ETH_P_IP))
+        return TC_ACT_OK;
+    ip = (void *)(eth + 1);
+    if ((void *)(ip + 1) > data_end)
+        return TC_ACT_OK;
+    if (ip->protocol != IPPROTO_TCP && ip->protocol != IPPROTO_UDP)
+        return TC_ACT_OK;
+    ports = (void *)ip + ip->ihl * 4;
+    if ((void *)(ports + 2) > data_end)
+        return TC_ACT_OK;
+
+    dport = ntohs(ports[1]);
+    if (PORT_MATCH)
+        skb->priority = PRIORITY_CLASSID;
+    return TC_ACT_OK;
+}
+"""
+
+# I/O schedulers to try for the root disk, most preferred first
+_IO_SCHEDULERS = ("mq-deadline", "deadline", "bfq", "none")
+
+# Where the boot ID of the last successful TCP optimization is recorded
+_TCP_MARKER_PATH = "/var/run/signal_booster/tcp.applied"
+_TCP_MARKER_KEY = r"Software\SignalBooster"
+
+# Lazily created WMI connection to root\StandardCimv2, reused across runs
+_STANDARD_CIMV2: Dict[str, Any] = {}
+
+# Flush the Windows DNS cache once it holds more records than this
+_DNS_CACHE_FLUSH_THRESHOLD = 200
+
+# Total RAM does not change while we run, so pick the TCP window size tier once.
+# Use larger windows for systems with more RAM.
+_MEM_GB = psutil.virtual_memory().total / (1 << 30)
+if _MEM_GB >= 16:
+    _TCP_WINDOW_SIZE = 4194304  # 4MB for high-memory systems
+elif _MEM_GB >= 8:
+    _TCP_WINDOW_SIZE = 2097152  # 2MB for medium-memory systems
+elif _MEM_GB >= 4:
+    _TCP_WINDOW_SIZE = 1048576  # 1MB for lower-memory systems
+else:
+    _TCP_WINDOW_SIZE = 524288   # 512KB for very low memory systems
+
+# Values written under Tcpip\Parameters by the Windows TCP optimizer
+_TCP_PARAMETERS = (
+    # Enable TCP autotuning at normal level (replaces netsh autotuninglevel=normal)
+    ("TcpAutoTuningLevelLocal", _AUTOTUNING_LEVEL_NORMAL),
+    # Enable all TCP timestamp options (RTTM, PAWS) with scaling
+    ("Tcp1323Opts", 3),
+    # Enable TCP No Delay for lower latency
+    ("TCPNoDelay", 1),
+    # Disable TCP delayed ACKs for faster response
+    ("TcpAckFrequency", 1),
+    # Optimal TTL setting (128 is a good balance)
+    ("DefaultTTL", 128),
+    # Increase SYN attack protection with SYN cookies
+    ("SynAttackProtect", 1),
+    # Set the TCP window size scaled to system memory
+    ("TcpWindowSize", _TCP_WINDOW_SIZE),
+    # Enable TCP Fast Path processing for performance
+    ("EnableTCPA", 1),
+    # Set maximum connections
+    ("TcpNumConnections", 0xFFFFFFE),
+)
+
+
+def optimize_tcp_settings(force: bool = False) -> bool:
     """
     Optimize TCP settings for better performance.
     
+    The settings only need applying once per boot, so a marker keyed by the
+    boot ID is recorded after a successful run and later calls return early.
+    
+    Args:
+        force: Re-apply the settings even if they were applied this boot
+        
     Returns:
         True if successful, False otherwise
     """
     try:
-        if platform.system() == "Windows":
-            return _optimize_windows_tcp()
-        elif platform.system() == "Linux":
-            return _optimize_linux_tcp()
-        elif platform.system() == "Darwin":  # macOS
-            return _optimize_macos_tcp()
+        optimizer = _TCP_OPT.get(_OS)
+        if optimizer:
+            boot_id = _get_boot_id()
+            if force:
+                _APPLIED_SYSCTLS.clear()
+            elif boot_id and _read_tcp_marker() == boot_id:
+                logger.info("TCP settings already applied since last boot, skipping")
+                return True
+            
+            success = optimizer()
+            if success and boot_id:
+                _write_tcp_marker(boot_id)
+            return success
     except Exception as e:
         logger.error(f"Error optimizing TCP settings: {e}")
     return False
 
 
-def _optimize_windows_tcp() -> bool:
-    """Optimize TCP settings on Windows with advanced algorithms."""
+def _get_boot_id() -> Optional[str]:
+    """
+    Identify the current boot session.
+    
+    Returns:
+        The kernel boot ID on Linux, the boot timestamp elsewhere, or None
+    """
     try:
-        success = True
-        logger.info("Applying advanced Windows TCP optimizations")
+        if _OS == "Linux":
+            with open("/proc/sys/kernel/random/boot_id") as f:
+                return f.read().strip()
+        return str(int(psutil.boot_time()))
+    except Exception as e:
+        logger.debug(f"Could not determine boot ID: {e}")
+        return None
+
+
+def _read_tcp_marker() -> Optional[str]:
+    """Return the boot ID recorded by the last successful TCP optimization."""
+    try:
+        if _OS == "Windows":
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, _TCP_MARKER_KEY) as key:
+                return winreg.QueryValueEx(key, "TcpApplied")[0]
+        with open(_TCP_MARKER_PATH) as f:
+            return f.read().strip()
+    except Exception:
+        return None
+
+
+def _write_tcp_marker(boot_id: str) -> None:
+    """Record that TCP settings were applied during this boot."""
+    try:
+        if _OS == "Windows":
+            import winreg
+            with winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, _TCP_MARKER_KEY, 0, winreg.KEY_WRITE) as key:
+                winreg.SetValueEx(key, "TcpApplied", 0, winreg.REG_SZ, boot_id)
+            return
         
-        # 1. Advanced TCP autotuning with dynamic scaling based on network quality
-        # Enable TCP autotuning at normal level initially
+        os.makedirs(os.path.dirname(_TCP_MARKER_PATH), exist_ok=True)
+        tmp_path = f"{_TCP_MARKER_PATH}.{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            f.write(boot_id)
+        os.replace(tmp_path, _TCP_MARKER_PATH)
+    except Exception as e:
+        logger.debug(f"Could not record TCP optimization marker: {e}")
+
+
+def _get_windows_congestion_provider() -> Optional[str]:
+    """
+    Read the congestion provider Windows uses for Internet connections.
+    
+    Returns:
+        Provider name as netsh spells it, or None if WMI is unavailable or the
+        system default is in use
+    """
+    try:
+        import pythoncom
+        pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+        connection = _get_standard_cimv2()
+        if connection is None:
+            return None
+        for setting in connection.ExecQuery(
+            "SELECT CongestionProvider FROM MSFT_NetTCPSetting WHERE SettingName = 'Internet'"
+        ):
+            return _CIM_CONGESTION_PROVIDERS.get(setting.CongestionProvider)
+    except Exception as e:
+        logger.debug(f"Could not read the TCP congestion provider: {e}")
+    return None
+
+
+def _set_windows_congestion_provider(key) -> bool:
+    """
+    Select the best available TCP congestion provider on Windows.
+    
+    The provider in effect is read from MSFT_NetTCPSetting, so the netsh
+    fallback chain only runs for providers better than the current one.
+    
+    Args:
+        key: Open Tcpip\\Parameters registry key with read/write access
+        
+    Returns:
+        True if a provider is set, False otherwise
+    """
+    # Earlier versions remembered the provider in a CongestionProvider value
+    # under this key; Windows never reads it and it goes stale, so drop it
+    try:
+        winreg.DeleteValue(key, "CongestionProvider")
+    except OSError:
+        pass
+    
+    # Try newest congestion control algorithms first, then fall back to older ones
+    current = _get_windows_congestion_provider()
+    for provider in _CONGESTION_PROVIDERS:
+        if provider == current:
+            logger.info(f"TCP congestion provider already set to {current}")
+            return True
         stdout, stderr, returncode = run_command(
-            ["netsh", "interface", "tcp", "set", "global", "autotuninglevel=normal"],
-            check=True
+            ["netsh", "interface", "tcp", "set", "global", f"congestionprovider={provider}"],
+            check=False, capture_output=False
         )
+        if returncode == 0:
+            logger.info(f"Successfully set TCP congestion provider to {provider}")
+            return True
+    
+    logger.warning("Could not set any advanced TCP congestion provider")
+    return False
+
+
+def _set_registry_dwords_transacted(writes: List[Tuple[str, str, int]]) -> bool:
+    """
+    Write REG_DWORD values under HKLM in a single KTM registry transaction.
+    
+    Args:
+        writes: List of (subkey path, value name, value) tuples
         
-        if returncode != 0:
-            success = False
-            logger.warning("Failed to set TCP autotuning level")
-        
-        # 2. Advanced congestion control provider selection
-        # Try newest congestion control algorithms first, then fall back to older ones
-        congestion_providers = ["cubic", "ctcp", "newreno", "reno"]
-        congestion_set = False
+    Returns:
+        True if all values were written and committed, False if the transaction
+        could not be used or failed (nothing is written in that case)
+    """
+    try:
+        from ctypes import wintypes
+        advapi32 = ctypes.WinDLL("advapi32")
+        ktmw32 = ctypes.WinDLL("ktmw32")
+        kernel32 = ctypes.WinDLL("kernel32")
+    except (AttributeError, OSError):
+        return False
+    
+    ktmw32.CreateTransaction.restype = wintypes.HANDLE
+    ktmw32.CreateTransaction.argtypes = [ctypes.c_void_p, ctypes.c_void_p, wintypes.DWORD, wintypes.DWORD,
+                                         wintypes.DWORD, wintypes.DWORD, wintypes.LPWSTR]
+    ktmw32.CommitTransaction.argtypes = [wintypes.HANDLE]
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+    advapi32.RegOpenKeyTransactedW.argtypes = [wintypes.HKEY, wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD,
+                                               ctypes.POINTER(wintypes.HKEY), wintypes.HANDLE, ctypes.c_void_p]
+    advapi32.RegSetValueExW.argtypes = [wintypes.HKEY, wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD,
+                                        ctypes.c_void_p, wintypes.DWORD]
+    advapi32.RegCloseKey.argtypes = [wintypes.HKEY]
+    
+    transaction = ktmw32.CreateTransaction(None, None, 0, 0, 0, 0, None)
+    if not transaction or transaction == wintypes.HANDLE(-1).value:
+        return False
+    
+    # Predefined keys are sign-extended 32-bit handles
+    hklm = wintypes.HKEY(ctypes.c_long(winreg.HKEY_LOCAL_MACHINE).value)
+    try:
+        for path, name, value in writes:
+            hkey = wintypes.HKEY()
+            if advapi32.RegOpenKeyTransactedW(hklm, path, 0, winreg.KEY_WRITE, ctypes.byref(hkey), transaction, None) != 0:
+                logger.debug(f"Could not open {path} in registry transaction")
+                return False
+            try:
+                data = wintypes.DWORD(value)
+                if advapi32.RegSetValueExW(hkey, name, 0, winreg.REG_DWORD, ctypes.byref(data), ctypes.sizeof(data)) != 0:
+                    return False
+            finally:
+                advapi32.RegCloseKey(hkey)
         
-        for provider in congestion_providers:
-            stdout, stderr, returncode = run_command(
-                ["netsh", "interface", "tcp", "set", "global", f"congestionprovider={provider}"],
-                check=False
-            )
-            if returncode == 0:
-                logger.info(f"Successfully set TCP congestion provider to {provider}")
-                congestion_set = True
-                break
+        # Closing the handle without committing rolls everything back
+        return bool(ktmw32.CommitTransaction(transaction))
+    finally:
+        kernel32.CloseHandle(transaction)
+
+
+def _optimize_windows_tcp() -> bool:
+    """Optimize TCP settings on Windows with advanced algorithms."""
+    try:
+        success = True
+        logger.info("Applying advanced Windows TCP optimizations")
         
-        if not congestion_set:
-            logger.warning("Could not set any advanced TCP congestion provider")
-            
-        # 3. Advanced TCP registry optimizations with intelligent values
+        # 1. Advanced TCP registry optimizations with intelligent values
         try:
             import winreg
-            import psutil
-            
-            # Get system memory to scale TCP parameters appropriately
-            memory_gb = psutil.virtual_memory().total / (1024 * 1024 * 1024)
-            
-            # Scale TCP window size based on available system memory
-            # Use larger windows for systems with more RAM
-            if memory_gb >= 16:
-                tcp_window_size = 4194304  # 4MB for high-memory systems
-            elif memory_gb >= 8:
-                tcp_window_size = 2097152  # 2MB for medium-memory systems
-            elif memory_gb >= 4:
-                tcp_window_size = 1048576  # 1MB for lower-memory systems
-            else:
-                tcp_window_size = 524288   # 512KB for very low memory systems
-                
+            
             # TCP key parameters registry path
             tcp_params_path = r'SYSTEM\CurrentControlSet\Services\Tcpip\Parameters'
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, tcp_params_path, 0, winreg.KEY_WRITE) as key:
-                # Enable all TCP timestamp options (RTTM, PAWS) with scaling
-                winreg.SetValueEx(key, "Tcp1323Opts", 0, winreg.REG_DWORD, 3)
-                
-                # Enable TCP No Delay for lower latency
-                winreg.SetValueEx(key, "TCPNoDelay", 0, winreg.REG_DWORD, 1)
-                
-                # Disable TCP delayed ACKs for faster response
-                winreg.SetValueEx(key, "TcpAckFrequency", 0, winreg.REG_DWORD, 1)
-                
-                # Optimal TTL setting (128 is a good balance)
-                winreg.SetValueEx(key, "DefaultTTL", 0, winreg.REG_DWORD, 128)
-                
-                # Increase SYN attack protection with SYN cookies
-                winreg.SetValueEx(key, "SynAttackProtect", 0, winreg.REG_DWORD, 1)
-                
-                # Set the TCP window size calculated above
-                winreg.SetValueEx(key, "TcpWindowSize", 0, winreg.REG_DWORD, tcp_window_size)
-                
-                # Enable TCP Fast Path processing for performance
-                winreg.SetValueEx(key, "EnableTCPA", 0, winreg.REG_DWORD, 1)
-                
-                # Set maximum connections
-                winreg.SetValueEx(key, "TcpNumConnections", 0, winreg.REG_DWORD, 0xFFFFFFE)
-                
-            # Also optimize TCP chimney offload if supported
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, tcp_params_path, 0, winreg.KEY_READ | winreg.KEY_WRITE) as key:
+                # Advanced congestion control provider selection
+                _set_windows_congestion_provider(key)
+            
+            writes = [(tcp_params_path, name, value) for name, value in _TCP_PARAMETERS]
+            
+            # Also set the MTU on interfaces that have IP addresses. Collect the
+            # subkey names first so the parent key is released before writing.
+            interface_paths = []
             try:
-                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r'SYSTEM\CurrentControlSet\Services\Tcpip\Parameters\Interfaces', 0, winreg.KEY_READ) as interfaces_key:
-                    # Get the number of interfaces
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, f"{tcp_params_path}\\Interfaces", 0, winreg.KEY_READ) as interfaces_key:
                     num_interfaces = winreg.QueryInfoKey(interfaces_key)[0]
-                    
-                    # For each interface
                     for i in range(num_interfaces):
-                        interface_name = winreg.EnumKey(interfaces_key, i)
-                        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, f"{tcp_params_path}\\Interfaces\\{interface_name}", 0, winreg.KEY_WRITE) as interface_key:
-                            # Only set for interfaces that have IP addresses
-                            try:
+                        interface_path = f"{tcp_params_path}\\Interfaces\\{winreg.EnumKey(interfaces_key, i)}"
+                        try:
+                            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, interface_path, 0, winreg.KEY_READ) as interface_key:
                                 winreg.QueryValueEx(interface_key, "IPAddress")
-                                # Set optimal MTU
-                                winreg.SetValueEx(interface_key, "MTU", 0, winreg.REG_DWORD, 1500)
-                            except Exception:
-                                # No IP address, skip
-                                pass
+                            interface_paths.append(interface_path)
+                        except Exception:
+                            # No IP address, skip
+                            pass
             except Exception as e:
                 logger.warning(f"Skipping interface-specific optimizations: {e}")
+            
+            # Set optimal MTU
+            writes.extend((path, "MTU", 1500) for path in interface_paths)
+            
+            # Commit everything in one registry transaction when KTM is available,
+            # otherwise fall back to plain per-key writes
+            if not _set_registry_dwords_transacted(writes):
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, tcp_params_path, 0, winreg.KEY_WRITE) as key:
+                    for name, value in _TCP_PARAMETERS:
+                        winreg.SetValueEx(key, name, 0, winreg.REG_DWORD, value)
+                
+                for path in interface_paths:
+                    try:
+                        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path, 0, winreg.KEY_WRITE) as interface_key:
+                            winreg.SetValueEx(interface_key, "MTU", 0, winreg.REG_DWORD, 1500)
+                    except Exception as e:
+                        logger.warning(f"Could not set MTU for {path}: {e}")
                 
             # Optimization for network acceleration
             global_params_path = r'SYSTEM\CurrentControlSet\Services\Tcpip\Parameters\Winsock'
@@ -141,18 +498,30 @@ def _optimize_windows_tcp() -> bool:
             logger.warning(f"Could not complete TCP registry optimizations: {e}")
             success = False
             
-        # 4. Reset Windows networking components if needed (only in aggressive mode)
+        # 2. Reset Windows networking components if needed (only in aggressive mode)
         try:
-            # Check Windows DNS resolver cache size
-            dns_cache_output = subprocess.check_output(
+            # Check Windows DNS resolver cache size, reading the output line by
+            # line and stopping as soon as we have seen enough records
+            record_count = 0
+            proc = subprocess.Popen(
                 ["ipconfig", "/displaydns"], 
-                universal_newlines=True,
+                stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
                 creationflags=subprocess.CREATE_NO_WINDOW
             )
+            try:
+                for line in proc.stdout:
+                    if b"Record Name" in line:
+                        record_count += 1
+                        if record_count > _DNS_CACHE_FLUSH_THRESHOLD:
+                            proc.terminate()
+                            break
+            finally:
+                proc.stdout.close()
+                proc.wait()
             
             # If DNS cache is very large (more than 200 entries), flush it
-            if dns_cache_output.count("Record Name") > 200:
+            if record_count > _DNS_CACHE_FLUSH_THRESHOLD:
                 logger.info("Flushing DNS cache due to large size")
                 subprocess.run(
                     ["ipconfig", "/flushdns"],
@@ -169,61 +538,65 @@ def _optimize_windows_tcp() -> bool:
         return False
 
 
+def _write_proc_sysctl(param: str, value: str) -> bool:
+    """
+    Set a Linux sysctl by writing to /proc/sys directly.
+    
+    Args:
+        param: Dotted sysctl name (e.g. net.ipv4.tcp_fastopen)
+        value: Value to write
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    path = "/proc/sys/" + param.replace(".", "/")
+    if path not in _SYSCTL_WRITABLE:
+        _SYSCTL_WRITABLE[path] = os.access(path, os.W_OK)
+        if not _SYSCTL_WRITABLE[path]:
+            logger.warning(f"Cannot set {param}: {path} is not writable")
+    if not _SYSCTL_WRITABLE[path]:
+        return False
+    try:
+        with open(path, "w") as f:
+            f.write(value)
+        return True
+    except OSError as e:
+        logger.warning(f"Failed to set {param}={value}: {e}")
+        return False
+
+
+def _set_sysctl(param: str, value: str) -> bool:
+    """
+    Set a Linux sysctl, skipping writes already applied in this process.
+    
+    Args:
+        param: Dotted sysctl name
+        value: Value to write
+        
+    Returns:
+        True if the value is in place, False otherwise
+    """
+    if (param, value) in _APPLIED_SYSCTLS:
+        return True
+    if not _write_proc_sysctl(param, value):
+        return False
+    _APPLIED_SYSCTLS.add((param, value))
+    return True
+
+
 def _optimize_linux_tcp() -> bool:
     """Optimize TCP settings on Linux."""
     try:
-        # Define a list of sysctl parameters to optimize
-        optimizations = [
-            # Increase TCP window sizes
-            ("net.ipv4.tcp_rmem", "4096 87380 16777216"),
-            ("net.ipv4.tcp_wmem", "4096 65536 16777216"),
-            ("net.core.rmem_max", "16777216"),
-            ("net.core.wmem_max", "16777216"),
-            
-            # Enable TCP window scaling
-            ("net.ipv4.tcp_window_scaling", "1"),
-            
-            # Enable fast TCP connections
-            ("net.ipv4.tcp_fastopen", "3"),
-            
-            # Disable TCP slow-start after idle
-            ("net.ipv4.tcp_slow_start_after_idle", "0"),
-            
-            # Increase maximum backlog
-            ("net.core.netdev_max_backlog", "2500"),
-            ("net.core.somaxconn", "4096"),
-            
-            # Enable BPF JIT compiler
-            ("net.core.bpf_jit_enable", "1"),
-            
-            # Set congestion control to BBR if available
-            ("net.ipv4.tcp_congestion_control", "bbr")
-        ]
-        
+        # Write each parameter straight to /proc/sys instead of forking sysctl;
+        # a failed write (e.g. BBR not built) does not stop the others
         success = True
-        for param, value in optimizations:
-            try:
-                # Try to set the parameter
-                stdout, stderr, returncode = run_command(
-                    ["sysctl", "-w", f"{param}={value}"],
-                    check=True
-                )
-                if returncode != 0:
-                    success = False
-                    logger.warning(f"Failed to set {param}={value}")
-            except Exception as e:
-                logger.warning(f"Error setting {param}: {e}")
+        for param, value in _LINUX_SYSCTL_OPTS:
+            if not _set_sysctl(param, value):
                 success = False
                 
         # If BBR is not available, try cubic as fallback
         if not success:
-            try:
-                run_command(
-                    ["sysctl", "-w", "net.ipv4.tcp_congestion_control=cubic"],
-                    check=False
-                )
-            except Exception:
-                pass
+            _set_sysctl("net.ipv4.tcp_congestion_control", "cubic")
                 
         return success
     except Exception as e:
@@ -234,42 +607,11 @@ def _optimize_linux_tcp() -> bool:
 def _optimize_macos_tcp() -> bool:
     """Optimize TCP settings on macOS."""
     try:
-        # Define a list of sysctl parameters to optimize
-        optimizations = [
-            # Increase TCP buffer sizes
-            ("net.inet.tcp.sendspace", "262144"),
-            ("net.inet.tcp.recvspace", "262144"),
-            
-            # Increase socket buffer size
-            ("kern.ipc.maxsockbuf", "8388608"),
-            
-            # Disable TCP delayed ACKs for faster response
-            ("net.inet.tcp.delayed_ack", "0"),
-            
-            # Enable TCP window scaling
-            ("net.inet.tcp.rfc1323", "1"),
-            
-            # Set a good default MSS
-            ("net.inet.tcp.mssdflt", "1448"),
-            
-            # Enable TCP Fast Open if available
-            ("net.inet.tcp.fastopen", "1")
-        ]
-        
-        success = True
-        for param, value in optimizations:
-            try:
-                # Try to set the parameter
-                stdout, stderr, returncode = run_command(
-                    ["sysctl", "-w", f"{param}={value}"],
-                    check=True
-                )
-                if returncode != 0:
-                    success = False
-                    logger.warning(f"Failed to set {param}={value}")
-            except Exception as e:
-                logger.warning(f"Error setting {param}: {e}")
-                success = False
+        # BSD sysctl accepts several assignments, so set them all in one process
+        stdout, stderr, returncode = run_command(_MACOS_SYSCTL_ARGV, check=False)
+        success = returncode == 0
+        if not success:
+            logger.warning(f"Failed to set some TCP parameters: {stderr}")
                 
         # Additional optimization: set the TCP congestion control algorithm if available
         try:
@@ -283,7 +625,7 @@ def _optimize_macos_tcp() -> bool:
                 # Set cubic as the congestion control algorithm (available on newer macOS)
                 run_command(
                     ["sysctl", "-w", "net.inet.tcp.cc.algorithm=cubic"],
-                    check=False
+                    check=False, capture_output=False
                 )
         except Exception as e:
             logger.warning(f"Error setting TCP congestion control: {e}")
@@ -324,220 +666,355 @@ def optimize_wifi_settings(interface: Optional[str] = None) -> bool:
             logger.error("No wireless interface found")
             return False
             
-        if platform.system() == "Windows":
-            return _optimize_windows_wifi(interface)
-        elif platform.system() == "Linux":
-            return _optimize_linux_wifi(interface)
-        elif platform.system() == "Darwin":  # macOS
-            return _optimize_macos_wifi(interface)
+        optimizer = _WIFI_OPT.get(_OS)
+        if optimizer:
+            return optimizer(interface)
     except Exception as e:
         logger.error(f"Error optimizing WiFi settings: {e}")
     return False
 
 
-def _optimize_windows_wifi(interface: str) -> bool:
-    """Optimize WiFi settings on Windows with advanced algorithms."""
-    try:
-        success = True
-        logger.info(f"Applying advanced Windows WiFi optimizations for interface {interface}")
-            
-        # 1. Advanced power management optimization
-        # Disable power saving with more nuanced control for the wireless adapter
+def _get_standard_cimv2():
+    """Return a cached WMI connection to root\\StandardCimv2, or None if unavailable."""
+    if "connection" not in _STANDARD_CIMV2:
         try:
-            # Try the most comprehensive power management command first
-            stdout, stderr, returncode = run_command([
-                "powershell", 
-                f"Set-NetAdapterPowerManagement -Name '{interface}' -SelectiveSuspend Disabled -WakeOnMagicPacket Disabled -WakeOnPattern Disabled -DeviceSleepOnDisconnect Disabled -NSOffload Disabled"
-            ], check=False)
-            
-            if returncode != 0:
-                # Fall back to simpler command if the advanced version fails
-                logger.warning(f"Advanced power management failed, trying simplified version")
-                run_command([
-                    "powershell", 
-                    f"Set-NetAdapterPowerManagement -Name '{interface}' -WakeOnMagicPacket Disabled -WakeOnPattern Disabled"
-                ], check=False)
+            import win32com.client
+            _STANDARD_CIMV2["connection"] = win32com.client.GetObject(r"winmgmts:\\.\root\StandardCimv2")
         except Exception as e:
-            logger.warning(f"Could not fully optimize power management for {interface}: {e}")
-            success = False
-            
-        # 2. Dynamic power plan optimization based on connection quality
+            logger.debug(f"WMI StandardCimv2 namespace not available: {e}")
+            _STANDARD_CIMV2["connection"] = None
+    return _STANDARD_CIMV2["connection"]
+
+
+def _set_windows_power_management_wmi(interface: str) -> bool:
+    """
+    Disable adapter power saving through MSFT_NetAdapterPowerManagementSettingData.
+    
+    This is what Set-NetAdapterPowerManagement does under the hood, without
+    starting a PowerShell host.
+    
+    Args:
+        interface: Adapter name
+        
+    Returns:
+        True if the settings were written, False if WMI could not be used
+    """
+    import pythoncom
+    
+    # Called from executor threads; join the MTA so the cached connection
+    # can be shared between them
+    pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+    connection = _get_standard_cimv2()
+    if connection is None:
+        return False
+    
+    name = interface.replace("'", "''")
+    settings = list(connection.ExecQuery(
+        f"SELECT * FROM MSFT_NetAdapterPowerManagementSettingData WHERE Name = '{name}'"
+    ))
+    if not settings:
+        return False
+    
+    for setting in settings:
         try:
-            # Check signal strength to determine appropriate power plan
-            from signal_booster.network.platform.dispatcher import get_wifi_signal_strength
-            signal_strength = get_wifi_signal_strength()
-            
-            # Choose power plan based on signal quality
-            if signal_strength < 40:
-                # Poor signal - use ultimate performance for max transmit power
-                power_plan_name = "Ultimate Performance"
-                guid_pattern = "Ultimate[\\s_]Performance"
-            else:
-                # Good signal - use high performance (less aggressive)
-                power_plan_name = "High performance"
-                guid_pattern = "High[\\s_]performance"
-                
-            # Get power plans with adaptive matching
-            stdout, stderr, returncode = run_command(["powercfg", "-list"])
-            
-            # Find the right performance GUID with flexible pattern matching
-            target_guid = None
-            if stdout:
-                for line in stdout.split('\n'):
-                    if re.search(guid_pattern, line, re.IGNORECASE):
-                        match = re.search(r"([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})", line, re.IGNORECASE)
-                        if match:
-                            target_guid = match.group(1)
-                            break
-                            
-            # If we found the target power plan, activate it
-            if target_guid:
-                logger.info(f"Setting {power_plan_name} power plan for optimal WiFi performance")
-                run_command(["powercfg", "-setactive", target_guid], check=False)
-            else:
-                # If target wasn't found, create Ultimate Performance plan if needed
-                if signal_strength < 40 and not target_guid:
-                    logger.info("Creating Ultimate Performance power plan for maximum WiFi performance")
-                    create_result = run_command(["powercfg", "-duplicatescheme", "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c"])
-                    if create_result[2] == 0 and create_result[0]:
-                        # Extract the new GUID from output
-                        new_guid_match = re.search(r"([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})", create_result[0])
-                        if new_guid_match:
-                            target_guid = new_guid_match.group(1)
-                            # Set the new plan active
-                            run_command(["powercfg", "-setactive", target_guid], check=False)
-                            # Rename it for clarity
-                            run_command(["powercfg", "-changename", target_guid, "Signal Booster Ultimate Performance", 
-                                       "Maximum performance power plan created by Signal Booster"], check=False)
-        except Exception as e:
-            logger.warning(f"Could not optimize power plan: {e}")
+            setting.SelectiveSuspend = False
+            setting.WakeOnMagicPacket = False
+            setting.WakeOnPattern = False
+            setting.DeviceSleepOnDisconnect = False
+            setting.NSOffload = False
+            setting.Put_()
+        except Exception:
+            # Fall back to the properties every adapter supports
+            logger.warning("Advanced power management failed, trying simplified version")
+            setting = connection.ExecQuery(
+                f"SELECT * FROM MSFT_NetAdapterPowerManagementSettingData WHERE Name = '{name}'"
+            ).ItemIndex(0)
+            setting.WakeOnMagicPacket = False
+            setting.WakeOnPattern = False
+            setting.Put_()
+    return True
 
-        # 3. Advanced wireless adapter optimization with dynamic parameters
+
+def _set_windows_power_management(interface: str) -> bool:
+    """Disable power saving features on a Windows wireless adapter."""
+    try:
         try:
-            # Get adapter properties to determine ideal settings
-            import subprocess
-            
-            # First, check if we can get detailed adapter info
-            adapter_info = subprocess.check_output(
-                ["netsh", "wlan", "show", "interfaces"], 
-                universal_newlines=True,
-                stderr=subprocess.DEVNULL,
-                creationflags=subprocess.CREATE_NO_WINDOW
+            if _set_windows_power_management_wmi(interface):
+                return True
+        except Exception as e:
+            logger.debug(f"WMI power management failed for {interface}, using PowerShell: {e}")
+        
+        # Try the most comprehensive power management command first
+        stdout, stderr, returncode = run_powershell(
+            f"Set-NetAdapterPowerManagement -Name '{interface}' -SelectiveSuspend Disabled -WakeOnMagicPacket Disabled -WakeOnPattern Disabled -DeviceSleepOnDisconnect Disabled -NSOffload Disabled"
+        )
+        
+        if returncode != 0:
+            # Fall back to simpler command if the advanced version fails
+            logger.warning("Advanced power management failed, trying simplified version")
+            run_powershell(
+                f"Set-NetAdapterPowerManagement -Name '{interface}' -WakeOnMagicPacket Disabled -WakeOnPattern Disabled"
             )
+        return True
+    except Exception as e:
+        logger.warning(f"Could not fully optimize power management for {interface}: {e}")
+        return False
+
+
+async def _run_async(command: List[str], text: bool = True) -> Tuple[Any, Optional[str], int]:
+    """
+    Run a command without a console window and without blocking the event loop.
+    
+    Args:
+        command: Command to run (list)
+        text: Decode stdout to str; raw bytes are returned otherwise
+        
+    Returns:
+        Tuple of (stdout, stderr, returncode), like run_command
+    """
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        )
+        stdout, stderr = await proc.communicate()
+        if text:
+            stdout = stdout.decode(errors="replace")
+        return stdout, stderr.decode(errors="replace"), proc.returncode
+    except Exception as e:
+        logger.error(f"Error running command {command}: {e}")
+        return None, str(e), 1
+
+
+def _optimize_windows_wifi(interface: str) -> bool:
+    """Optimize WiFi settings on Windows with advanced algorithms."""
+    try:
+        return asyncio.run(_optimize_windows_wifi_async(interface))
+    except Exception as e:
+        logger.error(f"Error in advanced Windows WiFi optimization: {e}")
+        return False
+
+
+async def _optimize_windows_wifi_async(interface: str) -> bool:
+    """Overlap the Windows WiFi optimizer's commands on one event loop."""
+    success = True
+    logger.info(f"Applying advanced Windows WiFi optimizations for interface {interface}")
+    
+    from signal_booster.network.platform.dispatcher import get_wifi_signal_strength
+    
+    # Independent probes (and the power-management change) are launched
+    # together; only commands that need their output wait on them below
+    loop = asyncio.get_running_loop()
+    power_ok, signal_strength, plans_result, wlan_result, service_result = await asyncio.gather(
+        loop.run_in_executor(None, _set_windows_power_management, interface),
+        loop.run_in_executor(None, get_wifi_signal_strength),
+        _run_async(["powercfg", "-list"]),
+        _run_async(["netsh", "wlan", "show", "interfaces"], text=False),
+        _run_async(["sc", "qc", "WlanSvc"])
+    )
+    
+    # 1. Advanced power management optimization
+    # Disable power saving with more nuanced control for the wireless adapter
+    if not power_ok:
+        success = False
+    
+    # Commands that only depend on the probes above, applied together
+    pending = []
+    
+    # 2. Dynamic power plan optimization based on connection quality
+    try:
+        # Choose power plan based on signal quality
+        if signal_strength < 40:
+            # Poor signal - use ultimate performance for max transmit power
+            power_plan_name = "Ultimate Performance"
+            plan_re = _ULTIMATE_RE
+        else:
+            # Good signal - use high performance (less aggressive)
+            power_plan_name = "High performance"
+            plan_re = _HIGH_RE
             
-            # Parse radio type to determine capabilities
-            radio_type = "802.11n"  # Default assumption
-            if "802.11ac" in adapter_info:
-                radio_type = "802.11ac"
-            elif "802.11ax" in adapter_info:
-                radio_type = "802.11ax"
-                
-            # Parse band to determine frequency
-            band_5ghz = "5.0 GHz" in adapter_info or "5GHz" in adapter_info
-            
-            # Set auto config based on conditions
-            if signal_strength > 60:
-                # Disable auto config on good connections (better stability)
-                run_command([
-                    "netsh", "wlan", "set", "autoconfig", 
-                    "enabled=no", f"interface=\"{interface}\""
-                ], check=False)
-            else:
-                # Enable auto config on poor connections (help with roaming)
-                run_command([
-                    "netsh", "wlan", "set", "autoconfig", 
-                    "enabled=yes", f"interface=\"{interface}\""
-                ], check=False)
-            
-            # Set channel width based on radio type and signal quality
-            channel_width_cmd = "channel=auto"
-            if radio_type in ("802.11ac", "802.11ax") and band_5ghz and signal_strength > 70:
-                # For 5GHz with excellent signal on AC/AX, use maximum width
-                channel_width_cmd = "mode=auto width=80"  # Use 80MHz channels
-            elif band_5ghz and signal_strength > 50:
-                # For 5GHz with good signal, use standard width
-                channel_width_cmd = "mode=auto width=40"  # Use 40MHz channels
-            else:
-                # For 2.4GHz or poor signal, use narrow channels
-                channel_width_cmd = "mode=auto width=20"  # Use 20MHz channels for stability
-                
-            # Apply channel width setting
-            run_command([
-                "netsh", "wlan", "set", "channelwidth", 
-                f"interface=\"{interface}\"", channel_width_cmd
-            ], check=False)
-            
-            # Optimize roaming aggressiveness based on signal strength
-            _optimize_roaming_settings(interface, signal_strength)
+        # Get power plans with adaptive matching
+        stdout, stderr, returncode = plans_result
+        
+        # Find the right performance GUID with flexible pattern matching
+        target_guid = None
+        if stdout:
+            for line in stdout.splitlines():
+                if plan_re.search(line):
+                    match = _GUID_RE.search(line)
+                    if match:
+                        target_guid = match.group(1)
+                        break
+                        
+        # If we found the target power plan, activate it
+        if target_guid:
+            logger.info(f"Setting {power_plan_name} power plan for optimal WiFi performance")
+            pending.append(_run_async(["powercfg", "-setactive", target_guid]))
+        else:
+            # If target wasn't found, create Ultimate Performance plan if needed
+            if signal_strength < 40 and not target_guid:
+                logger.info("Creating Ultimate Performance power plan for maximum WiFi performance")
+                create_result = await _run_async(["powercfg", "-duplicatescheme", "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c"])
+                if create_result[2] == 0 and create_result[0]:
+                    # Extract the new GUID from output
+                    new_guid_match = _GUID_RE.search(create_result[0])
+                    if new_guid_match:
+                        target_guid = new_guid_match.group(1)
+                        # Set the new plan active and rename it for clarity
+                        pending.append(_run_async(["powercfg", "-setactive", target_guid]))
+                        pending.append(_run_async(["powercfg", "-changename", target_guid, "Signal Booster Ultimate Performance", 
+                                                   "Maximum performance power plan created by Signal Booster"]))
+    except Exception as e:
+        logger.warning(f"Could not optimize power plan: {e}")
+
+    # 3. Advanced wireless adapter optimization with dynamic parameters
+    try:
+        # Get adapter properties to determine ideal settings
+        adapter_info = wlan_result[0] or b""
+        
+        # Parse radio type and band in a single pass over the output
+        radio_type = "802.11n"  # Default assumption
+        radio_found = False
+        band_5ghz = False
+        for match in _WLAN_INFO_RE.finditer(adapter_info):
+            if match.group("radio") and not radio_found:
+                radio_type = match.group("radio").decode("ascii")
+                radio_found = True
+            elif match.group("ch") and int(match.group("ch")) > 14:
+                band_5ghz = True
+            elif match.group("b5"):
+                band_5ghz = True
             
-        except Exception as e:
-            logger.warning(f"Could not apply all wireless adapter optimizations: {e}")
-            success = False
+        # Set auto config based on conditions
+        if signal_strength > 60:
+            # Disable auto config on good connections (better stability)
+            pending.append(_run_async([
+                "netsh", "wlan", "set", "autoconfig", 
+                "enabled=no", f"interface=\"{interface}\""
+            ]))
+        else:
+            # Enable auto config on poor connections (help with roaming)
+            pending.append(_run_async([
+                "netsh", "wlan", "set", "autoconfig", 
+                "enabled=yes", f"interface=\"{interface}\""
+            ]))
+        
+        # Set channel width based on radio type and signal quality
+        channel_width_cmd = "channel=auto"
+        if radio_type in ("802.11ac", "802.11ax") and band_5ghz and signal_strength > 70:
+            # For 5GHz with excellent signal on AC/AX, use maximum width
+            channel_width_cmd = "mode=auto width=80"  # Use 80MHz channels
+        elif band_5ghz and signal_strength > 50:
+            # For 5GHz with good signal, use standard width
+            channel_width_cmd = "mode=auto width=40"  # Use 40MHz channels
+        else:
+            # For 2.4GHz or poor signal, use narrow channels
+            channel_width_cmd = "mode=auto width=20"  # Use 20MHz channels for stability
             
-        # 4. WiFi service optimization
-        try:
-            # Check and optimize WLAN AutoConfig service
-            service_result = run_command(["sc", "qc", "WlanSvc"])
-            if service_result[2] == 0:
-                # Make sure it's set to auto-start and is running
-                run_command(["sc", "config", "WlanSvc", "start=", "auto"], check=False)
-                run_command(["sc", "start", "WlanSvc"], check=False)
-            
-            # Disable Windows WiFi Sense if present (to avoid auto-connections)
-            try:
-                import winreg
-                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\WcmSvc\wifinetworkmanager\config", 0, winreg.KEY_WRITE) as key:
-                    winreg.SetValueEx(key, "AutoConnectAllowedOEM", 0, winreg.REG_DWORD, 0)
-            except Exception:
-                pass  # May not exist on all Windows versions
-        except Exception as e:
-            logger.warning(f"Could not optimize WiFi services: {e}")
+        # Apply channel width setting
+        pending.append(_run_async([
+            "netsh", "wlan", "set", "channelwidth", 
+            f"interface=\"{interface}\"", channel_width_cmd
+        ]))
         
-        logger.info("Windows WiFi optimization complete")
-        return success
+        # Optimize roaming aggressiveness based on signal strength
+        _optimize_roaming_settings(interface, signal_strength)
     except Exception as e:
-        logger.error(f"Error in advanced Windows WiFi optimization: {e}")
-        return False
+        logger.warning(f"Could not apply all wireless adapter optimizations: {e}")
+        success = False
+        
+    # 4. WiFi service optimization
+    try:
+        # Check and optimize WLAN AutoConfig service
+        if service_result[2] == 0:
+            # Make sure it's set to auto-start and is running
+            async def _ensure_wlan_service():
+                await _run_async(["sc", "config", "WlanSvc", "start=", "auto"])
+                await _run_async(["sc", "start", "WlanSvc"])
+            pending.append(_ensure_wlan_service())
+        
+        # Disable Windows WiFi Sense if present (to avoid auto-connections)
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\WcmSvc\wifinetworkmanager\config", 0, winreg.KEY_WRITE) as key:
+                winreg.SetValueEx(key, "AutoConnectAllowedOEM", 0, winreg.REG_DWORD, 0)
+        except Exception:
+            pass  # May not exist on all Windows versions
+    except Exception as e:
+        logger.warning(f"Could not optimize WiFi services: {e}")
+    
+    await asyncio.gather(*pending)
+    
+    logger.info("Windows WiFi optimization complete")
+    return success
+
+
+def _find_adapter_key(interface: str) -> Optional[str]:
+    """
+    Find the network class registry subkey for an adapter.
+    
+    The class key is walked once and the DriverDesc -> subkey mapping is
+    cached for later calls.
+    
+    Args:
+        interface: Interface name or adapter description
+        
+    Returns:
+        Registry path of the adapter's subkey, or None if not found
+    """
+    import winreg
+    
+    if not _ADAPTER_KEY_CACHE:
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, _NET_CLASS_PATH, 0, winreg.KEY_READ) as adapters_key:
+            subkey_names = [winreg.EnumKey(adapters_key, i) for i in range(winreg.QueryInfoKey(adapters_key)[0])]
+        
+        for adapter_key_name in subkey_names:
+            adapter_path = f"{_NET_CLASS_PATH}\\{adapter_key_name}"
+            try:
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, adapter_path, 0, winreg.KEY_READ) as adapter_key:
+                    adapter_desc = winreg.QueryValueEx(adapter_key, "DriverDesc")[0]
+                _ADAPTER_KEY_CACHE[adapter_desc.lower()] = adapter_path
+            except Exception as e:
+                logger.debug(f"Skipping adapter key {adapter_key_name}: {e}")
+    
+    name = interface.lower()
+    adapter_path = _ADAPTER_KEY_CACHE.get(name)
+    if adapter_path is None:
+        # Fall back to a substring match on the cached descriptions
+        adapter_path = next((path for desc, path in _ADAPTER_KEY_CACHE.items() if name in desc), None)
+    return adapter_path
 
 
 def _optimize_roaming_settings(interface, signal_strength):
     """Helper function to optimize WiFi roaming settings."""
-            try:
-                import winreg
+    try:
+        import winreg
+        
+        # Find the adapter's registry key
+        adapter_path = _find_adapter_key(interface)
+        if not adapter_path:
+            logger.debug(f"No adapter registry key found for {interface}")
+            return
+        
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, adapter_path, 0,
+                                winreg.KEY_READ | winreg.KEY_WRITE | winreg.KEY_WOW64_64KEY) as adapter_key:
+                # Set roaming aggressiveness
+                # Higher for poor signal (more aggressive roaming)
+                # Lower for good signal (more stability)
+                roaming_value = 5 if signal_strength < 50 else 1
+                winreg.SetValueEx(adapter_key, "RoamingAggressiveness", 0, winreg.REG_DWORD, roaming_value)
                 
-                # Find the adapter's registry key
-                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SYSTEM\CurrentControlSet\Control\Class\{4d36e972-e325-11ce-bfc1-08002be10318}", 0, winreg.KEY_READ) as adapters_key:
-                    # Get number of subkeys
-                    subkey_count = winreg.QueryInfoKey(adapters_key)[0]
-                    
-                    # Look through each adapter
-                    for i in range(subkey_count):
-                        adapter_key_name = None
-                        try:
-                            # Open the adapter's key
-                            adapter_key_name = winreg.EnumKey(adapters_key, i)
-                            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, f"SYSTEM\\CurrentControlSet\\Control\\Class\\{{4d36e972-e325-11ce-bfc1-08002be10318}}\\{adapter_key_name}", 0, winreg.KEY_READ | winreg.KEY_WRITE) as adapter_key:
-                                # Check if it's the right adapter (contains the interface name)
-                                try:
-                                    adapter_desc = winreg.QueryValueEx(adapter_key, "DriverDesc")[0]
-                                    if interface.lower() in adapter_desc.lower():
-                                        # Found the right adapter
-                                            # Set roaming aggressiveness
-                                            # Higher for poor signal (more aggressive roaming)
-                                            # Lower for good signal (more stability)
-                                            roaming_value = 5 if signal_strength < 50 else 1
-                                            winreg.SetValueEx(adapter_key, "RoamingAggressiveness", 0, winreg.REG_DWORD, roaming_value)
-                                            
-                                            # Also set Transmit Power to maximum
-                                            winreg.SetValueEx(adapter_key, "TransmitPower", 0, winreg.REG_DWORD, 100)
-                                            
-                                            logger.info(f"Set roaming aggressiveness to {roaming_value} and maximum transmit power")
+                # Also set Transmit Power to maximum
+                winreg.SetValueEx(adapter_key, "TransmitPower", 0, winreg.REG_DWORD, 100)
+                
+                logger.info(f"Set roaming aggressiveness to {roaming_value} and maximum transmit power")
         except Exception as e:
-                                            logger.warning(f"Cannot set advanced wireless parameters: {e}")
-                        except Exception as e:
-                            logger.debug(f"Skipping adapter key {adapter_key_name}: {e}")
-            except Exception as e:
-                logger.warning(f"Could not optimize adapter-specific registry settings: {e}")
+            logger.warning(f"Cannot set advanced wireless parameters: {e}")
+    except Exception as e:
+        logger.warning(f"Could not optimize adapter-specific registry settings: {e}")
 
 
 def _optimize_linux_wifi(interface: str) -> bool:
@@ -557,29 +1034,26 @@ def _optimize_linux_wifi(interface: str) -> bool:
             
         # Alternative method using iwconfig
         try:
-            run_command(["iwconfig", interface, "power", "off"], check=False)
+            run_command(["iwconfig", interface, "power", "off"], check=False, capture_output=False)
         except Exception as e:
             logger.warning(f"Could not disable power saving using iwconfig: {e}")
             
         # Set WiFi regulatory domain for maximum power
         try:
-            run_command(["iw", "reg", "set", "US"], check=False)
+            run_command(["iw", "reg", "set", "US"], check=False, capture_output=False)
         except Exception as e:
             logger.warning(f"Could not set WiFi regulatory domain: {e}")
             
         # Set the wireless txpower to maximum
         try:
-            run_command(["iwconfig", interface, "txpower", "auto"], check=False)
+            run_command(["iwconfig", interface, "txpower", "auto"], check=False, capture_output=False)
         except Exception as e:
             logger.warning(f"Could not set txpower for {interface}: {e}")
             
         # Optimize kernel WiFi parameters
-        try:
-            # Disable hardware scanning throttling
-            with open("/proc/sys/net/ipv4/tcp_slow_start_after_idle", "w") as f:
-                f.write("0")
-        except Exception as e:
-            logger.warning(f"Could not modify kernel WiFi parameters: {e}")
+        # Disable TCP slow-start after idle (a no-op if the TCP optimizer already did)
+        if not _set_sysctl("net.ipv4.tcp_slow_start_after_idle", "0"):
+            logger.warning("Could not modify kernel WiFi parameters")
             
         # Find and switch to the best channel
         try:
@@ -626,7 +1100,7 @@ def _optimize_macos_wifi(interface: str) -> bool:
             if signal_strength > 60:  # Only if signal is good
                 stdout, stderr, returncode = run_command([
                     "networksetup", "-setMTU", wifi_service, "1500"
-                ], check=True)
+                ], check=True, capture_output=False)
                 
                 if returncode != 0:
                     success = False
@@ -636,10 +1110,10 @@ def _optimize_macos_wifi(interface: str) -> bool:
             
         # Optimize TCP settings for WiFi
         try:
-            run_command(["sysctl", "-w", "net.inet.tcp.delayed_ack=0"], check=False)
+            run_command(["sysctl", "-w", "net.inet.tcp.delayed_ack=0"], check=False, capture_output=False)
             
             # Set TCP maximum segment size (MSS) to a good value for WiFi
-            run_command(["sysctl", "-w", "net.inet.tcp.mssdflt=1448"], check=False)
+            run_command(["sysctl", "-w", "net.inet.tcp.mssdflt=1448"], check=False, capture_output=False)
         except Exception as e:
             logger.warning(f"Could not optimize TCP settings for WiFi: {e}")
             success = False
@@ -650,20 +1124,18 @@ def _optimize_macos_wifi(interface: str) -> bool:
         return False
 
 
-def prioritize_traffic() -> bool:
+def prioritize_traffic() -> Optional[bool]:
     """
     Configure Quality of Service to prioritize important traffic.
     
     Returns:
-        True if successful, False otherwise
+        True if successful, None if skipped because the link is not
+        congested (Linux), False otherwise
     """
     try:
-        if platform.system() == "Windows":
-            return _prioritize_windows_traffic()
-        elif platform.system() == "Linux":
-            return _prioritize_linux_traffic()
-        elif platform.system() == "Darwin":  # macOS
-            return _prioritize_macos_traffic()
+        optimizer = _TRAFFIC_OPT.get(_OS)
+        if optimizer:
+            return optimizer()
     except Exception as e:
         logger.error(f"Error prioritizing traffic: {e}")
     return False
@@ -686,7 +1158,7 @@ def _prioritize_windows_traffic() -> bool:
         # Enable the QoS Packet Scheduler if needed
         run_command([
             "netsh", "interface", "tcp", "set", "global", "ecncapability=enabled"
-        ], check=False)
+        ], check=False, capture_output=False)
         
         # In a real implementation, we would also set up specific traffic prioritization
         # rules for different applications, ports, etc.
@@ -698,14 +1170,398 @@ def _prioritize_windows_traffic() -> bool:
         return False
 
 
-def _prioritize_linux_traffic() -> bool:
-    """Configure QoS on Linux using tc (traffic control)."""
+def _htb_quantum(rate: str) -> int:
+    """
+    Compute an explicit HTB quantum for a class rate.
+    
+    Left to the default, HTB derives the quantum from r2q and warns when the
+    rates in the tree are far apart; rate/10 bytes (at least one MTU) avoids it.
+    
+    Args:
+        rate: tc rate string such as "5mbit"
+        
+    Returns:
+        Quantum in bytes
+    """
+    return max(1500, _tc_rate_bps(rate) // 8 // 10)
+
+
+def _tc_rate_bps(rate: str) -> int:
+    """Convert a tc rate string such as "5mbit" to bits per second."""
+    match = re.fullmatch(r"(\d+)([a-z]+)", rate)
+    return int(match.group(1)) * _TC_RATE_UNITS[match.group(2)]
+
+
+def _kernel_version() -> Tuple[int, int]:
+    """Return the running kernel's (major, minor) version, or (0, 0) if unknown."""
+    match = re.match(r"(\d+)\.(\d+)", os.uname().release)
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_libbpf():
+    """Load libbpf through ctypes, or return None if it is not installed."""
+    import ctypes.util
+    libbpf_name = ctypes.util.find_library("bpf")
+    if not libbpf_name:
+        return None
+    libbpf = ctypes.CDLL(libbpf_name, use_errno=True)
+    libbpf.bpf_link_create.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+    libbpf.bpf_obj_pin.argtypes = [ctypes.c_int, ctypes.c_char_p]
+    libbpf.bpf_obj_get.argtypes = [ctypes.c_char_p]
+    # bpf_link_get_info_by_fd is libbpf 1.2+; older releases only have the
+    # generic call with the same signature
+    if not hasattr(libbpf, "bpf_link_get_info_by_fd"):
+        libbpf.bpf_link_get_info_by_fd = libbpf.bpf_obj_get_info_by_fd
+    libbpf.bpf_link_get_info_by_fd.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint32)]
+    return libbpf
+
+
+def _pinned_tcx_ifindex(libbpf) -> Optional[int]:
+    """
+    Find which interface the pinned TCX link is attached to.
+    
+    Returns:
+        Interface index, 0 if the link is defunct or cannot be inspected, or
+        None if no link is pinned
+    """
+    if not os.path.exists(_TCX_PIN_PATH):
+        return None
+    link_fd = libbpf.bpf_obj_get(_TCX_PIN_PATH.encode())
+    if link_fd < 0:
+        return 0
     try:
-        # First check if we have the necessary tools
-        stdout, stderr, returncode = run_command(["which", "tc"])
-        if returncode != 0:
-            logger.error("Traffic control (tc) not found")
+        info = ctypes.create_string_buffer(_BPF_LINK_INFO_SIZE)
+        info_len = ctypes.c_uint32(len(info))
+        if libbpf.bpf_link_get_info_by_fd(link_fd, info, ctypes.byref(info_len)) != 0:
+            return 0
+        offset = _BPF_LINK_INFO_TCX_IFINDEX
+        return int.from_bytes(info.raw[offset:offset + 4], sys.byteorder)
+    finally:
+        os.close(link_fd)
+
+
+def _attach_classifier_tcx(ifindex: int, prog_fd: int) -> bool:
+    """
+    Attach a classifier to the TCX egress hook and pin the link.
+    
+    A link pinned by an earlier run is kept if it is on the same interface;
+    one left on another interface (or on one that is gone) is unpinned,
+    which detaches it, and the classifier is attached here instead.
+    
+    Args:
+        ifindex: Interface index
+        prog_fd: File descriptor of a loaded SCHED_CLS program
+        
+    Returns:
+        True if attached (or already pinned on this interface), False if TCX
+        could not be used
+    """
+    libbpf = _load_libbpf()
+    if libbpf is None:
+        return False
+    
+    pinned = _pinned_tcx_ifindex(libbpf)
+    if pinned == ifindex:
+        return True
+    if pinned is not None:
+        logger.debug(f"Moving TCX classifier from interface index {pinned} to {ifindex}")
+        os.unlink(_TCX_PIN_PATH)
+    
+    link_fd = libbpf.bpf_link_create(prog_fd, ifindex, _BPF_TCX_EGRESS, None)
+    if link_fd < 0:
+        # EOPNOTSUPP/EINVAL when the kernel lacks TCX
+        logger.debug(f"TCX attach failed: {os.strerror(-link_fd)}")
+        return False
+    try:
+        if libbpf.bpf_obj_pin(link_fd, _TCX_PIN_PATH.encode()) != 0:
+            logger.debug("Could not pin TCX link")
             return False
+    finally:
+        # Closing an unpinned link detaches the program again
+        os.close(link_fd)
+    return True
+
+
+def _attach_priority_bpf(interface: str) -> bool:
+    """
+    Classify priority ports with an eBPF program on the egress hook (TCX or clsact).
+    
+    Args:
+        interface: Interface to attach to
+        
+    Returns:
+        True if the classifier was attached, False if the interface was not found
+    """
+    from bcc import BPF
+    from pyroute2 import IPRoute
+    
+    port_match = " || ".join(f"dport == {port}" for port in _HTB_PRIORITY_PORTS)
+    source = (_PRIORITY_BPF_SRC
+              .replace("PORT_MATCH", port_match)
+              .replace("PRIORITY_CLASSID", hex(_HTB_ROOT | _HTB_PRIORITY_CLASS)))
+    fn = BPF(text=source).load_func("classify", BPF.SCHED_CLS)
+    
+    with IPRoute() as ipr:
+        links = ipr.link_lookup(ifname=interface)
+        if not links:
+            return False
+        index = links[0]
+        
+        # Prefer TCX, falling back to a clsact qdisc with a direct-action filter
+        if _kernel_version() >= _TCX_MIN_KERNEL and _attach_classifier_tcx(index, fn.fd):
+            return True
+        ipr.tc("add", "clsact", index)
+        ipr.tc("add-filter", "bpf", index, ":1", fd=fn.fd, name=fn.name,
+               parent=_CLSACT_EGRESS, prio=_CLSACT_FILTER_PRIO, classid=1, direct_action=True)
+    return True
+
+
+def _apply_htb_netlink(interface: str, allow_borrow: bool, u32_filters: bool = True) -> bool:
+    """
+    Build the HTB prioritization tree with pyroute2 over one netlink socket.
+    
+    Args:
+        interface: Interface to configure
+        allow_borrow: Use each class's ceil instead of capping it at its rate
+        u32_filters: Add u32 dport filters (not needed when the eBPF
+            classifier is attached)
+        
+    Returns:
+        True if the tree was installed, False if the interface was not found
+    """
+    from pyroute2 import IPRoute
+    
+    with IPRoute() as ipr:
+        links = ipr.link_lookup(ifname=interface)
+        if not links:
+            return False
+        index = links[0]
+        
+        # 1. Add a root qdisc with HTB (Hierarchical Token Bucket)
+        ipr.tc("add", "htb", index, _HTB_ROOT, default=_HTB_DEFAULT_CLASS)
+        
+        # 2. Add classes for different types of traffic
+        for minor, rate, ceil, prio in _HTB_CLASSES:
+            ipr.tc("add-class", "htb", index, _HTB_ROOT | minor,
+                   parent=_HTB_ROOT, rate=rate, ceil=ceil if allow_borrow else rate, prio=prio,
+                   quantum=_htb_quantum(rate))
+        
+        # 3. Add filters to classify traffic (match the destination port in
+        # the low half of the word at offset 20, like `u32 match ip dport`)
+        for port in _HTB_PRIORITY_PORTS if u32_filters else ():
+            ipr.tc("add-filter", "u32", index, parent=_HTB_ROOT, prio=1,
+                   protocol=socket.AF_INET, target=_HTB_ROOT | _HTB_PRIORITY_CLASS,
+                   keys=[f"0x{port:08x}/0x0000ffff+20"])
+    return True
+
+
+def _desired_htb_classes(allow_borrow: bool) -> Dict[str, Tuple[int, int, int]]:
+    """
+    Describe the HTB classes we install, in the shape `_get_htb_state` returns.
+    
+    Args:
+        allow_borrow: Whether classes may borrow up to their ceil
+        
+    Returns:
+        Dictionary of class handle ("1:10") to (rate, ceil, prio), rates in bytes/s
+    """
+    return {
+        f"1:{minor:x}": (_tc_rate_bps(rate) // 8, _tc_rate_bps(ceil if allow_borrow else rate) // 8, prio)
+        for minor, rate, ceil, prio in _HTB_CLASSES
+    }
+
+
+def _get_htb_state(interface: str) -> Optional[Dict[str, Tuple[int, int, int]]]:
+    """
+    Read the HTB tree currently installed on an interface with one tc dump.
+    
+    Args:
+        interface: Network interface name
+        
+    Returns:
+        Dictionary of class handle to (rate, ceil, prio), rates in bytes/s, or
+        None if our HTB root qdisc is not installed or tc has no JSON output
+    """
+    stdout, _, returncode = run_command([_TC_PATH, "-j", "qdisc", "show", "dev", interface], close_fds=False)
+    if returncode != 0 or not stdout:
+        return None
+    if not any(q.get("kind") == "htb" and q.get("handle") == "1:" and q.get("root") for q in json.loads(stdout)):
+        return None
+    
+    stdout, _, returncode = run_command([_TC_PATH, "-j", "class", "show", "dev", interface], close_fds=False)
+    if returncode != 0 or not stdout:
+        return None
+    return {
+        c["handle"]: (c.get("rate", 0), c.get("ceil", 0), c.get("prio", 0))
+        for c in json.loads(stdout)
+        if c.get("class") == "htb" and c.get("parent") == "1:"
+    }
+
+
+def _update_htb_tc(interface: str, allow_borrow: bool, state: Dict[str, Tuple[int, int, int]]) -> int:
+    """
+    Bring an installed HTB tree in line with `_HTB_CLASSES`, touching only
+    the classes that differ.
+    
+    Args:
+        interface: Network interface name
+        allow_borrow: Whether classes may borrow up to their ceil
+        state: Current classes, as returned by `_get_htb_state`
+        
+    Returns:
+        Number of tc writes issued (0 when the tree is already up to date)
+    """
+    desired = _desired_htb_classes(allow_borrow)
+    writes = 0
+    for minor, rate, ceil, prio in _HTB_CLASSES:
+        handle = f"1:{minor:x}"
+        if state.get(handle) == desired[handle]:
+            continue
+        borrow_args = ["ceil", ceil] if allow_borrow else []
+        run_command([
+            _TC_PATH, "class", "change" if handle in state else "add", "dev", interface, "parent", "1:",
+            "classid", handle, "htb", "rate", rate, *borrow_args, "prio", str(prio), "quantum", str(_htb_quantum(rate))
+        ], check=False, capture_output=False, close_fds=False)
+        writes += 1
+    
+    # Classes we did not create (e.g. from an older layout) would keep
+    # catching traffic, so drop them
+    for handle in state.keys() - desired.keys():
+        run_command([_TC_PATH, "class", "del", "dev", interface, "classid", handle], check=False, capture_output=False, close_fds=False)
+        writes += 1
+    return writes
+
+
+def _apply_htb_tc(interface: str, allow_borrow: bool, u32_filters: bool = True) -> None:
+    """Build the HTB prioritization tree with the tc command."""
+    # 1. Add a root qdisc with HTB (Hierarchical Token Bucket)
+    run_command([
+        _TC_PATH, "qdisc", "add", "dev", interface, "root", "handle", "1:", "htb", "default", f"{_HTB_DEFAULT_CLASS:x}"
+    ], check=False, capture_output=False, close_fds=False)
+    
+    # 2. Add classes for different types of traffic
+    for minor, rate, ceil, prio in _HTB_CLASSES:
+        # Without a ceil, tc caps the class at its rate
+        borrow_args = ["ceil", ceil] if allow_borrow else []
+        run_command([
+            _TC_PATH, "class", "add", "dev", interface, "parent", "1:", "classid", f"1:{minor:x}", 
+            "htb", "rate", rate, *borrow_args, "prio", str(prio), "quantum", str(_htb_quantum(rate))
+        ], check=False, capture_output=False, close_fds=False)
+    
+    # 3. Add filters to classify traffic
+    for port in _HTB_PRIORITY_PORTS if u32_filters else ():
+        run_command([
+            _TC_PATH, "filter", "add", "dev", interface, "parent", "1:0", "protocol", "ip", 
+            "prio", "1", "u32", "match", "ip", "dport", str(port), "0xffff", "flowid", f"1:{_HTB_PRIORITY_CLASS:x}"
+        ], check=False, capture_output=False, close_fds=False)
+
+
+def _refresh_congestion(interface: str) -> None:
+    """Take a congestion reading for an interface and record it."""
+    from signal_booster.network.platform.dispatcher import analyze_network_congestion
+    try:
+        congestion = analyze_network_congestion(interface)
+        with _qos_lock:
+            previous = _qos_congestion.get(interface)
+            low_readings = 0
+            if congestion < _QOS_MIN_CONGESTION:
+                low_readings = previous[2] + 1 if previous else 1
+            _qos_congestion[interface] = (time.monotonic(), congestion, low_readings)
+    finally:
+        with _qos_lock:
+            _qos_probing.discard(interface)
+
+
+def _congestion_reading(interface: str) -> Optional[Tuple[float, int]]:
+    """
+    Return the latest congestion reading for an interface.
+    
+    The first reading is taken right away, so a one-shot run can act on it.
+    After that an expired reading is still returned while a refresh runs in
+    the background, so control loops do not stall; the next call picks the
+    new reading up.
+    
+    Args:
+        interface: Network interface name
+        
+    Returns:
+        (congestion percent, consecutive low readings), or None if no
+        reading could be taken
+    """
+    with _qos_lock:
+        entry = _qos_congestion.get(interface)
+        refresh = (entry is not None and interface not in _qos_probing
+                   and time.monotonic() - entry[0] >= _QOS_CONGESTION_TTL)
+        if refresh:
+            _qos_probing.add(interface)
+    
+    if entry is None:
+        _refresh_congestion(interface)
+        with _qos_lock:
+            entry = _qos_congestion.get(interface)
+    elif refresh:
+        threading.Thread(target=_refresh_congestion, args=(interface,), daemon=True).start()
+    return entry[1:] if entry else None
+
+
+def _remove_priority_qos(interface: str) -> None:
+    """
+    Remove the HTB tree and the eBPF classifier installed by `_prioritize_linux_traffic`.
+    
+    Parts that are not installed are skipped quietly.
+    
+    Args:
+        interface: Network interface name
+    """
+    try:
+        ifindex = socket.if_nametoindex(interface)
+    except OSError:
+        return
+    
+    # Unpinning the TCX link detaches the classifier
+    libbpf = _load_libbpf() if os.path.exists(_TCX_PIN_PATH) else None
+    if libbpf is not None and _pinned_tcx_ifindex(libbpf) in (ifindex, 0):
+        os.unlink(_TCX_PIN_PATH)
+    
+    if HAS_PYROUTE2:
+        from pyroute2 import IPRoute
+        with IPRoute() as ipr:
+            for args, kwargs in (
+                (("del", "htb", ifindex, _HTB_ROOT), {}),
+                (("del-filter", "bpf", ifindex, ":1"), {"parent": _CLSACT_EGRESS, "prio": _CLSACT_FILTER_PRIO}),
+            ):
+                try:
+                    ipr.tc(*args, **kwargs)
+                except Exception as e:
+                    logger.debug(f"Nothing to remove for tc {args[0]} {args[1]} on {interface}: {e}")
+    elif _TC_PATH:
+        # Both fail quietly when there is nothing to remove; the handle keeps
+        # a root qdisc that is not ours in place
+        run_command([_TC_PATH, "qdisc", "del", "dev", interface, "root", "handle", "1:"],
+                    check=False, capture_output=False, close_fds=False)
+        run_command([_TC_PATH, "filter", "del", "dev", interface, "egress", "pref", str(_CLSACT_FILTER_PRIO)],
+                    check=False, capture_output=False, close_fds=False)
+
+
+def _prioritize_linux_traffic(allow_borrow: bool = _HTB_ALLOW_BORROW) -> Optional[bool]:
+    """
+    Configure QoS on Linux using tc (traffic control) or pyroute2.
+    
+    Args:
+        allow_borrow: Let HTB classes borrow spare bandwidth up to their ceil
+        
+    Returns:
+        True if successful, None if skipped because the link is not
+        congested, False otherwise
+    """
+    try:
+        # First check if we have the necessary tools (pyroute2 talks netlink
+        # directly and does not need tc)
+        if not HAS_PYROUTE2:
+            if not _TC_PATH:
+                logger.error("Traffic control (tc) not found")
+                return False
             
         # Get active interface
         interface = get_active_interface()
@@ -715,42 +1571,48 @@ def _prioritize_linux_traffic() -> bool:
             
         # Configure traffic control to prioritize interactive traffic
         # This is a simplified example - a real implementation would be more complex
+        # Skip QoS on links that are not congested. Without a reading, QoS
+        # is set up as usual
+        reading = _congestion_reading(interface)
+        if reading is not None and reading[0] < _QOS_MIN_CONGESTION:
+            congestion, low_readings = reading
+            if low_readings >= _QOS_LOW_READINGS_BEFORE_REMOVAL and _qos_installed.get(interface, True):
+                _remove_priority_qos(interface)
+                _qos_installed[interface] = False
+                logger.info(f"Removed traffic prioritization from uncongested interface {interface}")
+            logger.info(f"Network congestion on {interface} is {congestion:.1f}%, skipping traffic prioritization")
+            return None
         
-        # 1. Add a root qdisc with HTB (Hierarchical Token Bucket)
-        run_command([
-            "tc", "qdisc", "add", "dev", interface, "root", "handle", "1:", "htb", "default", "30"
-        ], check=False)
+        # When the tree is already installed (prioritize_traffic runs from a
+        # control loop), one dump plus the differing classes is enough;
+        # re-adding everything just collects "File exists" errors
+        state = _get_htb_state(interface) if _TC_PATH else None
+        if state is not None:
+            writes = _update_htb_tc(interface, allow_borrow, state)
+            _qos_installed[interface] = True
+            logger.info(f"Traffic prioritization on Linux interface {interface} already installed, updated {writes} classes")
+            return True
         
-        # 2. Add classes for different types of traffic
-        # Class 1:10 for high priority traffic (interactive, VoIP, etc.)
-        run_command([
-            "tc", "class", "add", "dev", interface, "parent", "1:", "classid", "1:10", 
-            "htb", "rate", "1mbit", "ceil", "10mbit", "prio", "1"
-        ], check=False)
-        
-        # Class 1:20 for medium priority traffic (web browsing, etc.)
-        run_command([
-            "tc", "class", "add", "dev", interface, "parent", "1:", "classid", "1:20", 
-            "htb", "rate", "5mbit", "ceil", "20mbit", "prio", "2"
-        ], check=False)
-        
-        # Class 1:30 for default traffic
-        run_command([
-            "tc", "class", "add", "dev", interface, "parent", "1:", "classid", "1:30", 
-            "htb", "rate", "10mbit", "ceil", "100mbit", "prio", "3"
-        ], check=False)
-        
-        # 3. Add filters to classify traffic
-        # High priority for SSH, DNS, etc.
-        run_command([
-            "tc", "filter", "add", "dev", interface, "parent", "1:0", "protocol", "ip", 
-            "prio", "1", "u32", "match", "ip", "dport", "22", "0xffff", "flowid", "1:10"
-        ], check=False)
+        # Prefer an eBPF classifier on clsact egress over u32 filters
+        classified = False
+        if HAS_BCC and HAS_PYROUTE2 and _kernel_version() >= _CLSACT_MIN_KERNEL:
+            try:
+                classified = _attach_priority_bpf(interface)
+            except Exception as e:
+                logger.warning(f"Could not attach eBPF classifier, using u32 filters: {e}")
         
-        run_command([
-            "tc", "filter", "add", "dev", interface, "parent", "1:0", "protocol", "ip", 
-            "prio", "1", "u32", "match", "ip", "dport", "53", "0xffff", "flowid", "1:10"
-        ], check=False)
+        applied = False
+        if HAS_PYROUTE2:
+            try:
+                applied = _apply_htb_netlink(interface, allow_borrow, u32_filters=not classified)
+            except Exception as e:
+                logger.warning(f"Could not configure HTB over netlink, falling back to tc: {e}")
+        if not applied:
+            if not _TC_PATH:
+                logger.error("Traffic control (tc) not found")
+                return False
+            _apply_htb_tc(interface, allow_borrow, u32_filters=not classified)
+        _qos_installed[interface] = True
         
         logger.info(f"Configured traffic prioritization on Linux interface {interface}")
         return True
@@ -770,8 +1632,7 @@ def _prioritize_macos_traffic() -> bool:
         # load it with pfctl, but that requires root privileges
         
         # Check if pfctl is available
-        stdout, stderr, returncode = run_command(["which", "pfctl"])
-        if returncode != 0:
+        if not _PFCTL_PATH:
             logger.error("pfctl not found")
             return False
             
@@ -790,12 +1651,9 @@ def optimize_system_for_networking() -> bool:
         True if successful, False otherwise
     """
     try:
-        if platform.system() == "Windows":
-            return _optimize_windows_system()
-        elif platform.system() == "Linux":
-            return _optimize_linux_system()
-        elif platform.system() == "Darwin":  # macOS
-            return _optimize_macos_system()
+        optimizer = _SYSTEM_OPT.get(_OS)
+        if optimizer:
+            return optimizer()
     except Exception as e:
         logger.error(f"Error optimizing system: {e}")
     return False
@@ -812,41 +1670,44 @@ def _optimize_windows_system() -> bool:
             "upnphost"  # UPnP Device Host
         ]
         
-        for service in services_to_disable:
-            run_command([
-                "sc", "config", service, "start=", "disabled"
-            ], check=False)
-            
-        # Optimize network adapter settings
-        interfaces = get_network_interfaces()
-        for interface_name in interfaces:
-            # Disable TCP/IP offloading features that can cause issues
-            run_command([
-                "powershell", 
-                f"Disable-NetAdapterChecksumOffload -Name '{interface_name}' -ErrorAction SilentlyContinue"
-            ], check=False)
-            
-            # Disable IPv6 if not needed
-            run_command([
-                "powershell", 
-                f"Disable-NetAdapterBinding -Name '{interface_name}' -ComponentID 'ms_tcpip6' -ErrorAction SilentlyContinue"
-            ], check=False)
+        # sc takes one service at a time, so run the calls side by side and
+        # let them overlap with the adapter script below
+        with ThreadPoolExecutor(max_workers=len(services_to_disable)) as pool:
+            for service in services_to_disable:
+                pool.submit(run_command, ["sc", "config", service, "start=", "disabled"], check=False, capture_output=False)
+                
+            # Optimize network adapter settings with one script in the shared
+            # PowerShell session rather than starting a new host for every cmdlet
+            interfaces = get_network_interfaces()
+            if interfaces:
+                names = "','".join(name.replace("'", "''") for name in interfaces)
+                script = (
+                    f"$a=@('{names}'); foreach($n in $a){{ "
+                    # Disable TCP/IP offloading features that can cause issues
+                    "Disable-NetAdapterChecksumOffload -Name $n -EA SilentlyContinue; "
+                    # Disable IPv6 if not needed
+                    "Disable-NetAdapterBinding -Name $n -ComponentID 'ms_tcpip6' -EA SilentlyContinue }"
+                )
+                run_powershell(script)
         
         # Optimize system for network performance
         try:
             import winreg
             
-            # Set NetworkThrottlingIndex to maximize network throughput
             with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 
                                r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\Multimedia\SystemProfile", 
                                0, winreg.KEY_WRITE) as key:
+                # Set NetworkThrottlingIndex to maximize network throughput
                 winreg.SetValueEx(key, "NetworkThrottlingIndex", 0, winreg.REG_DWORD, 0xffffffff)
-                
-            # Set system responsiveness priority to favor network
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 
-                               r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\Multimedia\SystemProfile", 
-                               0, winreg.KEY_WRITE) as key:
+                # Set system responsiveness priority to favor network
                 winreg.SetValueEx(key, "SystemResponsiveness", 0, winreg.REG_DWORD, 0)
+            
+            # Match the Winsock (AFD) default socket buffers to the TCP window size
+            with winreg.CreateKeyEx(winreg.HKEY_LOCAL_MACHINE, 
+                                    r"SYSTEM\CurrentControlSet\Services\AFD\Parameters", 
+                                    0, winreg.KEY_WRITE) as key:
+                winreg.SetValueEx(key, "DefaultReceiveWindow", 0, winreg.REG_DWORD, _TCP_WINDOW_SIZE)
+                winreg.SetValueEx(key, "DefaultSendWindow", 0, winreg.REG_DWORD, _TCP_WINDOW_SIZE)
         except Exception as e:
             logger.warning(f"Could not set system registry settings: {e}")
             success = False
@@ -857,6 +1718,39 @@ def _optimize_windows_system() -> bool:
         return False
 
 
+def _get_root_disk() -> Optional[str]:
+    """
+    Find the block device holding the root filesystem.
+    
+    Reads the root mount's device number from /proc/self/mountinfo and
+    resolves it through /sys/dev/block, which handles nvme/mmcblk partition
+    names correctly.
+    
+    Returns:
+        Whole-disk device name (e.g. sda, nvme0n1), or None if not found
+    """
+    device = None
+    with open("/proc/self/mountinfo") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) > 4 and parts[4] == "/":
+                device = parts[2]  # "major:minor"
+                break
+    if not device:
+        return None
+    
+    sys_path = f"/sys/dev/block/{device}"
+    try:
+        components = os.readlink(sys_path).split("/")
+    except OSError:
+        # Not backed by a block device (overlay, tmpfs, ...)
+        return None
+    # Partitions live under their parent disk: .../block/nvme0n1/nvme0n1p1
+    if os.path.exists(f"{sys_path}/partition"):
+        return components[-2]
+    return components[-1]
+
+
 def _optimize_linux_system() -> bool:
     """Optimize Linux system settings for network performance."""
     try:
@@ -865,40 +1759,34 @@ def _optimize_linux_system() -> bool:
         # Set I/O scheduler for better network performance
         try:
             # Find the system disk
-            stdout, stderr, returncode = run_command(["lsblk", "-no", "NAME,MOUNTPOINT"])
-            root_disk = None
-            
-            if stdout:
-                lines = stdout.strip().split('\n')
-                for line in lines:
-                    parts = line.strip().split()
-                    if len(parts) >= 2 and parts[1] == '/':
-                        root_disk = parts[0]
-                        # Remove partition numbers
-                        while root_disk and root_disk[-1].isdigit():
-                            root_disk = root_disk[:-1]
-                        break
-                        
+            root_disk = _get_root_disk()
+            
             if root_disk:
-                # Set scheduler to deadline
+                # Set a deadline-style scheduler; blk-mq kernels only know
+                # mq-deadline, so try the preferred names in order. The kernel
+                # rejects unknown names with EINVAL.
                 scheduler_path = f"/sys/block/{root_disk}/queue/scheduler"
-                if os.path.exists(scheduler_path):
+                last_error = None
+                for scheduler in _IO_SCHEDULERS:
                     try:
-                        with open(scheduler_path, 'w') as f:
-                            f.write("deadline")
-                    except Exception as e:
-                        logger.warning(f"Could not set I/O scheduler: {e}")
+                        fd = os.open(scheduler_path, os.O_WRONLY | os.O_CLOEXEC)
+                        try:
+                            os.write(fd, scheduler.encode())
+                        finally:
+                            os.close(fd)
+                        break
+                    except OSError as e:
+                        last_error = e
+                else:
+                    logger.warning(f"Could not set I/O scheduler: {last_error}")
         except Exception as e:
             logger.warning(f"Could not configure I/O scheduler: {e}")
             
-        # Increase file descriptors limit for network connections
-        try:
-            run_command(["sysctl", "-w", "fs.file-max=65535"], check=False)
-        except Exception as e:
-            logger.warning(f"Could not increase file descriptors limit: {e}")
-            
         # Optimize kernel networking parameters
         optimizations = [
+            # Increase file descriptors limit for network connections
+            ("fs.file-max", "65535"),
+            
             # Increase the memory allocated to the network interfaces
             ("net.core.netdev_max_backlog", "5000"),
             
@@ -909,11 +1797,10 @@ def _optimize_linux_system() -> bool:
             ("net.ipv4.ip_local_port_range", "1024 65535")
         ]
         
+        # Written straight to /proc/sys like the TCP settings, so no sysctl
+        # process is spawned at all
         for param, value in optimizations:
-            try:
-                run_command(["sysctl", "-w", f"{param}={value}"], check=False)
-            except Exception as e:
-                logger.warning(f"Could not set {param}: {e}")
+            if not _set_sysctl(param, value):
                 success = False
                 
         return success
@@ -927,10 +1814,6 @@ def _optimize_macos_system() -> bool:
     try:
         success = True
         
-        # Flush DNS cache
-        run_command(["dscacheutil", "-flushcache"], check=False)
-        run_command(["killall", "-HUP", "mDNSResponder"], check=False)
-        
         # Optimize network settings
         optimizations = [
             # Increase maximum number of files
@@ -946,14 +1829,28 @@ def _optimize_macos_system() -> bool:
             ("kern.ipc.maxsockbuf", "8388608")
         ]
         
-        for param, value in optimizations:
-            try:
-                run_command(["sysctl", "-w", f"{param}={value}"], check=False)
-            except Exception as e:
-                logger.warning(f"Could not set {param}: {e}")
+        # Flush DNS cache in the background while the sysctls are applied;
+        # one shell runs both commands in order
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(run_command, ["/bin/sh", "-c", "dscacheutil -flushcache; killall -HUP mDNSResponder"], check=False, capture_output=False)
+            
+            # BSD sysctl accepts several assignments, so set them all in one process
+            stdout, stderr, returncode = run_command(
+                ["sysctl", "-w"] + [f"{param}={value}" for param, value in optimizations],
+                check=False
+            )
+            if returncode != 0:
+                logger.warning(f"Could not set some system parameters: {stderr}")
                 success = False
-                
+        
         return success
     except Exception as e:
         logger.error(f"Error optimizing macOS system: {e}")
-        return False 
\ No newline at end of file
+        return False
+
+
+# Platform dispatch tables, resolved against _OS at call time
+_TCP_OPT = {"Windows": _optimize_windows_tcp, "Linux": _optimize_linux_tcp, "Darwin": _optimize_macos_tcp}
+_WIFI_OPT = {"Windows": _optimize_windows_wifi, "Linux": _optimize_linux_wifi, "Darwin": _optimize_macos_wifi}
+_TRAFFIC_OPT = {"Windows": _prioritize_windows_traffic, "Linux": _prioritize_linux_traffic, "Darwin": _prioritize_macos_traffic}
+_SYSTEM_OPT = {"Windows": _optimize_windows_system, "Linux": _optimize_linux_system, "Darwin": _optimize_macos_system}
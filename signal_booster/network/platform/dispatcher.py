@@ -3,12 +3,18 @@ Platform dispatcher for network utilities.
 Provides a unified interface to platform-specific implementations.
 """
 
+import copy
 import platform
 import logging
+import functools
+import importlib
 from typing import List, Optional, Union, Tuple, Dict, Any
 
+from signal_booster.network.common import ttl_cache
+
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=1)
 def get_platform() -> str:
     """
     Determine the current platform.
@@ -25,295 +31,179 @@ def get_platform() -> str:
         logger.warning(f"Unsupported platform: {system}")
         return 'unknown'
 
-def set_dns_servers(dns_servers: List[str], interface: Optional[str] = None) -> bool:
+_PLATFORM = get_platform()
+
+# Platform modules, imported on the first call that needs one (None if the
+# import failed)
+_PLATFORM_MODULES = {'windows': None, 'linux': None, 'macos': None}
+_PLATFORM_MODULES_LOADED = set()
+
+def _load_platform_module(plat: str):
+    """Import a platform module, or return None if it cannot be loaded here."""
+    try:
+        return importlib.import_module(f"signal_booster.network.platform.{plat}")
+    except ImportError as e:
+        logger.error(f"Could not load network implementation for {plat}: {e}")
+        return None
+
+def _resolve(template: str, mac_falls_back_to_linux: bool):
+    """
+    Find the platform function for a template such as 'measure_{plat}_jitter'.
+    
+    Returns:
+        The function, or None if the current platform has no implementation
+    """
+    candidates = [_PLATFORM] if _PLATFORM in _PLATFORM_MODULES else []
+    if _PLATFORM == 'macos' and mac_falls_back_to_linux:
+        # If macOS implementation is available, use it
+        # Otherwise, fall back to Linux implementation which might work similarly
+        candidates.append('linux')
+    
+    for plat in candidates:
+        if plat not in _PLATFORM_MODULES_LOADED:
+            _PLATFORM_MODULES[plat] = _load_platform_module(plat)
+            _PLATFORM_MODULES_LOADED.add(plat)
+        impl = getattr(_PLATFORM_MODULES[plat], template.format(plat=plat), None)
+        if impl is not None:
+            return impl
+    return None
+
+def _dispatcher(name: str, template: str, mac_falls_back_to_linux: bool, default: Any, topic: str, doc: Optional[str]):
+    """
+    Build a public dispatcher function for a platform function template.
+    
+    The platform function is looked up on the first call. The dispatcher
+    logs and returns a copy of `default` on failure, or when there is no
+    implementation for this platform.
+    
+    Args:
+        name: Public function name
+        template: Platform function name, such as 'measure_{plat}_jitter'
+        mac_falls_back_to_linux: Use the Linux function if macOS has none
+        default: Value returned on failure
+        topic: What the function does, for log messages
+        doc: Docstring of the public function
+    """
+    resolved = []
+    
+    def dispatch(*args, **kwargs):
+        if not resolved:
+            resolved.append(_resolve(template, mac_falls_back_to_linux))
+        impl = resolved[0]
+        if impl is None:
+            logger.error(f"Unsupported platform for {topic}: {_PLATFORM}")
+            return copy.copy(default)
+        try:
+            return impl(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Error in {topic}: {e}")
+            return copy.copy(default)
+    
+    dispatch.__name__ = dispatch.__qualname__ = name
+    dispatch.__doc__ = doc
+    return dispatch
+
+set_dns_servers = _dispatcher(
+    "set_dns_servers", "set_{plat}_dns", False, False, "DNS configuration",
     """
     Set DNS servers based on the current platform.
     
     Args:
         dns_servers: List of DNS server IP addresses
         interface: Network interface to set DNS servers for (optional)
-        
+    
     Returns:
         True if successful, False otherwise
-    """
-    platform_name = get_platform()
-    
-    try:
-        if platform_name == 'windows':
-            from signal_booster.network.platform.windows import set_windows_dns
-            return set_windows_dns(dns_servers, interface)
-        elif platform_name == 'linux':
-            from signal_booster.network.platform.linux import set_linux_dns
-            return set_linux_dns(dns_servers, interface)
-        elif platform_name == 'macos':
-            from signal_booster.network.platform.macos import set_macos_dns
-            return set_macos_dns(dns_servers, interface)
-        else:
-            logger.error(f"Unsupported platform for DNS configuration: {platform_name}")
-            return False
-    except Exception as e:
-        logger.error(f"Error setting DNS servers: {e}")
-        return False
+    """)
+
+# WiFi signal is polled from several places within one optimization run.
+# Failures return None here and are not cached, so the next call retries
+_wifi_signal_reading = ttl_cache(cache_if=lambda signal: signal is not None)(
+    _dispatcher("get_wifi_signal_strength", "get_{plat}_wifi_signal", False, None, "WiFi signal strength", None))
 
 def get_wifi_signal_strength() -> int:
     """
     Get the current WiFi signal strength based on the current platform.
     
     Returns:
-        Signal strength as a percentage (0-100)
+        Signal strength as a percentage (0-100), 60 if it cannot be read
     """
-    platform_name = get_platform()
-    
-    try:
-        if platform_name == 'windows':
-            from signal_booster.network.platform.windows import get_windows_wifi_signal
-            return get_windows_wifi_signal()
-        elif platform_name == 'linux':
-            from signal_booster.network.platform.linux import get_linux_wifi_signal
-            return get_linux_wifi_signal()
-        elif platform_name == 'macos':
-            from signal_booster.network.platform.macos import get_macos_wifi_signal
-            return get_macos_wifi_signal()
-        else:
-            logger.error(f"Unsupported platform for WiFi signal strength: {platform_name}")
-            # Return a default value if platform is not supported
-            return 60
-    except Exception as e:
-        logger.error(f"Error getting WiFi signal strength: {e}")
-        # Return a default value in case of error
-        return 60
-        
-def find_best_wifi_channel() -> int:
+    signal = _wifi_signal_reading()
+    return 60 if signal is None else signal
+
+find_best_wifi_channel = _dispatcher(
+    "find_best_wifi_channel", "find_{plat}_best_channel", False, 6, "WiFi channel optimization",
     """
     Find the best WiFi channel based on the current platform.
     
     Returns:
-        Channel number
-    """
-    platform_name = get_platform()
-    
-    try:
-        if platform_name == 'windows':
-            from signal_booster.network.platform.windows import find_windows_best_channel
-            return find_windows_best_channel()
-        elif platform_name == 'linux':
-            from signal_booster.network.platform.linux import find_linux_best_channel
-            return find_linux_best_channel()
-        elif platform_name == 'macos':
-            from signal_booster.network.platform.macos import find_macos_best_channel
-            return find_macos_best_channel()
-        else:
-            logger.error(f"Unsupported platform for WiFi channel optimization: {platform_name}")
-            # Return a default value if platform is not supported
-            return 6  # Channel 6 is a common default
-    except Exception as e:
-        logger.error(f"Error finding best WiFi channel: {e}")
-        # Return a default value in case of error
-        return 6
+        Channel number (6 if it cannot be determined)
+    """)
 
-def measure_jitter(host: str = "8.8.8.8", count: int = 10) -> float:
+measure_jitter = _dispatcher(
+    "measure_jitter", "measure_{plat}_jitter", True, 0.0, "jitter measurement",
     """
     Measure network jitter based on the current platform.
     
     Args:
         host: Target host to ping (default: 8.8.8.8)
         count: Number of pings to perform
-        
+    
     Returns:
         Jitter value in milliseconds
-    """
-    platform_name = get_platform()
-    
-    try:
-        if platform_name == 'windows':
-            from signal_booster.network.platform.windows import measure_windows_jitter
-            return measure_windows_jitter(host, count)
-        elif platform_name == 'linux':
-            from signal_booster.network.platform.linux import measure_linux_jitter
-            return measure_linux_jitter(host, count)
-        elif platform_name == 'macos':
-            # If macOS implementation is available, use it
-            # Otherwise, fall back to Linux implementation which might work similarly
-            try:
-                from signal_booster.network.platform.macos import measure_macos_jitter
-                return measure_macos_jitter(host, count)
-            except ImportError:
-                from signal_booster.network.platform.linux import measure_linux_jitter
-                return measure_linux_jitter(host, count)
-        else:
-            logger.error(f"Unsupported platform for jitter measurement: {platform_name}")
-            return 0.0
-    except Exception as e:
-        logger.error(f"Error measuring jitter: {e}")
-        return 0.0
+    """)
 
-def measure_packet_loss(host: str = "8.8.8.8", count: int = 10) -> float:
+measure_packet_loss = _dispatcher(
+    "measure_packet_loss", "measure_{plat}_packet_loss", True, 0.0, "packet loss measurement",
     """
     Measure packet loss percentage based on the current platform.
     
     Args:
         host: Target host to ping (default: 8.8.8.8)
         count: Number of pings to perform
-        
+    
     Returns:
         Packet loss percentage (0-100)
-    """
-    platform_name = get_platform()
-    
-    try:
-        if platform_name == 'windows':
-            from signal_booster.network.platform.windows import measure_windows_packet_loss
-            return measure_windows_packet_loss(host, count)
-        elif platform_name == 'linux':
-            from signal_booster.network.platform.linux import measure_linux_packet_loss
-            return measure_linux_packet_loss(host, count)
-        elif platform_name == 'macos':
-            # If macOS implementation is available, use it
-            # Otherwise, fall back to Linux implementation which might work similarly
-            try:
-                from signal_booster.network.platform.macos import measure_macos_packet_loss
-                return measure_macos_packet_loss(host, count)
-            except ImportError:
-                from signal_booster.network.platform.linux import measure_linux_packet_loss
-                return measure_linux_packet_loss(host, count)
-        else:
-            logger.error(f"Unsupported platform for packet loss measurement: {platform_name}")
-            return 0.0
-    except Exception as e:
-        logger.error(f"Error measuring packet loss: {e}")
-        return 0.0
+    """)
 
-def measure_bandwidth(duration: int = 5) -> Dict[str, float]:
+measure_bandwidth = _dispatcher(
+    "measure_bandwidth", "measure_{plat}_bandwidth", True, {"download": 0.0, "upload": 0.0}, "bandwidth measurement",
     """
     Measure network bandwidth based on the current platform.
     
     Args:
         duration: Duration in seconds for the bandwidth test
-        
+    
     Returns:
         Dictionary with download and upload speeds in Mbps
-    """
-    platform_name = get_platform()
-    result = {"download": 0.0, "upload": 0.0}
-    
-    try:
-        if platform_name == 'windows':
-            from signal_booster.network.platform.windows import measure_windows_bandwidth
-            return measure_windows_bandwidth(duration)
-        elif platform_name == 'linux':
-            from signal_booster.network.platform.linux import measure_linux_bandwidth
-            return measure_linux_bandwidth(duration)
-        elif platform_name == 'macos':
-            # If macOS implementation is available, use it
-            # Otherwise, fall back to Linux implementation which might work similarly
-            try:
-                from signal_booster.network.platform.macos import measure_macos_bandwidth
-                return measure_macos_bandwidth(duration)
-            except ImportError:
-                from signal_booster.network.platform.linux import measure_linux_bandwidth
-                return measure_linux_bandwidth(duration)
-        else:
-            logger.error(f"Unsupported platform for bandwidth measurement: {platform_name}")
-            return result
-    except Exception as e:
-        logger.error(f"Error measuring bandwidth: {e}")
-        return result
+    """)
 
-def analyze_network_congestion(interface: Optional[str] = None) -> float:
+analyze_network_congestion = _dispatcher(
+    "analyze_network_congestion", "analyze_{plat}_network_congestion", True, 30.0, "network congestion analysis",
     """
     Analyze network congestion based on the current platform.
     
     Args:
         interface: Network interface to analyze (if None, uses active interface)
-        
-    Returns:
-        Congestion percentage (0-100)
-    """
-    platform_name = get_platform()
     
-    try:
-        if platform_name == 'windows':
-            from signal_booster.network.platform.windows import analyze_windows_network_congestion
-            return analyze_windows_network_congestion(interface)
-        elif platform_name == 'linux':
-            from signal_booster.network.platform.linux import analyze_linux_network_congestion
-            return analyze_linux_network_congestion(interface)
-        elif platform_name == 'macos':
-            # If macOS implementation is available, use it
-            # Otherwise, fall back to Linux implementation which might work similarly
-            try:
-                from signal_booster.network.platform.macos import analyze_macos_network_congestion
-                return analyze_macos_network_congestion(interface)
-            except ImportError:
-                from signal_booster.network.platform.linux import analyze_linux_network_congestion
-                return analyze_linux_network_congestion(interface)
-        else:
-            logger.error(f"Unsupported platform for network congestion analysis: {platform_name}")
-            return 30.0  # Default to moderate congestion
-    except Exception as e:
-        logger.error(f"Error analyzing network congestion: {e}")
-        return 30.0  # Default to moderate congestion
+    Returns:
+        Congestion percentage (0-100), 30.0 (moderate) if unknown
+    """)
 
-def clear_network_buffers() -> bool:
+clear_network_buffers = _dispatcher(
+    "clear_network_buffers", "clear_{plat}_network_buffers", False, False, "clearing network buffers",
     """
     Clear network buffers based on the current platform.
     
     Returns:
         True if successful, False otherwise
-    """
-    platform_name = get_platform()
-    
-    try:
-        if platform_name == 'windows':
-            from signal_booster.network.platform.windows import clear_windows_network_buffers
-            return clear_windows_network_buffers()
-        elif platform_name == 'linux':
-            from signal_booster.network.platform.linux import clear_linux_network_buffers
-            return clear_linux_network_buffers()
-        elif platform_name == 'macos':
-            # If macOS implementation is available, use it
-            # Otherwise, return False
-            try:
-                from signal_booster.network.platform.macos import clear_macos_network_buffers
-                return clear_macos_network_buffers()
-            except ImportError:
-                logger.error("Network buffer clearing not implemented for macOS")
-                return False
-        else:
-            logger.error(f"Unsupported platform for clearing network buffers: {platform_name}")
-            return False
-    except Exception as e:
-        logger.error(f"Error clearing network buffers: {e}")
-        return False
+    """)
 
-def get_detailed_network_interfaces() -> List[Dict[str, Any]]:
+get_detailed_network_interfaces = _dispatcher(
+    "get_detailed_network_interfaces", "get_{plat}_network_interfaces", False, [], "detailed network interface retrieval",
     """
     Get detailed information about network interfaces based on the current platform.
     
     Returns:
         List of dictionaries containing interface details
-    """
-    platform_name = get_platform()
-    
-    try:
-        if platform_name == 'windows':
-            from signal_booster.network.platform.windows import get_windows_network_interfaces
-            return get_windows_network_interfaces()
-        elif platform_name == 'linux':
-            from signal_booster.network.platform.linux import get_linux_network_interfaces
-            return get_linux_network_interfaces()
-        elif platform_name == 'macos':
-            # If macOS implementation is available, use it
-            # Otherwise, return an empty list
-            try:
-                from signal_booster.network.platform.macos import get_macos_network_interfaces
-                return get_macos_network_interfaces()
-            except ImportError:
-                logger.error("Detailed network interface retrieval not implemented for macOS")
-                return []
-        else:
-            logger.error(f"Unsupported platform for detailed network interface retrieval: {platform_name}")
-            return []
-    except Exception as e:
-        logger.error(f"Error getting detailed network interfaces: {e}")
-        return [] 
\ No newline at end of file
+    """)
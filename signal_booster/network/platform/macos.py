@@ -4,30 +4,101 @@ macOS-specific network utilities for Signal Booster.
 
 import os
 import re
+import time
+import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple, Optional, Any
 
-from signal_booster.network.common import logger, run_command
+import numpy as np
 
-def set_macos_dns(dns_servers: List[str], interface: Optional[str] = None) -> bool:
-    """Set DNS servers on macOS."""
+from signal_booster.network.common import logger, run_command, ttl_cache, HAS_COREWLAN
+
+# Device -> (time cached, hardware port / network service name), filled from
+# one networksetup -listallhardwareports scan
+_SERVICE_CACHE: Dict[str, Tuple[float, str]] = {}
+_SERVICE_CACHE_TTL = 30.0
+# One "Hardware Port: <service>" / "Device: <iface>" pair of the listing
+_HWPORT_RE = re.compile(r"^Hardware Port:[ \t]*(.+?)\r?\nDevice:[ \t]*(\S+)", re.MULTILINE)
+# Network services DNS is set on when no interface is given
+_ACTIVE_SERVICE_RE = re.compile(r"wi-fi|airport|ethernet", re.IGNORECASE)
+
+# Runs fire-and-forget commands (DNS cache flush) off the caller's thread;
+# one worker keeps them in submission order
+_BACKGROUND = ThreadPoolExecutor(max_workers=1)
+
+def _resolve_airport() -> Optional[str]:
+    """Locate the airport tool once; macOS 13+ no longer ships it."""
+    default_path = "/System/Library/PrivateFrameworks/Apple80211.framework/Versions/Current/Resources/airport"
+    if os.path.exists(default_path):
+        return default_path
+    return shutil.which("airport")
+
+_AIRPORT_PATH = _resolve_airport()
+
+# system_profiler SPAirPortDataType probes every AirPort/Bluetooth subsystem
+# and takes several seconds, so without CoreWLAN or airport the WiFi helpers
+# return their defaults instead unless this is set
+_ALLOW_SYSTEM_PROFILER = os.environ.get("SIGNAL_BOOSTER_ALLOW_SPROFILER") == "1"
+
+# The WiFi helpers run airport / system_profiler with close_fds=False and read
+# raw bytes: with no descriptors to close, subprocess can use posix_spawn
+# instead of fork+exec, and the (multi-kB) scan output is never decoded
+_RSSI_RE = re.compile(rb"agrCtlRSSI:\s*(-?\d+)")
+_SNR_RE = re.compile(rb"Signal / Noise:\s+(\d+)")
+
+# Weight of a network on its own channel and the two channels either side
+_CHANNEL_OVERLAP = np.array([0.5, 0.5, 1.0, 0.5, 0.5])
+# Standard non-overlapping 2.4GHz channels
+_PREFERRED_CHANNELS = frozenset({1, 6, 11})
+
+def _resolve_service(interface: str) -> Optional[str]:
+    """
+    Find the network service name for an interface (e.g. en0 -> Wi-Fi).
+    
+    Args:
+        interface: BSD device name
+        
+    Returns:
+        Service name, or None if the interface has no hardware port
+    """
+    cached = _SERVICE_CACHE.get(interface)
+    if cached and time.monotonic() - cached[0] < _SERVICE_CACHE_TTL:
+        return cached[1]
+    
+    stdout, stderr, returncode = run_command(["networksetup", "-listallhardwareports"])
+    if not stdout:
+        return None
+    
+    # Cache every device in the listing, not just the one asked for
+    now = time.monotonic()
+    _SERVICE_CACHE.update((m.group(2), (now, m.group(1))) for m in _HWPORT_RE.finditer(stdout))
+    
+    cached = _SERVICE_CACHE.get(interface)
+    return cached[1] if cached else None
+
+
+def set_macos_dns(dns_servers: List[str], interface: Optional[str] = None, flush_cache: bool = False) -> bool:
+    """
+    Set DNS servers on macOS.
+    
+    Args:
+        dns_servers: List of DNS server IP addresses
+        interface: Network interface to set DNS servers for (optional)
+        flush_cache: Also flush the DNS cache. Stale entries otherwise expire
+            with their TTLs; pass True for captive-portal or login flows that
+            need the new servers immediately
+    
+    Returns:
+        True if successful, False otherwise
+    """
     try:
         # Get network service name if interface is not provided
         network_service = None
         
         if interface:
             # Try to find the network service associated with this interface
-            stdout, stderr, returncode = run_command(["networksetup", "-listallhardwareports"])
-            
-            if stdout:
-                # Parse the output to find the service name for this interface
-                current_service = None
-                for line in stdout.split('\n'):
-                    if "Hardware Port:" in line:
-                        current_service = line.split(":", 1)[1].strip()
-                    elif "Device:" in line and interface in line:
-                        network_service = current_service
-                        break
+            network_service = _resolve_service(interface)
         
         if not network_service:
             # Get active network service
@@ -38,10 +109,7 @@ def set_macos_dns(dns_servers: List[str], interface: Optional[str] = None) -> bo
                 services = stdout.strip().split('\n')[1:]
                 
                 # Find active Wi-Fi or Ethernet service
-                for service in services:
-                    if any(keyword in service.lower() for keyword in ["wi-fi", "airport", "ethernet"]):
-                        network_service = service
-                        break
+                network_service = next((service for service in services if _ACTIVE_SERVICE_RE.search(service)), None)
                     
         if not network_service:
             logger.error("No active network service found for DNS configuration")
@@ -57,14 +125,13 @@ def set_macos_dns(dns_servers: List[str], interface: Optional[str] = None) -> bo
             logger.error(f"Failed to set DNS servers: {stderr}")
             return False
         
-        # Flush DNS cache
-        run_command(["dscacheutil", "-flushcache"], check=False)
-        
-        # Also kill mDNSResponder to ensure cache is cleared
-        try:
-            run_command(["killall", "-HUP", "mDNSResponder"], check=False)
-        except Exception:
-            pass
+        if flush_cache:
+            # Flush DNS cache; it does not affect whether DNS is configured,
+            # so the caller does not wait for it
+            _BACKGROUND.submit(run_command, ["dscacheutil", "-flushcache"], check=False, capture_output=False)
+            
+            # Also kill mDNSResponder to ensure cache is cleared
+            _BACKGROUND.submit(run_command, ["killall", "-HUP", "mDNSResponder"], check=False, capture_output=False)
             
         logger.info(f"Successfully set DNS servers on macOS to {dns_servers}")
         return True
@@ -73,36 +140,57 @@ def set_macos_dns(dns_servers: List[str], interface: Optional[str] = None) -> bo
         return False
 
 
+def _corewlan_interface():
+    """Return the default CoreWLAN interface (CWInterface), or None without WiFi hardware."""
+    from CoreWLAN import CWWiFiClient
+    
+    return CWWiFiClient.sharedWiFiClient().interface()
+
+
+def _rssi_to_percent(rssi: int) -> int:
+    """Convert RSSI in dBm to a 0-100 signal percentage."""
+    # Typical values: -50 dBm (excellent) to -100 dBm (very poor)
+    signal_percent = (rssi + 100) << 1
+    return 0 if signal_percent < 0 else (100 if signal_percent > 100 else signal_percent)
+
+
 def get_macos_wifi_signal() -> int:
     """Get WiFi signal strength on macOS."""
     try:
+        # CoreWLAN reads the RSSI in-process instead of spawning airport
+        if HAS_COREWLAN:
+            try:
+                iface = _corewlan_interface()
+                if iface is not None:
+                    # rssiValue() is 0 when not associated
+                    rssi = iface.rssiValue()
+                    return _rssi_to_percent(rssi) if rssi else 60
+            except Exception as e:
+                logger.warning(f"Could not read RSSI from CoreWLAN, falling back to airport: {e}")
+        
         # Use airport command to get signal strength
-        airport_path = "/System/Library/PrivateFrameworks/Apple80211.framework/Versions/Current/Resources/airport"
-        if os.path.exists(airport_path):
-            stdout, stderr, returncode = run_command([airport_path, "-I"])
+        if _AIRPORT_PATH is not None:
+            stdout, stderr, returncode = run_command([_AIRPORT_PATH, "-I"], universal_lines=False, close_fds=False)
             
-            if stdout:
-                # Parse the output to find signal strength (agrCtlRSSI)
-                for line in stdout.split("\n"):
-                    if "agrCtlRSSI" in line and ":" in line:
-                        rssi = int(line.split(":")[1].strip())
-                        # Convert RSSI to percentage
-                        # Typical values: -50 dBm (excellent) to -100 dBm (very poor)
-                        signal_percent = max(0, min(100, 2 * (rssi + 100)))
-                        return signal_percent
+            rssi_match = _RSSI_RE.search(stdout) if stdout else None
+            if rssi_match:
+                # Convert RSSI to percentage
+                return _rssi_to_percent(int(rssi_match.group(1)))
+            # airport ran but reported no RSSI (e.g. not associated);
+            # system_profiler would not know more, so skip it
+            return 60
                     
-        # Alternative method using system_profiler
-        stdout, stderr, returncode = run_command(["system_profiler", "SPAirPortDataType"])
+        # Alternative method using system_profiler (slow, only without airport)
+        if not _ALLOW_SYSTEM_PROFILER:
+            return 60
+        stdout, stderr, returncode = run_command(["system_profiler", "SPAirPortDataType"], universal_lines=False, close_fds=False)
         
-        if stdout:
-            # Look for signal/noise ratio
-            snr_match = re.search(r"Signal / Noise:\s+(\d+)", stdout)
-            if snr_match:
-                snr = int(snr_match.group(1))
-                # Convert SNR to approximate percentage
-                # SNR of 40+ is excellent (100%), 10 or below is poor (0%)
-                signal_percent = min(100, max(0, snr * 2.5))
-                return signal_percent
+        snr_match = _SNR_RE.search(stdout) if stdout else None
+        if snr_match:
+            # Convert SNR to approximate percentage
+            # SNR of 40+ is excellent (100%), 10 or below is poor (0%)
+            signal_percent = int(int(snr_match.group(1)) * 2.5)
+            return 0 if signal_percent < 0 else (100 if signal_percent > 100 else signal_percent)
     
     except Exception as e:
         logger.error(f"Error getting macOS WiFi signal strength: {e}")
@@ -111,59 +199,91 @@ def get_macos_wifi_signal() -> int:
     return 60
 
 
+def _scan_channels_corewlan() -> Optional[List[int]]:
+    """
+    Get the channels of nearby networks from CoreWLAN.
+    
+    Uses the interface's cached scan results when there are any, so no
+    active scan (several seconds with airport -s) is needed.
+    
+    Returns:
+        List of channel numbers, one per network, or None if CoreWLAN failed
+    """
+    iface = _corewlan_interface()
+    if iface is None:
+        return None
+    
+    networks = iface.cachedScanResults()
+    if not networks:
+        networks, error = iface.scanForNetworksWithName_error_(None, None)
+        if error is not None or networks is None:
+            logger.warning(f"CoreWLAN scan failed: {error}")
+            return None
+    
+    return [n.wlanChannel().channelNumber() for n in networks if n.wlanChannel() is not None]
+
+
+def _scan_channels_airport() -> Optional[List[int]]:
+    """
+    Get the channels of nearby networks by parsing airport -s output.
+    
+    Returns:
+        List of channel numbers, one per network, or None if airport gave no output
+    """
+    stdout, stderr, returncode = run_command([_AIRPORT_PATH, "-s"], universal_lines=False, close_fds=False)
+    if not stdout:
+        return None
+    
+    channels = []
+    # Split the output into lines, skip the header
+    for line in stdout.strip().split(b'\n')[1:]:
+        # Channel info is typically in column 4
+        parts = line.split()
+        if len(parts) >= 4:
+            try:
+                channels.append(int(parts[3]))
+            except ValueError:
+                pass
+    return channels
+
+
+# RF conditions do not change on a sub-minute timescale, and a scan is the
+# slowest thing this module does
+@ttl_cache(ttl=60.0)
 def find_macos_best_channel() -> int:
     """Find best WiFi channel on macOS."""
     try:
+        channels = None
+        # CoreWLAN returns structured scan results without a subprocess
+        if HAS_COREWLAN:
+            try:
+                channels = _scan_channels_corewlan()
+            except Exception as e:
+                logger.warning(f"Could not scan with CoreWLAN, falling back to airport: {e}")
+        
         # Use airport command to scan for networks
-        airport_path = "/System/Library/PrivateFrameworks/Apple80211.framework/Versions/Current/Resources/airport"
-        if os.path.exists(airport_path):
-            stdout, stderr, returncode = run_command([airport_path, "-s"])
+        if channels is None and _AIRPORT_PATH is not None:
+            channels = _scan_channels_airport()
+        
+        if channels is not None:
+            # Count networks per standard 2.4GHz channel (1-11)
+            scanned = np.asarray(channels, dtype=np.intp)
+            counts = np.bincount(scanned[(scanned >= 1) & (scanned <= 11)], minlength=12)[1:12]
             
-            if stdout:
-                # Parse output to identify channels and their usage
-                channel_usage = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0, 7: 0, 8: 0, 9: 0, 10: 0, 11: 0}
-                
-                # Split the output into lines, skip the header
-                lines = stdout.strip().split('\n')
-                if len(lines) > 1:
-                    lines = lines[1:]  # Skip header
-                    
-                    for line in lines:
-                        # Channel info is typically in column 4
-                        parts = line.split()
-                        if len(parts) >= 4:
-                            try:
-                                channel = int(parts[3])
-                                if 1 <= channel <= 11:  # Only consider standard 2.4GHz channels
-                                    channel_usage[channel] += 1
-                                    
-                                    # Also count this network as affecting adjacent channels (RF overlap)
-                                    for adj_ch in range(max(1, channel - 2), min(11, channel + 2) + 1):
-                                        if adj_ch != channel:
-                                            channel_usage[adj_ch] += 0.5  # Lower weight for adjacent channels
-                            except (ValueError, IndexError):
-                                pass
-                
-                # Find channels with lowest usage
-                min_usage = float('inf')
-                best_channels = []
-                
-                for channel, usage in channel_usage.items():
-                    if usage < min_usage:
-                        min_usage = usage
-                        best_channels = [channel]
-                    elif usage == min_usage:
-                        best_channels.append(channel)
-                
-                # If there are multiple best channels, prefer 1, 6, or 11 (standard non-overlapping channels)
-                preferred = [ch for ch in best_channels if ch in (1, 6, 11)]
-                if preferred:
-                    return preferred[0]
-                
-                # Otherwise return the first best channel
-                return best_channels[0] if best_channels else 6
+            # Also count each network as affecting adjacent channels (RF overlap),
+            # with a lower weight
+            channel_usage = np.convolve(counts, _CHANNEL_OVERLAP, mode='same')
+            
+            # Find channels with lowest usage
+            best_channels = np.flatnonzero(channel_usage == channel_usage.min()) + 1
+            
+            # If there are multiple best channels, prefer 1, 6, or 11 (standard non-overlapping channels),
+            # otherwise return the first best channel
+            return int(next((ch for ch in best_channels if ch in _PREFERRED_CHANNELS), best_channels[0]))
         
         # Try alternative method if airport command is not available
+        if not _ALLOW_SYSTEM_PROFILER:
+            return 6
         stdout, stderr, returncode = run_command(["system_profiler", "SPAirPortDataType"])
         
         if stdout:
@@ -176,7 +296,7 @@ def find_macos_best_channel() -> int:
                 if channels:
                     # Return the first preferred channel that is 1, 6, or 11 if possible
                     for ch in channels:
-                        if ch in (1, 6, 11):
+                        if ch in _PREFERRED_CHANNELS:
                             return ch
                     # Otherwise just return the first preferred channel
                     return channels[0]
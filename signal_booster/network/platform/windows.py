@@ -7,17 +7,131 @@ import os
 import re
 import subprocess
 import logging
+import shutil
+import socket
+import statistics
+import tempfile
 import ctypes
+import functools
+from ctypes import wintypes
 import winreg
 from typing import List, Dict, Tuple, Optional, Any
 import time
 
-from signal_booster.network.common import logger, run_command
+import psutil
+
+from signal_booster.network.common import logger, run_command, run_powershell, ttl_cache, HAS_SPEEDTEST
 from signal_booster.network.interfaces import get_network_interfaces
 
+if HAS_SPEEDTEST:
+    import speedtest
+
 logger = logging.getLogger(__name__)
 
-# Check for admin privileges
+# Parsers for netsh / ping / speedtest-cli output
+_SIGNAL_RE = re.compile(r'Signal\s+:\s+(\d+)%')
+_CHANNEL_RE = re.compile(r'Channel\s+:\s+(\d+)')
+_PING_TIME_RE = re.compile(r'time=(\d+)ms')
+_LOSS_RE = re.compile(r'Lost = \d+ \((\d+)% loss\)')
+_SENT_RE = re.compile(r'Sent = (\d+)')
+_RECEIVED_RE = re.compile(r'Received = (\d+)')
+# Accept either decimal separator, since the output may be localized
+_DOWNLOAD_RE = re.compile(r'Download:\s*([\d.,]+)')
+_UPLOAD_RE = re.compile(r'Upload:\s*([\d.,]+)')
+
+# Tools resolved once so calls skip the PATH search; they are run from argv
+# lists, without a cmd.exe in between
+_NETSH = shutil.which("netsh") or "netsh"
+_PING = shutil.which("ping") or "ping"
+_IPCONFIG = shutil.which("ipconfig") or "ipconfig"
+
+# Set bits in each byte value, for subnet mask to prefix length conversion
+_POPCOUNT = bytes(bin(i).count('1') for i in range(256))
+
+# Registry value type for each Python type in optimize_tcp_settings params
+_REG_TYPES = {int: winreg.REG_DWORD, str: winreg.REG_SZ, list: winreg.REG_MULTI_SZ}
+
+# Native WLAN API (wlanapi.dll) structures, enough to read the signal quality
+# of the current connection without running netsh
+_WLAN_CLIENT_VERSION = 2
+_WLAN_INTF_OPCODE_CURRENT_CONNECTION = 7
+_WLAN_INTERFACE_STATE_CONNECTED = 1
+
+class _GUID(ctypes.Structure):
+    _fields_ = [("Data1", wintypes.DWORD), ("Data2", wintypes.WORD),
+                ("Data3", wintypes.WORD), ("Data4", ctypes.c_ubyte * 8)]
+
+class _WLAN_INTERFACE_INFO(ctypes.Structure):
+    _fields_ = [("InterfaceGuid", _GUID), ("strInterfaceDescription", ctypes.c_wchar * 256),
+                ("isState", wintypes.DWORD)]
+
+class _WLAN_INTERFACE_INFO_LIST(ctypes.Structure):
+    _fields_ = [("dwNumberOfItems", wintypes.DWORD), ("dwIndex", wintypes.DWORD),
+                ("InterfaceInfo", _WLAN_INTERFACE_INFO * 1)]
+
+class _WLAN_ASSOCIATION_ATTRIBUTES(ctypes.Structure):
+    _fields_ = [("uSSIDLength", wintypes.ULONG), ("ucSSID", ctypes.c_ubyte * 32),
+                ("dot11BssType", wintypes.DWORD), ("dot11Bssid", ctypes.c_ubyte * 6),
+                ("dot11PhyType", wintypes.DWORD), ("uDot11PhyIndex", wintypes.ULONG),
+                ("wlanSignalQuality", wintypes.ULONG), ("ulRxRate", wintypes.ULONG),
+                ("ulTxRate", wintypes.ULONG)]
+
+class _WLAN_CONNECTION_ATTRIBUTES(ctypes.Structure):
+    # Security attributes follow; they are not read here
+    _fields_ = [("isState", wintypes.DWORD), ("wlanConnectionMode", wintypes.DWORD),
+                ("strProfileName", ctypes.c_wchar * 256),
+                ("wlanAssociationAttributes", _WLAN_ASSOCIATION_ATTRIBUTES)]
+
+# IP Helper API (iphlpapi.dll) structures for GetAdaptersAddresses; only the
+# leading fields that are read here are declared
+_AF_UNSPEC = 0
+_AF_INET = 2
+_AF_INET6 = 23
+_GAA_FLAG_SKIP_ANYCAST = 0x2
+_GAA_FLAG_SKIP_MULTICAST = 0x4
+_GAA_FLAG_SKIP_DNS_SERVER = 0x8
+_ERROR_BUFFER_OVERFLOW = 111
+_ERROR_NO_DATA = 232
+# Loopback and tunnel pseudo-adapters, which Get-NetAdapter does not list
+_IF_TYPES_HIDDEN = {24, 131}
+_IF_OPER_STATUS = {1: 'Up', 2: 'Down', 3: 'Testing', 4: 'Unknown', 5: 'Dormant',
+                   6: 'Not Present', 7: 'Lower Layer Down'}
+
+class _SOCKET_ADDRESS(ctypes.Structure):
+    _fields_ = [("lpSockaddr", ctypes.c_void_p), ("iSockaddrLength", ctypes.c_int)]
+
+class _IP_ADAPTER_UNICAST_ADDRESS(ctypes.Structure):
+    pass
+
+_IP_ADAPTER_UNICAST_ADDRESS._fields_ = [
+    ("Length", wintypes.ULONG), ("Flags", wintypes.DWORD),
+    ("Next", ctypes.POINTER(_IP_ADAPTER_UNICAST_ADDRESS)), ("Address", _SOCKET_ADDRESS),
+    ("PrefixOrigin", ctypes.c_int), ("SuffixOrigin", ctypes.c_int), ("DadState", ctypes.c_int),
+    ("ValidLifetime", wintypes.ULONG), ("PreferredLifetime", wintypes.ULONG),
+    ("LeaseLifetime", wintypes.ULONG), ("OnLinkPrefixLength", ctypes.c_uint8)]
+
+class _IP_ADAPTER_ADDRESSES(ctypes.Structure):
+    pass
+
+_IP_ADAPTER_ADDRESSES._fields_ = [
+    ("Length", wintypes.ULONG), ("IfIndex", wintypes.DWORD),
+    ("Next", ctypes.POINTER(_IP_ADAPTER_ADDRESSES)), ("AdapterName", ctypes.c_char_p),
+    ("FirstUnicastAddress", ctypes.POINTER(_IP_ADAPTER_UNICAST_ADDRESS)),
+    ("FirstAnycastAddress", ctypes.c_void_p), ("FirstMulticastAddress", ctypes.c_void_p),
+    ("FirstDnsServerAddress", ctypes.c_void_p), ("DnsSuffix", ctypes.c_wchar_p),
+    ("Description", ctypes.c_wchar_p), ("FriendlyName", ctypes.c_wchar_p),
+    ("PhysicalAddress", ctypes.c_ubyte * 8), ("PhysicalAddressLength", wintypes.ULONG),
+    ("Flags", wintypes.ULONG), ("Mtu", wintypes.ULONG), ("IfType", wintypes.DWORD),
+    ("OperStatus", ctypes.c_int), ("Ipv6IfIndex", wintypes.DWORD),
+    ("ZoneIndices", wintypes.DWORD * 16), ("FirstPrefix", ctypes.c_void_p),
+    ("TransmitLinkSpeed", ctypes.c_uint64), ("ReceiveLinkSpeed", ctypes.c_uint64)]
+
+# cpu_percent(interval=None) reports usage since its previous call; start the
+# clock here so the first congestion analysis gets a real reading
+psutil.cpu_percent(interval=None)
+
+# Check for admin privileges (they do not change while the process runs)
+@functools.lru_cache(maxsize=1)
 def is_admin() -> bool:
     """
     Check if the current process has administrator privileges.
@@ -31,6 +145,35 @@ def is_admin() -> bool:
         logger.error(f"Error checking admin privileges: {e}")
         return False
 
+def _first_up_adapter() -> Optional[str]:
+    """
+    Get the first connected, non-loopback adapter (what Get-NetAdapter reports as Up).
+    
+    Returns:
+        Adapter name (e.g. "Wi-Fi") or None if no adapter is up
+    """
+    for name, stats in psutil.net_if_stats().items():
+        if stats.isup and not name.lower().startswith("loopback"):
+            return name
+    return None
+
+def _run_netsh_script(lines: List[str]) -> subprocess.CompletedProcess:
+    """
+    Run several netsh commands in one netsh process (netsh -f script).
+    
+    Args:
+        lines: netsh commands without the leading "netsh"
+        
+    Returns:
+        The completed netsh process
+    """
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as script:
+        script.write("\n".join(lines + ['exit']) + "\n")
+    try:
+        return subprocess.run([_NETSH, '-f', script.name], capture_output=True, text=True)
+    finally:
+        os.unlink(script.name)
+
 def set_windows_dns(dns_servers: List[str], interface: Optional[str] = None) -> bool:
     """
     Set DNS servers on Windows.
@@ -57,23 +200,22 @@ def set_windows_dns(dns_servers: List[str], interface: Optional[str] = None) ->
         # Format DNS servers as comma-separated string
         dns_string = ",".join(dns_servers)
         
-        # Use netsh to set DNS servers
-        cmd = f'netsh interface ip set dns name="{interface}" static {dns_servers[0]} primary'
-        result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-        
-        if result.returncode != 0:
-            logger.error(f"Failed to set primary DNS server: {result.stderr}")
-            return False
+        # Use netsh to set DNS servers; all servers go into one netsh script
+        # so a single netsh process applies them
+        script_lines = [f'interface ip set dns name="{interface}" static {dns_servers[0]} primary']
         
         # Add additional DNS servers
         for i, dns in enumerate(dns_servers[1:], 1):
-            cmd = f'netsh interface ip add dns name="{interface}" {dns} index={i+1}'
-            result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-            if result.returncode != 0:
-                logger.error(f"Failed to add DNS server {dns}: {result.stderr}")
+            script_lines.append(f'interface ip add dns name="{interface}" {dns} index={i+1}')
+        
+        result = _run_netsh_script(script_lines)
+        
+        if result.returncode != 0:
+            logger.error(f"Failed to set DNS servers: {result.stdout.strip() or result.stderr}")
+            return False
         
         # Flush DNS cache
-        subprocess.run('ipconfig /flushdns', shell=True)
+        subprocess.run([_IPCONFIG, '/flushdns'])
         
         logger.info(f"Successfully set DNS servers to {dns_string} on {interface}")
         return True
@@ -81,6 +223,9 @@ def set_windows_dns(dns_servers: List[str], interface: Optional[str] = None) ->
         logger.error(f"Error setting DNS servers: {e}")
         return False
 
+# Adapter state changes on a scale of seconds; DNS and buffer operations in
+# one optimization run all ask for the active interface
+@ttl_cache(ttl=5.0)
 def get_active_interface() -> Optional[str]:
     """
     Get the name of the active network interface on Windows.
@@ -89,29 +234,17 @@ def get_active_interface() -> Optional[str]:
         Name of the active interface or None if not found
     """
     try:
-        # Run ipconfig command to get network information
-        result = subprocess.run('ipconfig', capture_output=True, text=True, shell=True)
-        
-        if result.returncode != 0:
-            logger.error(f"Failed to get network interfaces: {result.stderr}")
-            return None
-        
-        output = result.stdout
-        
-        # Find the active interface (one with an IPv4 address)
-        interfaces = re.findall(r'Ethernet adapter (.*?):|Wireless LAN adapter (.*?):', output)
-        
-        # Flatten the list of tuples
-        interface_names = []
-        for iface in interfaces:
-            interface_names.extend([name for name in iface if name])
-        
-        for name in interface_names:
-            # Check if this interface has an IPv4 address
-            pattern = f"({'|'.join([re.escape(name) for name in interface_names])}).*?IPv4 Address.*?: (\\d+\\.\\d+\\.\\d+\\.\\d+)"
-            match = re.search(pattern, output, re.DOTALL)
-            if match:
-                return match.group(1)
+        # psutil reads the adapters through the IP Helper API
+        # (GetAdaptersAddresses), no ipconfig process or output parsing needed
+        stats = psutil.net_if_stats()
+        
+        # Find the active interface (one that is up with an IPv4 address)
+        for name, addrs in psutil.net_if_addrs().items():
+            nic = stats.get(name)
+            if nic is None or not nic.isup or name.lower().startswith("loopback"):
+                continue
+            if any(addr.family == socket.AF_INET for addr in addrs):
+                return name
         
         logger.warning("No active network interface found")
         return None
@@ -119,6 +252,63 @@ def get_active_interface() -> Optional[str]:
         logger.error(f"Error getting active interface: {e}")
         return None
 
+def _wlan_signal_quality() -> Optional[int]:
+    """
+    Read the signal quality of the connected WiFi interface from wlanapi.dll.
+    
+    Returns:
+        Signal quality (0-100), 0 if no interface is connected, or None if the
+        WLAN API is not available (e.g. the WLAN AutoConfig service is stopped)
+    """
+    try:
+        wlanapi = ctypes.WinDLL("wlanapi")
+    except OSError:
+        return None
+    
+    wlanapi.WlanOpenHandle.argtypes = [wintypes.DWORD, ctypes.c_void_p, ctypes.POINTER(wintypes.DWORD),
+                                       ctypes.POINTER(wintypes.HANDLE)]
+    wlanapi.WlanEnumInterfaces.argtypes = [wintypes.HANDLE, ctypes.c_void_p,
+                                           ctypes.POINTER(ctypes.POINTER(_WLAN_INTERFACE_INFO_LIST))]
+    wlanapi.WlanQueryInterface.argtypes = [wintypes.HANDLE, ctypes.POINTER(_GUID), ctypes.c_int, ctypes.c_void_p,
+                                           ctypes.POINTER(wintypes.DWORD), ctypes.POINTER(ctypes.c_void_p),
+                                           ctypes.c_void_p]
+    wlanapi.WlanFreeMemory.argtypes = [ctypes.c_void_p]
+    wlanapi.WlanCloseHandle.argtypes = [wintypes.HANDLE, ctypes.c_void_p]
+    
+    version = wintypes.DWORD()
+    client = wintypes.HANDLE()
+    if wlanapi.WlanOpenHandle(_WLAN_CLIENT_VERSION, None, ctypes.byref(version), ctypes.byref(client)) != 0:
+        return None
+    try:
+        iface_list = ctypes.POINTER(_WLAN_INTERFACE_INFO_LIST)()
+        if wlanapi.WlanEnumInterfaces(client, None, ctypes.byref(iface_list)) != 0:
+            return None
+        try:
+            count = iface_list.contents.dwNumberOfItems
+            # InterfaceInfo is a variable-length array
+            infos = ctypes.cast(ctypes.byref(iface_list.contents.InterfaceInfo),
+                                ctypes.POINTER(_WLAN_INTERFACE_INFO * count)).contents
+            for info in infos:
+                if info.isState != _WLAN_INTERFACE_STATE_CONNECTED:
+                    continue
+                size = wintypes.DWORD()
+                data = ctypes.c_void_p()
+                if wlanapi.WlanQueryInterface(client, ctypes.byref(info.InterfaceGuid),
+                                              _WLAN_INTF_OPCODE_CURRENT_CONNECTION, None,
+                                              ctypes.byref(size), ctypes.byref(data), None) != 0:
+                    continue
+                try:
+                    attrs = ctypes.cast(data, ctypes.POINTER(_WLAN_CONNECTION_ATTRIBUTES)).contents
+                    return int(attrs.wlanAssociationAttributes.wlanSignalQuality)
+                finally:
+                    wlanapi.WlanFreeMemory(data)
+            return 0
+        finally:
+            wlanapi.WlanFreeMemory(iface_list)
+    finally:
+        wlanapi.WlanCloseHandle(client, None)
+
+@ttl_cache(ttl=2.0)
 def get_windows_wifi_signal() -> int:
     """
     Get WiFi signal strength on Windows.
@@ -127,8 +317,16 @@ def get_windows_wifi_signal() -> int:
         Signal strength as a percentage (0-100)
     """
     try:
+        # The WLAN API reports the quality directly, without a netsh process
+        # or locale-dependent output
+        quality = _wlan_signal_quality()
+        if quality is not None:
+            if quality == 0:
+                logger.warning("Could not determine WiFi signal strength")
+            return quality
+        
         # Use netsh to get wireless signal quality
-        result = subprocess.run('netsh wlan show interfaces', capture_output=True, text=True, shell=True)
+        result = subprocess.run([_NETSH, 'wlan', 'show', 'interfaces'], capture_output=True, text=True)
         
         if result.returncode != 0:
             logger.error(f"Failed to get WiFi signal strength: {result.stderr}")
@@ -137,7 +335,7 @@ def get_windows_wifi_signal() -> int:
         output = result.stdout
         
         # Extract signal quality percentage
-        match = re.search(r'Signal\s+:\s+(\d+)%', output)
+        match = _SIGNAL_RE.search(output)
         if match:
             return int(match.group(1))
         
@@ -147,6 +345,8 @@ def get_windows_wifi_signal() -> int:
         logger.error(f"Error getting WiFi signal strength: {e}")
         return 0
 
+# A channel scan is slow and the RF neighbourhood changes slowly
+@ttl_cache(ttl=30.0)
 def find_windows_best_channel() -> int:
     """
     Find the best WiFi channel on Windows by analyzing available networks.
@@ -156,7 +356,7 @@ def find_windows_best_channel() -> int:
     """
     try:
         # Get network information
-        result = subprocess.run('netsh wlan show networks mode=bssid', capture_output=True, text=True, shell=True)
+        result = subprocess.run([_NETSH, 'wlan', 'show', 'networks', 'mode=bssid'], capture_output=True, text=True)
         
         if result.returncode != 0:
             logger.error(f"Failed to get WiFi networks: {result.stderr}")
@@ -165,32 +365,26 @@ def find_windows_best_channel() -> int:
         output = result.stdout
         
         # Extract channels from network list
-        channels = re.findall(r'Channel\s+:\s+(\d+)', output)
-        channel_count = {}
+        channels = _CHANNEL_RE.findall(output)
         
-        # Count occurrences of each channel
-        for channel in channels:
-            channel_int = int(channel)
-            if channel_int in channel_count:
-                channel_count[channel_int] += 1
-            else:
-                channel_count[channel_int] = 1
-        
-        if not channel_count:
+        if not channels:
             logger.warning("No WiFi channels detected")
             return 6  # Default to channel 6
         
-        # Find the least congested channel among the primary channels (1, 6, 11)
-        primary_channels = {1: 0, 6: 0, 11: 0}
+        # Count occurrences of each 2.4GHz channel (1-14); 5GHz networks
+        # never overlap the primary channels
+        channel_count = [0] * 15
+        for channel in channels:
+            channel_int = int(channel)
+            if channel_int < 15:
+                channel_count[channel_int] += 1
         
-        for channel in primary_channels:
-            # Count channels that would overlap
-            for ch, count in channel_count.items():
-                if abs(channel - ch) <= 2:  # Channels within 2 positions will overlap
-                    primary_channels[channel] += count
+        # Find the least congested channel among the primary channels (1, 6, 11),
+        # counting channels that would overlap (within 2 positions)
+        primary_channels = {channel: sum(channel_count[max(0, channel - 2):channel + 3]) for channel in (1, 6, 11)}
         
         # Find channel with minimum interference
-        best_channel = min(primary_channels.items(), key=lambda x: x[1])[0]
+        best_channel = min(primary_channels, key=primary_channels.get)
         logger.info(f"Best WiFi channel determined to be {best_channel}")
         return best_channel
     except Exception as e:
@@ -215,16 +409,28 @@ def optimize_tcp_settings(params: Dict[str, Any]) -> bool:
         # TCP/IP parameters are stored in the registry
         reg_path = r"SYSTEM\CurrentControlSet\Services\Tcpip\Parameters"
         
-        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path, 0, winreg.KEY_WRITE) as key:
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path, 0, winreg.KEY_READ | winreg.KEY_WRITE) as key:
             # Set each TCP parameter
             for param_name, param_value in params.items():
-                # Convert parameter name to Windows registry format if needed
-                reg_name = param_name
-                reg_type = winreg.REG_DWORD  # Default type for most TCP parameters
-                
-                # Set the registry value
-                winreg.SetValueEx(key, reg_name, 0, reg_type, param_value)
-                logger.info(f"Set TCP parameter {reg_name} to {param_value}")
+                try:
+                    # Convert parameter name to Windows registry format if needed
+                    reg_name = param_name
+                    reg_type = _REG_TYPES.get(type(param_value), winreg.REG_DWORD)  # DWORD for most TCP parameters
+                    
+                    # Skip values that are already set; every write hits the
+                    # hive and fires change notifications
+                    try:
+                        existing, existing_type = winreg.QueryValueEx(key, reg_name)
+                        if existing == param_value and existing_type == reg_type:
+                            continue
+                    except FileNotFoundError:
+                        pass
+                    
+                    # Set the registry value
+                    winreg.SetValueEx(key, reg_name, 0, reg_type, param_value)
+                    logger.info(f"Set TCP parameter {reg_name} to {param_value}")
+                except OSError as e:
+                    logger.warning(f"Could not set TCP parameter {param_name}: {e}")
         
         # Some changes require a system restart to take effect
         logger.info("TCP settings optimized. Some changes may require a system restart.")
@@ -233,6 +439,89 @@ def optimize_tcp_settings(params: Dict[str, Any]) -> bool:
         logger.error(f"Error optimizing TCP settings: {e}")
         return False
 
+def _ping_stats(host: str, count: int) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Run one ping burst and derive both jitter and packet loss from its output.
+    
+    Args:
+        host: Target host to ping
+        count: Number of pings to perform
+        
+    Returns:
+        Tuple of (jitter in milliseconds, packet loss percentage); either is
+        None if the ping output did not provide it
+    """
+    cmd = [_PING, '-n', str(count), host]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    
+    jitter = None
+    if result.returncode == 0:
+        # Extract the times from the ping output
+        # Look for lines like "Reply from 8.8.8.8: bytes=32 time=15ms TTL=113"
+        times = [int(t) for t in _PING_TIME_RE.findall(result.stdout)]
+        
+        if times:
+            # Calculate jitter as the standard deviation of ping times
+            if len(times) >= 2:  # Need at least 2 samples to calculate standard deviation
+                # Method 1: Standard deviation
+                jitter_std = statistics.pstdev(times)
+                
+                # Method 2: Use the max-min difference as a simpler approximation
+                jitter_alt = (max(times) - min(times)) / 2
+                
+                # Use the smaller of the two methods for a conservative estimate
+                jitter = min(jitter_std, jitter_alt)
+            else:
+                # If we only got one sample, return 0 jitter
+                jitter = 0.0
+    
+    loss = None
+    # Check for packet loss information in the output
+    if result.stdout:
+        # Look for the packet loss statistics
+        # Format: "Packets: Sent = 4, Received = 4, Lost = 0 (0% loss)"
+        match = _LOSS_RE.search(result.stdout)
+        if match:
+            loss = float(match.group(1))
+        else:
+            # Alternative parsing in case the format differs
+            sent_match = _SENT_RE.search(result.stdout)
+            received_match = _RECEIVED_RE.search(result.stdout)
+            
+            if sent_match and received_match:
+                sent = int(sent_match.group(1))
+                received = int(received_match.group(1))
+                
+                if sent > 0:
+                    loss = ((sent - received) / sent) * 100
+    
+    return jitter, loss
+
+def _measure_packet_loss_fallback(host: str, count: int) -> float:
+    """Measure packet loss with PowerShell when the ping output had no statistics."""
+    try:
+        # If the standard approach fails, try PowerShell
+        output, _, returncode = run_powershell(f'$pingResult = Test-Connection -ComputerName {host} -Count {count} -ErrorAction SilentlyContinue; $sent = {count}; $received = ($pingResult | Measure-Object).Count; $loss = 100 - ($received / $sent * 100); $loss')
+        
+        if returncode == 0 and output and output.strip():
+            try:
+                return float(output.strip())
+            except ValueError:
+                pass
+        
+        # If all methods fail, check if the host is reachable at all
+        result = subprocess.run([_PING, '-n', '1', '-w', '1000', host], capture_output=True, text=True)
+        if result.returncode != 0:
+            # Host is unreachable
+            logger.warning(f"Host {host} is unreachable")
+            return 100.0
+        
+        logger.warning("Failed to calculate packet loss percentage")
+        return 0.0
+    except Exception as e:
+        logger.error(f"Error measuring packet loss: {e}")
+        return 0.0
+
 def measure_windows_jitter(host: str = "8.8.8.8", count: int = 10) -> float:
     """
     Measure network jitter (latency variation) on Windows.
@@ -246,55 +535,17 @@ def measure_windows_jitter(host: str = "8.8.8.8", count: int = 10) -> float:
     """
     try:
         # Use ping to measure latency variation
-        cmd = f'ping -n {count} {host}'
-        result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-        
-        if result.returncode == 0:
-            # Extract the times from the ping output
-            times = []
-            for line in result.stdout.splitlines():
-                # Look for lines like "Reply from 8.8.8.8: bytes=32 time=15ms TTL=113"
-                match = re.search(r'time=(\d+)ms', line)
-                if match:
-                    times.append(int(match.group(1)))
-            
-            if times:
-                # Calculate jitter as the standard deviation of ping times
-                if len(times) >= 2:  # Need at least 2 samples to calculate standard deviation
-                    # Method 1: Standard deviation
-                    mean_time = sum(times) / len(times)
-                    sum_squared_diff = sum((t - mean_time) ** 2 for t in times)
-                    jitter = (sum_squared_diff / len(times)) ** 0.5
-                    
-                    # Method 2: Use the max-min difference as a simpler approximation
-                    jitter_alt = (max(times) - min(times)) / 2
-                    
-                    # Use the smaller of the two methods for a conservative estimate
-                    return min(jitter, jitter_alt)
-                else:
-                    # If we only got one sample, return 0 jitter
-                    return 0.0
-        
-        # If ping failed or no times were found, try to use PowerShell for more detailed analysis
-        cmd = f'powershell -Command "Test-Connection -ComputerName {host} -Count {count} -ErrorAction SilentlyContinue | Measure-Object -Property ResponseTime -Average -Maximum -Minimum"'
-        result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-        
-        if result.returncode == 0:
-            # Extract max and min values
-            max_match = re.search(r'Maximum\s+:\s+(\d+)', result.stdout)
-            min_match = re.search(r'Minimum\s+:\s+(\d+)', result.stdout)
-            
-            if max_match and min_match:
-                max_time = float(max_match.group(1))
-                min_time = float(min_match.group(1))
-                # Calculate jitter as half the difference between max and min
-                return (max_time - min_time) / 2
-        
-        logger.warning(f"Failed to measure jitter: no valid ping responses")
-        return 0.0
+        jitter, _ = _ping_stats(host, count)
     except Exception as e:
         logger.error(f"Error measuring jitter: {e}")
         return 0.0
+    
+    # A failed ping already tells us the host did not answer; Test-Connection
+    # would only repeat that after starting PowerShell
+    if jitter is None:
+        logger.warning(f"Failed to measure jitter: no valid ping responses")
+        return 0.0
+    return jitter
 
 def measure_windows_packet_loss(host: str = "8.8.8.8", count: int = 10) -> float:
     """
@@ -309,52 +560,106 @@ def measure_windows_packet_loss(host: str = "8.8.8.8", count: int = 10) -> float
     """
     try:
         # Use ping to measure packet loss
-        cmd = f'ping -n {count} {host}'
-        result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-        
-        # Check for packet loss information in the output
-        if result.stdout:
-            # Look for the packet loss statistics
-            # Format: "Packets: Sent = 4, Received = 4, Lost = 0 (0% loss)"
-            match = re.search(r'Lost = \d+ \((\d+)% loss\)', result.stdout)
-            if match:
-                loss_percent = float(match.group(1))
-                return loss_percent
+        _, loss = _ping_stats(host, count)
+    except Exception as e:
+        logger.error(f"Error measuring packet loss: {e}")
+        return 0.0
+    return loss if loss is not None else _measure_packet_loss_fallback(host, count)
+
+@ttl_cache(ttl=300.0, shared=True)
+def _speedtest_client():
+    """
+    Create a speedtest client with its best server already selected.
+    
+    Server selection takes a couple of seconds, so the client is reused for
+    a few minutes.
+    """
+    st = speedtest.Speedtest()
+    st.get_best_server()
+    return st
+
+def _bw_py(duration: int) -> Optional[Dict[str, float]]:
+    """Measure bandwidth with the speedtest-cli Python module."""
+    logger.info("Using speedtest-cli to measure bandwidth")
+    try:
+        st = _speedtest_client()
+        
+        # Measure download and upload speed (convert to Mbps)
+        return {"download": st.download() / 1_000_000, "upload": st.upload() / 1_000_000}
+    except (speedtest.SpeedtestException, OSError) as e:
+        # Force a fresh server selection next time
+        _speedtest_client.cache_clear()
+        logger.warning(f"speedtest-cli failed: {e}")
+        return None
+
+def _bw_cli(duration: int) -> Optional[Dict[str, float]]:
+    """Measure bandwidth with the speedtest-cli command-line tool."""
+    result = {"download": 0.0, "upload": 0.0}
+    try:
+        cmd = ['speedtest-cli', '--simple']
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=duration + 30)
+        
+        if proc.returncode == 0:
+            # Parse download speed
+            download_match = _DOWNLOAD_RE.search(proc.stdout)
+            if download_match:
+                result["download"] = float(download_match.group(1).replace(',', '.'))
             
-            # Alternative parsing in case the format differs
-            sent_match = re.search(r'Sent = (\d+)', result.stdout)
-            received_match = re.search(r'Received = (\d+)', result.stdout)
+            # Parse upload speed
+            upload_match = _UPLOAD_RE.search(proc.stdout)
+            if upload_match:
+                result["upload"] = float(upload_match.group(1).replace(',', '.'))
             
-            if sent_match and received_match:
-                sent = int(sent_match.group(1))
-                received = int(received_match.group(1))
-                
-                if sent > 0:
-                    loss_percent = ((sent - received) / sent) * 100
-                    return loss_percent
-        
-        # If the standard approach fails, try PowerShell
-        cmd = f'powershell -Command "$pingResult = Test-Connection -ComputerName {host} -Count {count} -ErrorAction SilentlyContinue; $sent = {count}; $received = ($pingResult | Measure-Object).Count; $loss = 100 - ($received / $sent * 100); $loss"'
-        result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-        
-        if result.returncode == 0 and result.stdout.strip():
-            try:
-                return float(result.stdout.strip())
-            except ValueError:
-                pass
+            return result
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Command-line speedtest-cli failed: {e}")
+    return None
+
+def _bw_ifstats(duration: int) -> Optional[Dict[str, float]]:
+    """Estimate bandwidth from the interface byte counters (read in-process through psutil)."""
+    try:
+        logger.info("Using network interfaces to estimate bandwidth")
         
-        # If all methods fail, check if the host is reachable at all
-        result = subprocess.run(f'ping -n 1 -w 1000 {host}', capture_output=True, text=True, shell=True)
-        if result.returncode != 0:
-            # Host is unreachable
-            logger.warning(f"Host {host} is unreachable")
-            return 100.0
+        # Get the active interface alias (name)
+        interface_name = _first_up_adapter()
         
-        logger.warning("Failed to calculate packet loss percentage")
-        return 0.0
+        if interface_name:
+            # Get initial byte counts
+            initial = psutil.net_io_counters(pernic=True).get(interface_name)
+            
+            if initial:
+                # Wait for the specified duration
+                time.sleep(duration)
+                
+                # Get final byte counts
+                final = psutil.net_io_counters(pernic=True).get(interface_name)
+                
+                if final:
+                    # Calculate bits per second (convert to Mbps)
+                    rx_bps = (final.bytes_recv - initial.bytes_recv) * 8 / duration / 1_000_000
+                    tx_bps = (final.bytes_sent - initial.bytes_sent) * 8 / duration / 1_000_000
+                    
+                    return {"download": rx_bps, "upload": tx_bps}
     except Exception as e:
-        logger.error(f"Error measuring packet loss: {e}")
-        return 0.0
+        logger.warning(f"Error using interface statistics for bandwidth measurement: {e}")
+    return None
+
+# Bandwidth measurement methods, most accurate first
+_BW_BACKENDS = {'py': _bw_py, 'cli': _bw_cli, 'ifstats': _bw_ifstats}
+
+@functools.lru_cache(maxsize=1)
+def _probe_bandwidth_backend() -> str:
+    """
+    Pick the first bandwidth method available on this machine (checked once).
+    
+    Returns:
+        Key into _BW_BACKENDS
+    """
+    if HAS_SPEEDTEST:
+        return 'py'
+    if shutil.which('speedtest-cli'):
+        return 'cli'
+    return 'ifstats'
 
 def measure_windows_bandwidth(duration: int = 5) -> Dict[str, float]:
     """
@@ -369,103 +674,20 @@ def measure_windows_bandwidth(duration: int = 5) -> Dict[str, float]:
     result = {"download": 0.0, "upload": 0.0}
     
     try:
-        # Check if speedtest-cli is available via Python
-        try:
-            import speedtest
-            logger.info("Using speedtest-cli to measure bandwidth")
-            
-            st = speedtest.Speedtest()
-            st.get_best_server()
-            
-            # Measure download speed
-            download_speed = st.download() / 1_000_000  # Convert to Mbps
-            result["download"] = download_speed
-            
-            # Measure upload speed
-            upload_speed = st.upload() / 1_000_000  # Convert to Mbps
-            result["upload"] = upload_speed
-            
-            return result
-        except (ImportError, Exception) as e:
-            logger.warning(f"speedtest-cli not available or failed: {e}")
+        # Start from the best available method; if it fails at run time,
+        # fall through to the less accurate ones
+        names = list(_BW_BACKENDS)
+        for name in names[names.index(_probe_bandwidth_backend()):]:
+            measured = _BW_BACKENDS[name](duration)
+            if measured is not None:
+                return measured
         
-        # Check if speedtest-cli is available as a command-line tool
-        try:
-            cmd = 'speedtest-cli --simple'
-            proc = subprocess.run(cmd, capture_output=True, text=True, shell=True, timeout=duration + 30)
-            
-            if proc.returncode == 0:
-                # Parse download speed
-                download_match = re.search(r'Download: (\d+\.\d+) Mbit/s', proc.stdout)
-                if download_match:
-                    result["download"] = float(download_match.group(1))
-                
-                # Parse upload speed
-                upload_match = re.search(r'Upload: (\d+\.\d+) Mbit/s', proc.stdout)
-                if upload_match:
-                    result["upload"] = float(upload_match.group(1))
-                
-                return result
-        except Exception as e:
-            logger.warning(f"Command-line speedtest-cli failed: {e}")
-        
-        # Try using PowerShell and Windows Performance Counters 
-        try:
-            logger.info("Using network interfaces to estimate bandwidth")
-            
-            # Get the active interface alias (name)
-            interface_cmd = 'powershell -Command "Get-NetAdapter | Where-Object {$_.Status -eq \'Up\'} | Select-Object -ExpandProperty Name"'
-            interface_result = subprocess.run(interface_cmd, capture_output=True, text=True, shell=True)
-            
-            if interface_result.returncode == 0 and interface_result.stdout.strip():
-                interface_name = interface_result.stdout.strip()
-                
-                # Get initial byte counts
-                initial_cmd = f'powershell -Command "(Get-NetAdapterStatistics -Name \'{interface_name}\').ReceivedBytes, (Get-NetAdapterStatistics -Name \'{interface_name}\').SentBytes"'
-                initial_result = subprocess.run(initial_cmd, capture_output=True, text=True, shell=True)
-                
-                if initial_result.returncode == 0 and initial_result.stdout:
-                    # Parse initial values
-                    values = initial_result.stdout.strip().split('\n')
-                    if len(values) >= 2:
-                        try:
-                            initial_rx = int(values[0].strip())
-                            initial_tx = int(values[1].strip())
-                            
-                            # Wait for the specified duration
-                            time.sleep(duration)
-                            
-                            # Get final byte counts
-                            final_cmd = f'powershell -Command "(Get-NetAdapterStatistics -Name \'{interface_name}\').ReceivedBytes, (Get-NetAdapterStatistics -Name \'{interface_name}\').SentBytes"'
-                            final_result = subprocess.run(final_cmd, capture_output=True, text=True, shell=True)
-                            
-                            if final_result.returncode == 0 and final_result.stdout:
-                                # Parse final values
-                                values = final_result.stdout.strip().split('\n')
-                                if len(values) >= 2:
-                                    final_rx = int(values[0].strip())
-                                    final_tx = int(values[1].strip())
-                                    
-                                    # Calculate bits per second (convert to Mbps)
-                                    rx_bps = (final_rx - initial_rx) * 8 / duration / 1_000_000
-                                    tx_bps = (final_tx - initial_tx) * 8 / duration / 1_000_000
-                                    
-                                    result["download"] = rx_bps
-                                    result["upload"] = tx_bps
-                                    
-                                    return result
-                        except (ValueError, IndexError) as e:
-                            logger.warning(f"Error parsing interface statistics: {e}")
-        except Exception as e:
-            logger.warning(f"Error using interface statistics for bandwidth measurement: {e}")
-                
         # If all direct measurements fail, try to get the link speed as an estimate
         try:
-            speed_cmd = 'powershell -Command "Get-NetAdapter | Where-Object {$_.Status -eq \'Up\'} | Select-Object -ExpandProperty LinkSpeed"'
-            speed_result = subprocess.run(speed_cmd, capture_output=True, text=True, shell=True)
+            speed_output, _, speed_returncode = run_powershell("Get-NetAdapter | Where-Object {$_.Status -eq 'Up'} | Select-Object -ExpandProperty LinkSpeed")
             
-            if speed_result.returncode == 0 and speed_result.stdout:
-                speed_text = speed_result.stdout.strip()
+            if speed_returncode == 0 and speed_output:
+                speed_text = speed_output.strip()
                 # Format is typically "1 Gbps" or "100 Mbps"
                 if "Gbps" in speed_text:
                     value = float(speed_text.split()[0])
@@ -505,82 +727,59 @@ def analyze_windows_network_congestion(interface: Optional[str] = None) -> float
         
         # Get the active interface if not specified
         if not interface:
-            active_interface_cmd = 'powershell -Command "Get-NetAdapter | Where-Object {$_.Status -eq \'Up\'} | Select-Object -ExpandProperty Name"'
-            result = subprocess.run(active_interface_cmd, capture_output=True, text=True, shell=True)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                interface = result.stdout.strip()
-            else:
+            interface = _first_up_adapter()
+            if not interface:
                 logger.warning("No active interface found for congestion analysis")
                 return 30.0  # Default to moderate congestion
         
-        # Factor 1: Measure jitter
-        jitter = measure_windows_jitter()
+        # Jitter and packet loss come from the same ping burst
+        jitter, packet_loss = _ping_stats("8.8.8.8", 10)
+        
+        # Factor 1: Measure jitter (no ping replies counts as no jitter)
         # Normalize jitter to a 0-100 scale (higher means more congestion)
         # 0ms jitter = 0% congestion, 30ms jitter = 100% congestion
-        jitter_factor = min(100, jitter * 3.33)
+        jitter_factor = min(100, (jitter or 0.0) * 3.33)
         congestion_factors.append(jitter_factor)
         
         # Factor 2: Measure packet loss
-        packet_loss = measure_windows_packet_loss()
+        if packet_loss is None:
+            packet_loss = _measure_packet_loss_fallback("8.8.8.8", 10)
         # Packet loss directly contributes to congestion assessment
         congestion_factors.append(packet_loss)
         
-        # Factor 3: Check network adapter statistics
+        # Factor 3: Check network adapter statistics (discarded packets and errors)
         try:
-            if interface:
-                # Check for discarded packets and errors
-                stats_cmd = f'powershell -Command "Get-NetAdapterStatistics -Name \'{interface}\' | Select-Object ReceivedDiscardedPackets, ReceivedPacketErrors, SentDiscardedPackets, SentPacketErrors, ReceivedPackets, SentPackets"'
-                stats_result = subprocess.run(stats_cmd, capture_output=True, text=True, shell=True)
+            stats = psutil.net_io_counters(pernic=True).get(interface)
+            if stats:
+                total_errors = stats.dropin + stats.errin + stats.dropout + stats.errout
+                total_packets = stats.packets_recv + stats.packets_sent
                 
-                if stats_result.returncode == 0 and stats_result.stdout:
-                    # Parse the values
-                    rx_discarded = re.search(r'ReceivedDiscardedPackets\s+:\s+(\d+)', stats_result.stdout)
-                    rx_errors = re.search(r'ReceivedPacketErrors\s+:\s+(\d+)', stats_result.stdout)
-                    tx_discarded = re.search(r'SentDiscardedPackets\s+:\s+(\d+)', stats_result.stdout)
-                    tx_errors = re.search(r'SentPacketErrors\s+:\s+(\d+)', stats_result.stdout)
-                    rx_packets = re.search(r'ReceivedPackets\s+:\s+(\d+)', stats_result.stdout)
-                    tx_packets = re.search(r'SentPackets\s+:\s+(\d+)', stats_result.stdout)
-                    
-                    if all([rx_discarded, rx_errors, tx_discarded, tx_errors, rx_packets, tx_packets]):
-                        total_errors = (int(rx_discarded.group(1)) + int(rx_errors.group(1)) + 
-                                       int(tx_discarded.group(1)) + int(tx_errors.group(1)))
-                        total_packets = int(rx_packets.group(1)) + int(tx_packets.group(1))
-                        
-                        if total_packets > 0:
-                            error_percent = min(100, (total_errors / max(1, total_packets)) * 100)
-                            congestion_factors.append(error_percent)
+                if total_packets > 0:
+                    error_percent = min(100, (total_errors / max(1, total_packets)) * 100)
+                    congestion_factors.append(error_percent)
         except Exception as e:
             logger.error(f"Error analyzing interface statistics: {e}")
         
         # Factor 4: Check TCP connection quality
         try:
-            # Get TCP connection statistics
-            tcp_cmd = 'powershell -Command "Get-NetTCPConnection | Where-Object {$_.State -eq \'Established\'} | Measure-Object | Select-Object -ExpandProperty Count"'
-            tcp_result = subprocess.run(tcp_cmd, capture_output=True, text=True, shell=True)
+            tcp_conn_count = sum(1 for conn in psutil.net_connections(kind='tcp') if conn.status == psutil.CONN_ESTABLISHED)
             
-            if tcp_result.returncode == 0 and tcp_result.stdout.strip():
-                tcp_conn_count = int(tcp_result.stdout.strip())
-                
-                # More than 100 concurrent TCP connections might indicate congestion
-                tcp_factor = min(100, (tcp_conn_count / 100) * 50)  # Scale: 0-50%
-                congestion_factors.append(tcp_factor)
+            # More than 100 concurrent TCP connections might indicate congestion
+            tcp_factor = min(100, (tcp_conn_count / 100) * 50)  # Scale: 0-50%
+            congestion_factors.append(tcp_factor)
         except Exception as e:
             logger.error(f"Error analyzing TCP connections: {e}")
         
         # Factor 5: Check system CPU usage as a proxy for local congestion
         try:
-            cpu_cmd = 'powershell -Command "Get-Counter -Counter \'\\Processor(_Total)\\% Processor Time\' | Select-Object -ExpandProperty CounterSamples | Select-Object -ExpandProperty CookedValue"'
-            cpu_result = subprocess.run(cpu_cmd, capture_output=True, text=True, shell=True)
+            # Usage since the previous call (primed at import)
+            cpu_usage = psutil.cpu_percent(interval=None)
             
-            if cpu_result.returncode == 0 and cpu_result.stdout.strip():
-                cpu_usage = float(cpu_result.stdout.strip())
-                
-                # High CPU usage could affect network performance
-                # CPU usage over 70% starts to contribute to congestion assessment
-                if cpu_usage > 70:
-                    cpu_factor = (cpu_usage - 70) * 3.33  # Scale: 0-100% for CPU usage 70-100%
-                    congestion_factors.append(cpu_factor * 0.5)  # Lower weight for CPU
+            # High CPU usage could affect network performance
+            # CPU usage over 70% starts to contribute to congestion assessment
+            if cpu_usage > 70:
+                cpu_factor = (cpu_usage - 70) * 3.33  # Scale: 0-100% for CPU usage 70-100%
+                congestion_factors.append(cpu_factor * 0.5)  # Lower weight for CPU
         except Exception as e:
             logger.error(f"Error checking system CPU usage: {e}")
         
@@ -606,33 +805,26 @@ def clear_windows_network_buffers() -> bool:
     
     try:
         # Flush DNS cache
-        dns_cmd = 'ipconfig /flushdns'
-        dns_result = subprocess.run(dns_cmd, capture_output=True, text=True, shell=True)
+        dns_cmd = [_IPCONFIG, '/flushdns']
+        dns_result = subprocess.run(dns_cmd, capture_output=True, text=True)
         
         if dns_result.returncode != 0:
             logger.warning(f"DNS cache flush failed: {dns_result.stderr}")
         
-        # Reset Winsock catalog
-        winsock_cmd = 'netsh winsock reset'
-        winsock_result = subprocess.run(winsock_cmd, capture_output=True, text=True, shell=True)
+        # Reset Winsock catalog and TCP/IP stack in one netsh process
+        reset_result = _run_netsh_script(['winsock reset', 'int ip reset'])
         
-        if winsock_result.returncode != 0:
-            logger.warning(f"Winsock reset failed: {winsock_result.stderr}")
-            
-        # Reset TCP/IP stack
-        ip_cmd = 'netsh int ip reset'
-        ip_result = subprocess.run(ip_cmd, capture_output=True, text=True, shell=True)
-        
-        if ip_result.returncode != 0:
-            logger.warning(f"TCP/IP reset failed: {ip_result.stderr}")
+        if reset_result.returncode != 0:
+            logger.warning(f"Winsock / TCP/IP reset failed: {reset_result.stdout.strip() or reset_result.stderr}")
         
         # Clear NetBIOS cache
-        nbtstat_cmd = 'nbtstat -R'
-        nbtstat_result = subprocess.run(nbtstat_cmd, capture_output=True, text=True, shell=True)
+        nbtstat_cmd = ['nbtstat', '-R']
+        nbtstat_result = subprocess.run(nbtstat_cmd, capture_output=True, text=True)
         
         # Reset network interfaces
-        interface_cmd = 'ipconfig /release && ipconfig /renew'
-        interface_result = subprocess.run(interface_cmd, capture_output=True, text=True, shell=True)
+        interface_result = subprocess.run([_IPCONFIG, '/release'], capture_output=True, text=True)
+        if interface_result.returncode == 0:
+            interface_result = subprocess.run([_IPCONFIG, '/renew'], capture_output=True, text=True)
         
         # Note: Some of these commands may require a system restart to take full effect
         logger.info("Successfully cleared network buffers (some changes may require a system restart)")
@@ -675,24 +867,22 @@ def set_windows_qos_priority(application: str, priority: str = 'high') -> bool:
         
         # Configure QoS policy using Group Policy
         # First, check if the policy exists
-        check_cmd = f'powershell -Command "Get-NetQosPolicy -Name \'{app_name}\' -ErrorAction SilentlyContinue"'
-        check_result = subprocess.run(check_cmd, capture_output=True, text=True, shell=True)
+        # (all three cmdlets run in the shared PowerShell session)
+        check_output, _, check_returncode = run_powershell(f"Get-NetQosPolicy -Name '{app_name}' -ErrorAction SilentlyContinue")
         
-        if "No MSFT_NetQosPolicy objects found" in check_result.stdout or check_result.returncode != 0:
+        if not check_output or "No MSFT_NetQosPolicy objects found" in check_output or check_returncode != 0:
             # Create a new policy
-            create_cmd = f'powershell -Command "New-NetQosPolicy -Name \'{app_name}\' -AppPathNameMatchCondition \'{application}\' -DSCPAction {dscp_value} -IPProtocol Both"'
-            create_result = subprocess.run(create_cmd, capture_output=True, text=True, shell=True)
+            create_output, _, create_returncode = run_powershell(f"New-NetQosPolicy -Name '{app_name}' -AppPathNameMatchCondition '{application}' -DSCPAction {dscp_value} -IPProtocol Both")
             
-            if create_result.returncode != 0:
-                logger.error(f"Failed to create QoS policy: {create_result.stderr}")
+            if create_returncode != 0:
+                logger.error(f"Failed to create QoS policy: {create_output}")
                 return False
         else:
             # Update existing policy
-            update_cmd = f'powershell -Command "Set-NetQosPolicy -Name \'{app_name}\' -DSCPAction {dscp_value}"'
-            update_result = subprocess.run(update_cmd, capture_output=True, text=True, shell=True)
+            update_output, _, update_returncode = run_powershell(f"Set-NetQosPolicy -Name '{app_name}' -DSCPAction {dscp_value}")
             
-            if update_result.returncode != 0:
-                logger.error(f"Failed to update QoS policy: {update_result.stderr}")
+            if update_returncode != 0:
+                logger.error(f"Failed to update QoS policy: {update_output}")
                 return False
         
         logger.info(f"Successfully set QoS priority for {app_name} to {priority}")
@@ -701,6 +891,81 @@ def set_windows_qos_priority(application: str, priority: str = 'high') -> bool:
         logger.error(f"Error setting QoS priority: {e}")
         return False
 
+def _format_link_speed(bps: int) -> str:
+    """Format a link speed in bits per second the way Get-NetAdapter does (e.g. '1 Gbps')."""
+    if bps >= 1_000_000_000:
+        return f"{bps / 1_000_000_000:g} Gbps"
+    if bps >= 1_000_000:
+        return f"{bps / 1_000_000:g} Mbps"
+    return f"{bps / 1_000:g} Kbps"
+
+def _iphlpapi_interfaces() -> Optional[List[Dict[str, Any]]]:
+    """
+    List network adapters with their addresses through GetAdaptersAddresses.
+    
+    Returns:
+        List of interface dictionaries, or None if the IP Helper API call failed
+    """
+    iphlpapi = ctypes.WinDLL("iphlpapi")
+    iphlpapi.GetAdaptersAddresses.argtypes = [wintypes.ULONG, wintypes.ULONG, ctypes.c_void_p,
+                                              ctypes.c_void_p, ctypes.POINTER(wintypes.ULONG)]
+    iphlpapi.GetAdaptersAddresses.restype = wintypes.ULONG
+    
+    flags = _GAA_FLAG_SKIP_ANYCAST | _GAA_FLAG_SKIP_MULTICAST | _GAA_FLAG_SKIP_DNS_SERVER
+    # 15 KB is Microsoft's suggested starting size; retry if the table grew
+    size = wintypes.ULONG(15 * 1024)
+    for _ in range(3):
+        buf = ctypes.create_string_buffer(size.value)
+        ret = iphlpapi.GetAdaptersAddresses(_AF_UNSPEC, flags, None, buf, ctypes.byref(size))
+        if ret != _ERROR_BUFFER_OVERFLOW:
+            break
+    if ret == _ERROR_NO_DATA:
+        return []
+    if ret != 0:
+        logger.warning(f"GetAdaptersAddresses failed with error {ret}")
+        return None
+    
+    interfaces = []
+    adapter = ctypes.cast(buf, ctypes.POINTER(_IP_ADAPTER_ADDRESSES))
+    while adapter:
+        info = adapter.contents
+        adapter = info.Next
+        if info.IfType in _IF_TYPES_HIDDEN:
+            continue
+        
+        interface_info = {
+            'name': info.FriendlyName or '',
+            'description': info.Description or '',
+            'status': _IF_OPER_STATUS.get(info.OperStatus, 'Unknown'),
+            'mac': '-'.join(f"{b:02X}" for b in info.PhysicalAddress[:info.PhysicalAddressLength]),
+            'speed': _format_link_speed(info.TransmitLinkSpeed),
+            'ipv4': [],
+            'ipv6': []
+        }
+        
+        address = info.FirstUnicastAddress
+        while address:
+            entry = address.contents
+            address = entry.Next
+            sockaddr = ctypes.string_at(entry.Address.lpSockaddr, entry.Address.iSockaddrLength)
+            family = int.from_bytes(sockaddr[:2], 'little')
+            # sockaddr_in keeps the address at offset 4, sockaddr_in6 at offset 8
+            if family == _AF_INET:
+                interface_info['ipv4'].append({
+                    'address': socket.inet_ntop(socket.AF_INET, sockaddr[4:8]),
+                    'prefix': entry.OnLinkPrefixLength
+                })
+            elif family == _AF_INET6:
+                interface_info['ipv6'].append({
+                    'address': socket.inet_ntop(socket.AF_INET6, sockaddr[8:24]),
+                    'prefix': entry.OnLinkPrefixLength
+                })
+        
+        interfaces.append(interface_info)
+    
+    return interfaces
+
+@ttl_cache(ttl=10.0)
 def get_windows_network_interfaces() -> List[Dict[str, Any]]:
     """
     Get detailed information about network interfaces on Windows.
@@ -711,74 +976,18 @@ def get_windows_network_interfaces() -> List[Dict[str, Any]]:
     interfaces = []
     
     try:
-        # Use PowerShell to get network adapter information
-        cmd = 'powershell -Command "Get-NetAdapter | Select-Object Name, InterfaceDescription, Status, MacAddress, LinkSpeed | ConvertTo-Json"'
-        result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-        
-        if result.returncode == 0 and result.stdout:
-            try:
-                # Parse JSON output
-                import json
-                
-                # Check if we got a single object or an array
-                if result.stdout.strip().startswith('{'):
-                    # Single object
-                    adapter_data = [json.loads(result.stdout)]
-                else:
-                    # Array of objects
-                    adapter_data = json.loads(result.stdout)
-                
-                for adapter in adapter_data:
-                    # Basic interface information
-                    interface_info = {
-                        'name': adapter.get('Name', ''),
-                        'description': adapter.get('InterfaceDescription', ''),
-                        'status': adapter.get('Status', ''),
-                        'mac': adapter.get('MacAddress', ''),
-                        'speed': adapter.get('LinkSpeed', ''),
-                        'ipv4': [],
-                        'ipv6': []
-                    }
-                    
-                    # Get IP addresses for this adapter
-                    ip_cmd = f'powershell -Command "Get-NetIPAddress -InterfaceAlias \'{interface_info["name"]}\' | Select-Object IPAddress, PrefixLength, AddressFamily | ConvertTo-Json"'
-                    ip_result = subprocess.run(ip_cmd, capture_output=True, text=True, shell=True)
-                    
-                    if ip_result.returncode == 0 and ip_result.stdout:
-                        try:
-                            # Check if we got a single object or an array
-                            if ip_result.stdout.strip().startswith('{'):
-                                # Single object
-                                ip_data = [json.loads(ip_result.stdout)]
-                            else:
-                                # Array of objects
-                                ip_data = json.loads(ip_result.stdout)
-                            
-                            for ip in ip_data:
-                                address_family = ip.get('AddressFamily', 0)
-                                if address_family == 2:  # IPv4
-                                    interface_info['ipv4'].append({
-                                        'address': ip.get('IPAddress', ''),
-                                        'prefix': ip.get('PrefixLength', 0)
-                                    })
-                                elif address_family == 23:  # IPv6
-                                    interface_info['ipv6'].append({
-                                        'address': ip.get('IPAddress', ''),
-                                        'prefix': ip.get('PrefixLength', 0)
-                                    })
-                        except json.JSONDecodeError:
-                            logger.warning(f"Failed to parse IP information JSON for {interface_info['name']}")
-                    
-                    interfaces.append(interface_info)
-            
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse adapter information JSON")
+        # The IP Helper API returns adapters and their addresses in one
+        # in-process call, without starting PowerShell or parsing JSON
+        try:
+            interfaces = _iphlpapi_interfaces() or []
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read adapters from the IP Helper API: {e}")
         
-        # If PowerShell with JSON fails, fallback to standard command parsing
+        # If the IP Helper API fails, fallback to standard command parsing
         if not interfaces:
             # Use ipconfig for a more compatible approach
-            cmd = 'ipconfig /all'
-            result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
+            cmd = [_IPCONFIG, '/all']
+            result = subprocess.run(cmd, capture_output=True, text=True)
             
             if result.returncode == 0:
                 sections = result.stdout.split('\r\n\r\n')
@@ -821,7 +1030,7 @@ def get_windows_network_interfaces() -> List[Dict[str, Any]]:
                             elif "Subnet Mask" in line and interface_info['ipv4']:
                                 mask = line.split(':')[1].strip()
                                 # Convert subnet mask to prefix length (approximate)
-                                prefix = sum([bin(int(x)).count('1') for x in mask.split('.')])
+                                prefix = sum(_POPCOUNT[int(x)] for x in mask.split('.'))
                                 interface_info['ipv4'][-1]['prefix'] = prefix
                             elif "IPv6 Address" in line:
                                 ipv6 = line.split(':')[1].strip().split('(')[0].strip()
@@ -836,15 +1045,3 @@ def get_windows_network_interfaces() -> List[Dict[str, Any]]:
         logger.error(f"Error getting network interfaces: {e}")
     
     return interfaces
-
-def import_time_module():
-    """
-    Import the time module for use by other functions.
-    This is separated to avoid import issues when the module is first loaded.
-    """
-    global time
-    import time
-    return time
-
-# Import time module for bandwidth measurements
-time = import_time_module() 
\ No newline at end of file
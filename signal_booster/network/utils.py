@@ -4,31 +4,86 @@ This module provides specialized functions for network measurement and informati
 """
 
 import time
-import urllib.request
+import struct
+import ctypes
+from ctypes import wintypes
+import http.client
+from concurrent.futures import ThreadPoolExecutor
 from signal_booster.network.common import *
 from signal_booster.network.interfaces import get_network_interfaces, _get_interface_speed
 
+# Parsers for ping summaries and ifconfig output
+_PING_WIN = re.compile(r"Minimum = (\d+)ms, Maximum = (\d+)ms, Average = (\d+)ms")
+_PING_UNIX = re.compile(r"min/avg/max/mdev = (\d+\.\d+)/(\d+\.\d+)/(\d+\.\d+)")
+_IFCONFIG_MTU = re.compile(r"mtu\s+(\d+)")
+
+# Kernel routing table; its columns are hex, in host (little-endian) byte order
+_PROC_NET_ROUTE = "/proc/net/route"
+_RTF_GATEWAY = 0x2
+
+
+class _MIB_IPFORWARDROW(ctypes.Structure):
+    _fields_ = [(name, wintypes.DWORD) for name in (
+        "dwForwardDest", "dwForwardMask", "dwForwardPolicy", "dwForwardNextHop",
+        "dwForwardIfIndex", "dwForwardType", "dwForwardProto", "dwForwardAge",
+        "dwForwardNextHopAS", "dwForwardMetric1", "dwForwardMetric2",
+        "dwForwardMetric3", "dwForwardMetric4", "dwForwardMetric5")]
+
+
+def _windows_default_gateway() -> Optional[str]:
+    """Ask the IP Helper API for the best route to 0.0.0.0 and return its next hop."""
+    row = _MIB_IPFORWARDROW()
+    if ctypes.WinDLL("iphlpapi").GetBestRoute(0, 0, ctypes.byref(row)) != 0:
+        return None
+    # Addresses are stored in network byte order inside the DWORD
+    next_hop = row.dwForwardNextHop
+    return socket.inet_ntoa(struct.pack("<L", next_hop)) if next_hop else None
+
+
+def _linux_default_gateway() -> Optional[str]:
+    """Read the default route's gateway from /proc/net/route."""
+    with open(_PROC_NET_ROUTE) as f:
+        next(f)  # header
+        for line in f:
+            fields = line.split()
+            if len(fields) > 3 and fields[1] == "00000000" and int(fields[3], 16) & _RTF_GATEWAY:
+                return socket.inet_ntoa(struct.pack("<L", int(fields[2], 16)))
+    return None
+
+
+# The gateway and interface list change on a scale of seconds to minutes
+@ttl_cache(ttl=10.0)
 def get_default_gateway() -> Optional[str]:
     """Get the default gateway IP address."""
+    # Native lookups first; the command-line parsers below are the fallback
+    try:
+        if platform.system() == "Windows":
+            gateway = _windows_default_gateway()
+        elif os.path.exists(_PROC_NET_ROUTE):
+            gateway = _linux_default_gateway()
+        else:
+            gateway = None
+        if gateway:
+            return gateway
+    except (OSError, ValueError, StopIteration) as e:
+        logger.debug(f"Native default gateway lookup failed: {e}")
+    
     try:
         if platform.system() == "Windows":
-            proc = subprocess.Popen(["ipconfig"], stdout=subprocess.PIPE)
-            while True:
-                line = proc.stdout.readline()
-                if not line:
-                    break
-                line = line.decode("utf-8", errors="ignore").strip()
-                if "Default Gateway" in line:
-                    gateway = line.split(":")[-1].strip()
-                    if gateway and gateway != "None":
-                        return gateway
+            # Get-NetRoute reports the next hop without locale-dependent
+            # labels, and runs in the shared PowerShell session
+            output, _, returncode = run_powershell(
+                "Get-NetRoute -DestinationPrefix 0.0.0.0/0 -ErrorAction SilentlyContinue | "
+                "Sort-Object RouteMetric | Select-Object -First 1 -ExpandProperty NextHop"
+            )
+            gateway = output.strip() if returncode == 0 and output else ""
+            if gateway and gateway != "0.0.0.0":
+                return gateway
         else:  # Linux/macOS
-            proc = subprocess.Popen(["ip", "route"], stdout=subprocess.PIPE)
-            while True:
-                line = proc.stdout.readline()
-                if not line:
-                    break
-                line = line.decode("utf-8", errors="ignore").strip()
+            # Read the whole output at once and scan it in memory
+            output = subprocess.check_output(["ip", "route"], universal_newlines=True, errors="ignore")
+            for line in output.splitlines():
+                line = line.strip()
                 if line.startswith("default"):
                     parts = line.split()
                     idx = parts.index("via")
@@ -60,7 +115,7 @@ def measure_latency(host: str = "8.8.8.8", count: int = 5) -> Dict[str, float]:
             )
             
             # Extract latency stats from output
-            match = re.search(r"Minimum = (\d+)ms, Maximum = (\d+)ms, Average = (\d+)ms", output)
+            match = _PING_WIN.search(output)
             if match:
                 result["min"] = float(match.group(1))
                 result["max"] = float(match.group(2))
@@ -73,7 +128,7 @@ def measure_latency(host: str = "8.8.8.8", count: int = 5) -> Dict[str, float]:
             )
             
             # Extract latency stats from output
-            match = re.search(r"min/avg/max/mdev = (\d+\.\d+)/(\d+\.\d+)/(\d+\.\d+)", output)
+            match = _PING_UNIX.search(output)
             if match:
                 result["min"] = float(match.group(1))
                 result["avg"] = float(match.group(2))
@@ -108,6 +163,53 @@ def _measure_speed_with_speedtest() -> Dict[str, float]:
     return result
 
 
+# Download test for _measure_speed_alternative: several connections share the
+# payload (10 MB in total) so one flow's congestion window does not cap it
+_SPEED_TEST_HOST = "speed.cloudflare.com"
+_SPEED_TEST_STREAMS = 8
+_SPEED_TEST_STREAM_BYTES = 1_250_000
+
+# Linux zero-copy send for the upload probe; the socket module does not
+# export these (values from <asm-generic/socket.h> and <linux/socket.h>)
+_SO_ZEROCOPY = 60
+_MSG_ZEROCOPY = 0x4000000
+
+# Upload probe payload (1MB), allocated once and reused by every measurement
+_UPLOAD_PAYLOAD = bytes(1_000_000)
+
+
+def _measure_parallel_download() -> float:
+    """
+    Download the test payload over parallel connections that start together.
+    
+    Returns:
+        Aggregate download speed in Mbps
+    """
+    started = []
+    # Connections are set up first; the clock starts once all are ready
+    barrier = threading.Barrier(_SPEED_TEST_STREAMS, action=lambda: started.append(time.perf_counter()),
+                                timeout=30)
+    
+    def stream(_):
+        conn = http.client.HTTPSConnection(_SPEED_TEST_HOST, timeout=30)
+        try:
+            conn.connect()
+            barrier.wait()
+            conn.request("GET", f"/__down?bytes={_SPEED_TEST_STREAM_BYTES}")
+            return len(conn.getresponse().read())
+        except Exception:
+            # Release the other streams instead of leaving them at the barrier
+            barrier.abort()
+            raise
+        finally:
+            conn.close()
+    
+    with ThreadPoolExecutor(max_workers=_SPEED_TEST_STREAMS) as pool:
+        total_bytes = sum(pool.map(stream, range(_SPEED_TEST_STREAMS)))
+    elapsed = time.perf_counter() - started[0]
+    return total_bytes * 8 / elapsed / 1_000_000
+
+
 def _measure_speed_alternative() -> Dict[str, float]:
     """Alternative method to measure internet speed without speedtest-cli."""
     result = {"download": 0.0, "upload": 0.0, "ping": 0.0}
@@ -117,20 +219,9 @@ def _measure_speed_alternative() -> Dict[str, float]:
         ping_result = measure_latency(host="8.8.8.8", count=5)
         result["ping"] = ping_result["avg"]
         
-        # Use a simple file download to estimate download speed
+        # Download a test payload over parallel connections to estimate download speed
         try:
-            # Standard test file for download speed (10MB file)
-            url = "https://speed.cloudflare.com/__down?bytes=10000000"
-            
-            start_time = time.time()
-            with urllib.request.urlopen(url) as response:
-                downloaded_data = response.read()
-            end_time = time.time()
-            
-            # Calculate download speed in Mbps
-            download_time = end_time - start_time
-            file_size_bits = len(downloaded_data) * 8
-            result["download"] = file_size_bits / download_time / 1_000_000
+            result["download"] = _measure_parallel_download()
         except Exception as e:
             logger.error(f"Error measuring download speed: {e}")
             
@@ -142,19 +233,24 @@ def _measure_speed_alternative() -> Dict[str, float]:
             # Connect to a reliable server
             sock.connect(("8.8.8.8", 443))
             
-            # Create a test payload (1MB)
-            test_data = b'x' * 1_000_000
+            # On Linux, let the kernel send straight from the payload's pages
+            send_flags = 0
+            if sys.platform.startswith("linux"):
+                try:
+                    sock.setsockopt(socket.SOL_SOCKET, _SO_ZEROCOPY, 1)
+                    send_flags = _MSG_ZEROCOPY
+                except OSError:
+                    pass
             
-            # Measure upload time
+            # Measure upload time; sendall raises unless every byte was sent
             start_time = time.time()
-            bytes_sent = 0
             for _ in range(5):  # Send data multiple times
-                bytes_sent += sock.send(test_data)
+                sock.sendall(_UPLOAD_PAYLOAD, send_flags)
             end_time = time.time()
             
             # Calculate upload speed
             upload_time = end_time - start_time
-            bits_sent = bytes_sent * 8
+            bits_sent = 5 * len(_UPLOAD_PAYLOAD) * 8
             result["upload"] = bits_sent / upload_time / 1_000_000
         except Exception as e:
             logger.error(f"Error estimating upload speed: {e}")
@@ -191,6 +287,9 @@ def _measure_speed_alternative() -> Dict[str, float]:
     return result
 
 
+# A speed test downloads megabytes; repeat queries within a minute reuse it.
+# Failed tests (all zeros) are not cached, so the next call tries again
+@ttl_cache(ttl=60.0, cache_if=lambda result: result["download"] or result["upload"])
 def measure_speed() -> Dict[str, float]:
     """
     Measure internet speed.
@@ -223,6 +322,14 @@ def find_optimal_mtu(target: str = "8.8.8.8") -> int:
     Returns:
         Optimal MTU size
     """
+    mtu = _probe_optimal_mtu(target)
+    return 1500 if mtu is None else mtu  # Default MTU
+
+
+# Failed probes are not cached, so the next call tries again
+@ttl_cache(ttl=60.0, cache_if=lambda mtu: mtu is not None)
+def _probe_optimal_mtu(target: str) -> Optional[int]:
+    """Probe the optimal MTU on this platform, or return None if the probe failed."""
     try:
         if platform.system() == "Windows":
             return _find_windows_optimal_mtu(target)
@@ -232,116 +339,104 @@ def find_optimal_mtu(target: str = "8.8.8.8") -> int:
             return _find_macos_optimal_mtu(target)
     except Exception as e:
         logger.error(f"Error finding optimal MTU: {e}")
-    return 1500  # Default MTU
+    return None
+
+
+# Candidate MTUs, largest first; they are probed in parallel
+_MTU_CANDIDATES = range(1500, 1199, -8)
+# Concurrent pings while probing
+_MTU_PROBE_WORKERS = 8
 
 
-def _find_windows_optimal_mtu(target: str) -> int:
-    """Find optimal MTU on Windows."""
+def _largest_working_mtu(ping_command, too_large_markers, loss_markers=(), candidates=_MTU_CANDIDATES,
+                         default=1500) -> Optional[int]:
+    """
+    Probe the candidate MTUs in parallel and return the largest that got through.
+    
+    Args:
+        ping_command: Function returning the don't-fragment ping command for a payload size
+        too_large_markers: Ping output fragments meaning the packet was too large
+        loss_markers: Ping output fragments meaning the probe got no reply,
+            which may just be the target rate-limiting ICMP
+        candidates: MTUs to probe, largest first
+        default: MTU to return if none got through (None reports a failed probe)
+        
+    Returns:
+        Largest working MTU, or default if none did
+    """
+    def fits(mtu):
+        # Payload size excludes the 28 bytes of IP and ICMP headers
+        stdout, _, _ = run_command(ping_command(mtu - 28))
+        if stdout and any(marker in stdout for marker in loss_markers):
+            # A lost reply is tried once more before the size counts as too large
+            stdout, _, _ = run_command(ping_command(mtu - 28))
+        return not (stdout and any(marker in stdout for marker in too_large_markers + loss_markers))
+    
+    # Each probe mostly waits on the network, so threads overlap them well;
+    # targets such as 8.8.8.8 rate-limit ICMP, so keep the burst small
+    with ThreadPoolExecutor(max_workers=_MTU_PROBE_WORKERS) as pool:
+        results = list(pool.map(fits, candidates))
+    return next((mtu for mtu, ok in zip(candidates, results) if ok), default)
+
+
+def _find_windows_optimal_mtu(target: str) -> Optional[int]:
+    """Find optimal MTU on Windows, or None if the probe failed."""
     try:
         # Windows uses ping with -f (don't fragment) and -l (size) to test MTU
-        max_mtu = 1500  # Start with standard MTU
-        min_mtu = 1200  # Minimum to test
-        optimal_mtu = 1500  # Default
-        
-        # Binary search to find optimal MTU
-        while max_mtu - min_mtu > 8:
-            test_mtu = (max_mtu + min_mtu) // 2
-            
-            # Ping with don't fragment flag
-            stdout, _, returncode = run_command(
-                ["ping", "-f", "-l", str(test_mtu - 28), "-n", "1", target]
-            )
-            
-            if stdout and ("Packet needs to be fragmented" in stdout or "100% loss" in stdout):
-                # MTU too large
-                max_mtu = test_mtu
-            else:
-                # MTU is good
-                min_mtu = test_mtu
-                optimal_mtu = test_mtu
-        
-        # Add 28 bytes for the IP and ICMP headers that weren't included in our test
-        return optimal_mtu
+        return _largest_working_mtu(
+            lambda size: ["ping", "-f", "-l", str(size), "-n", "1", target],
+            ("Packet needs to be fragmented",),
+            ("100% loss",),
+            # Nothing got through (e.g. the host is unreachable): no reading
+            default=None
+        )
     
     except Exception as e:
         logger.error(f"Error finding optimal MTU on Windows: {e}")
-    
-    # Default to standard MTU
-    return 1500
+    return None
 
 
-def _find_linux_optimal_mtu(target: str) -> int:
-    """Find optimal MTU on Linux."""
+def _find_linux_optimal_mtu(target: str) -> Optional[int]:
+    """Find optimal MTU on Linux, or None if the probe failed."""
     try:
-        max_mtu = 1500  # Start with standard MTU
-        min_mtu = 1200  # Minimum to test
-        optimal_mtu = 1500  # Default
-        
-        # Binary search to find optimal MTU
-        while max_mtu - min_mtu > 8:
-            test_mtu = (max_mtu + min_mtu) // 2
-            
-            # Ping with don't fragment flag
-            stdout, _, returncode = run_command(
-                ["ping", "-M", "do", "-s", str(test_mtu - 28), "-c", "1", target]
-            )
-            
-            if stdout and ("Frag needed" in stdout or "Message too long" in stdout or "100% packet loss" in stdout):
-                # MTU too large
-                max_mtu = test_mtu
-            else:
-                # MTU is good
-                min_mtu = test_mtu
-                optimal_mtu = test_mtu
-        
-        # Add 28 bytes for the IP and ICMP headers that weren't included in our test
-        return optimal_mtu
+        # Ping with don't fragment flag
+        return _largest_working_mtu(
+            lambda size: ["ping", "-M", "do", "-s", str(size), "-c", "1", target],
+            ("Frag needed", "Message too long"),
+            ("100% packet loss",),
+            # Nothing got through (e.g. the host is unreachable): no reading
+            default=None
+        )
     
     except Exception as e:
         logger.error(f"Error finding optimal MTU on Linux: {e}")
-    
-    # Default to standard MTU
-    return 1500
+    return None
 
 
-def _find_macos_optimal_mtu(target: str) -> int:
-    """Find optimal MTU on macOS."""
+def _find_macos_optimal_mtu(target: str) -> Optional[int]:
+    """Find optimal MTU on macOS, or None if the probe failed."""
     try:
         # Get current MTU as starting point
         stdout, _, _ = run_command(["ifconfig"])
         
         # Find current MTU
         # Example: "mtu 1500"
-        mtu_match = re.search(r"mtu\s+(\d+)", stdout) if stdout else None
+        mtu_match = _IFCONFIG_MTU.search(stdout) if stdout else None
         current_mtu = int(mtu_match.group(1)) if mtu_match else 1500
         
-        # Start with the current MTU and work downward
-        optimal_mtu = current_mtu
-        
-        # Test different MTU sizes
-        for test_mtu in range(current_mtu, 1400, -8):  # Decrement by 8 bytes at a time
-            # Use ping with Don't Fragment flag to test MTU
-            stdout, _, _ = run_command(
-                ["ping", "-D", "-s", str(test_mtu - 28), "-c", "1", target]
-            )
-            
-            if stdout and ("100.0% packet loss" in stdout or "DUP!" in stdout):
-                # This MTU is too large
-                continue
-            else:
-                # This MTU is good
-                optimal_mtu = test_mtu
-                break
-        
-        # Optimal MTU is 28 bytes less than the largest packet that can be sent
-        # (IP header: 20 bytes, ICMP header: 8 bytes)
-        return optimal_mtu
+        # Test sizes from the current MTU downward in 8-byte steps in parallel,
+        # using ping with the Don't Fragment flag
+        return _largest_working_mtu(
+            lambda size: ["ping", "-D", "-s", str(size), "-c", "1", target],
+            ("DUP!",),
+            ("100.0% packet loss",),
+            candidates=range(current_mtu, 1400, -8),
+            default=current_mtu
+        )
     
     except Exception as e:
         logger.error(f"Error finding optimal MTU on macOS: {e}")
-    
-    # Default to standard MTU
-    return 1500
+    return None
 
 
 def set_dns_servers(dns_servers: List[str], interface: Optional[str] = None) -> bool:
@@ -358,18 +453,25 @@ def set_dns_servers(dns_servers: List[str], interface: Optional[str] = None) ->
     try:
         if platform.system() == "Windows":
             from signal_booster.network.platform.windows import set_windows_dns
-            return set_windows_dns(dns_servers, interface)
+            success = set_windows_dns(dns_servers, interface)
         elif platform.system() == "Linux":
             from signal_booster.network.platform.linux import set_linux_dns
-            return set_linux_dns(dns_servers, interface)
+            success = set_linux_dns(dns_servers, interface)
         elif platform.system() == "Darwin":  # macOS
             from signal_booster.network.platform.macos import set_macos_dns
-            return set_macos_dns(dns_servers, interface)
+            success = set_macos_dns(dns_servers, interface)
+        else:
+            return False
+        
+        if success:
+            invalidate_network_cache()
+        return success
     except Exception as e:
         logger.error(f"Error setting DNS servers: {e}")
     return False
 
 
+@ttl_cache()
 def get_wifi_signal_strength() -> int:
     """
     Get WiFi signal strength.
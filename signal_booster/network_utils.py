@@ -11,15 +11,27 @@ import platform
 import socket
 import shutil
 import re
+import time
+import struct
 import logging
-from typing import List, Dict, Tuple, Optional, Any, Union
+import functools
+import threading
+import asyncio
+import statistics
+import ctypes
+from ctypes import wintypes
+from typing import List, Dict, Tuple, Optional, Any, Union, NamedTuple
+from concurrent.futures import ThreadPoolExecutor
 
 import psutil
-import numpy as np
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# The platform cannot change while we run; decide it once
+_IS_WINDOWS = sys.platform.startswith("win")
+_IS_LINUX = sys.platform.startswith("linux")
+
 # Try to import speedtest but don't fail if it's not available
 try:
     import speedtest
@@ -36,36 +48,90 @@ except ImportError:
     logger.warning("netifaces not available, network interface detection will be limited")
     HAS_NETIFACES = False
 
+# pyroute2 reads the routing table over netlink; only useful on Linux
+HAS_PYROUTE2 = False
+if _IS_LINUX:
+    try:
+        import pyroute2
+        HAS_PYROUTE2 = True
+    except ImportError:
+        logger.debug("pyroute2 not available, default gateway lookup will use the ip command")
+
 # Windows-specific imports
-if platform.system() == "Windows":
+if _IS_WINDOWS:
     try:
         import winreg
     except ImportError:
         import _winreg as winreg
 
+# Link speed only changes on carrier events; cached speeds expire with
+# each period of this many seconds
+_SPEED_CACHE_PERIOD = 30.0
+
+# Command-line tools resolved once, so calls skip the PATH search
+_PING_BIN = shutil.which("ping") or "ping"
+_IP_BIN = shutil.which("ip") or "ip"
+_IPCONFIG_BIN = shutil.which("ipconfig") or "ipconfig"
+
+# Name prefixes of wireless interfaces (wlan0, wlp2s0, Wi-Fi, Wireless ...)
+_WIRELESS_PREFIXES = frozenset({"wi", "wl"})
+
+# Ping summary parsers; they match the raw output bytes, so it is not decoded
+_PING_RE_WIN = re.compile(rb"Minimum = (\d+)ms, Maximum = (\d+)ms, Average = (\d+)ms")
+_PING_RE_NIX = re.compile(rb"min/avg/max/mdev = (\d+\.\d+)/(\d+\.\d+)/(\d+\.\d+)")
+
+# Default gateway in raw `ip route` and ipconfig output; ipconfig may list IPv6
+# gateways first, on the same or continuation lines, which are skipped
+_GW_RE_LINUX = re.compile(rb"^default via (\S+)", re.M)
+_GW_RE_WIN = re.compile(rb"Default Gateway[ .]*:\s*(?:\S*:\S*\s+)*(\d+\.\d+\.\d+\.\d+)")
+
+class LatencyStats(NamedTuple):
+    """Round-trip times to a host in ms (all 0.0 when nothing answered)."""
+    min: float
+    avg: float
+    max: float
+
+class SpeedStats(NamedTuple):
+    """Internet speed in Mbps and speed test server ping in ms."""
+    download: float
+    upload: float
+    ping: float
+
 # Implementation of helper functions - no circular imports
 def _get_interface_speed(interface_name: str) -> int:
     """Get the speed of a network interface in Mbps."""
+    return _cached_interface_speed(interface_name, int(time.monotonic() / _SPEED_CACHE_PERIOD))
+
+@functools.lru_cache(maxsize=1)
+def _adapter_class_key():
+    """Open the network adapter class registry key once and keep it open."""
+    key_path = f"SYSTEM\\CurrentControlSet\\Control\\Class\\{{4D36E972-E325-11CE-BFC1-08002BE10318}}\\0000"
+    return winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path)
+
+@functools.lru_cache(maxsize=64)
+def _cached_interface_speed(interface_name: str, period: int) -> int:
+    """Read an interface's speed in Mbps; `period` only makes entries expire."""
     speed = 100  # Default to 100 Mbps
     
     try:
-        if platform.system() == "Windows":
+        if _IS_WINDOWS:
             # On Windows, we can get the speed from the registry
-            key_path = f"SYSTEM\\CurrentControlSet\\Control\\Class\\{{4D36E972-E325-11CE-BFC1-08002BE10318}}\\0000"
             try:
-                key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path)
-                speed_value = winreg.QueryValueEx(key, "LinkSpeed")[0]
+                speed_value = winreg.QueryValueEx(_adapter_class_key(), "LinkSpeed")[0]
                 if isinstance(speed_value, int):
                     speed = speed_value
-                winreg.CloseKey(key)
             except Exception:
                 pass
-        elif platform.system() == "Linux":
-            # On Linux, we can get the speed from /sys/class/net
+        elif _IS_LINUX:
+            # On Linux, we can get the speed from /sys/class/net; a raw read
+            # skips building a text file object for a few bytes
             try:
-                with open(f"/sys/class/net/{interface_name}/speed", "r") as f:
-                    speed = int(f.read().strip())
-            except Exception:
+                fd = os.open(f"/sys/class/net/{interface_name}/speed", os.O_RDONLY)
+                try:
+                    speed = int(os.read(fd, 16))
+                finally:
+                    os.close(fd)
+            except (OSError, ValueError):
                 pass
     except Exception as e:
         logger.error(f"Error getting interface speed: {e}")
@@ -74,37 +140,186 @@ def _get_interface_speed(interface_name: str) -> int:
 
 # Direct implementations of utility functions without imports from signal_booster.network
 
-def get_default_gateway() -> Optional[str]:
-    """Get the default gateway IP address."""
+def _icmp_checksum(data: bytes) -> int:
+    """Internet checksum (RFC 1071) of an ICMP message."""
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+def _icmp_echo_request(seq: int) -> bytes:
+    """Build an ICMP echo request; Linux replaces the identifier with the socket's own."""
+    payload = b"signal-booster"
+    ident = os.getpid() & 0xFFFF
+    header = struct.pack("!BBHHH", 8, 0, 0, ident, seq)
+    return struct.pack("!BBHHH", 8, 0, _icmp_checksum(header + payload), ident, seq) + payload
+
+def _icmp_echo_reply_seq(data: bytes) -> Optional[int]:
+    """Return the sequence number of an ICMP echo reply, or None for other packets."""
+    # macOS delivers the IP header as well; Linux does not
+    if data and data[0] >> 4 == 4:
+        data = data[(data[0] & 0x0F) * 4:]
+    if len(data) >= 8 and data[0] == 0:
+        return struct.unpack("!H", data[6:8])[0]
+    return None
+
+def _latency_stats(rtts: List[float]) -> LatencyStats:
+    """Summarize round-trip times in ms as min, avg, max (all 0.0 without replies)."""
+    if not rtts:
+        return LatencyStats(0.0, 0.0, 0.0)
+    return LatencyStats(min(rtts), statistics.mean(rtts), max(rtts))
+
+def _icmp_ping(host: str, count: int, timeout: float = 1.0) -> Optional[List[float]]:
+    """
+    Ping a host from Python with an unprivileged ICMP socket instead of running ping.
+    
+    Args:
+        host: Host to ping
+        count: Number of echo requests to send
+        timeout: Seconds to wait for each reply
+        
+    Returns:
+        Round-trip times in ms of the answered echoes, or None if ICMP sockets
+        are not available here (e.g. on Windows, or when the user is outside
+        net.ipv4.ping_group_range on Linux)
+    """
     try:
-        if platform.system() == "Windows":
-            proc = subprocess.Popen(["ipconfig"], stdout=subprocess.PIPE)
+        address = socket.gethostbyname(host)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+    except OSError:
+        return None
+    
+    rtts = []
+    with sock:
+        for seq in range(count):
+            sent = time.perf_counter()
+            sock.sendto(_icmp_echo_request(seq), (address, 0))
+            
+            # Wait for the matching echo reply, skipping stale ones
+            deadline = sent + timeout
             while True:
-                line = proc.stdout.readline()
-                if not line:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
                     break
-                line = line.decode("utf-8", errors="ignore").strip()
-                if "Default Gateway" in line:
-                    gateway = line.split(":")[-1].strip()
-                    if gateway and gateway != "None":
-                        return gateway
-        else:  # Linux/macOS
-            proc = subprocess.Popen(["ip", "route"], stdout=subprocess.PIPE)
-            while True:
-                line = proc.stdout.readline()
-                if not line:
+                sock.settimeout(remaining)
+                try:
+                    data = sock.recv(1024)
+                except socket.timeout:
+                    break
+                if _icmp_echo_reply_seq(data) == seq:
+                    rtts.append((time.perf_counter() - sent) * 1000)
                     break
-                line = line.decode("utf-8", errors="ignore").strip()
-                if line.startswith("default"):
-                    parts = line.split()
-                    idx = parts.index("via")
-                    if idx + 1 < len(parts):
-                        return parts[idx + 1]
+    
+    return rtts
+
+# The default route rarely changes; monitoring loops ask for it repeatedly
+_GATEWAY_CACHE_TTL = 5.0
+_gateway_cache = {'timestamp': float('-inf'), 'value': None, 'routes_version': -1}
+
+# On Linux the kernel announces route changes over netlink; while a watcher
+# thread listens, the cached gateway stays valid until the routes change
+_RTMGRP_IPV4_ROUTE = 0x40  # from <linux/rtnetlink.h>
+_routes = {'version': 0, 'watching': False, 'started': False, 'lock': threading.Lock()}
+
+def _watch_routes(sock: socket.socket):
+    """Bump the routes version on every IPv4 route change notification."""
+    try:
+        while True:
+            sock.recv(65536)
+            _routes['version'] += 1
+    except OSError as e:
+        logger.debug(f"Route change watcher stopped: {e}")
+    finally:
+        # Fall back to the time-based expiry
+        _routes['watching'] = False
+        sock.close()
+
+def _start_route_watch():
+    """Start the netlink route watcher once, on Linux."""
+    if not _IS_LINUX or _routes['started']:
+        return
+    with _routes['lock']:
+        if _routes['started']:
+            return
+        _routes['started'] = True
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            sock.bind((0, _RTMGRP_IPV4_ROUTE))
+        except OSError as e:
+            logger.debug(f"Cannot watch route changes, gateway cache will expire by time: {e}")
+            return
+        _routes['watching'] = True
+        threading.Thread(target=_watch_routes, args=(sock,), name="route-watch", daemon=True).start()
+
+class _MIB_IPFORWARDROW(ctypes.Structure):
+    _fields_ = [(name, wintypes.DWORD) for name in (
+        "dwForwardDest", "dwForwardMask", "dwForwardPolicy", "dwForwardNextHop",
+        "dwForwardIfIndex", "dwForwardType", "dwForwardProto", "dwForwardAge",
+        "dwForwardNextHopAS", "dwForwardMetric1", "dwForwardMetric2",
+        "dwForwardMetric3", "dwForwardMetric4", "dwForwardMetric5")]
+
+def _native_default_gateway() -> Optional[str]:
+    """Look up the default gateway through netlink (Linux) or the IP Helper API (Windows)."""
+    if _IS_WINDOWS:
+        # Best route to 0.0.0.0; the next hop is stored in network byte order
+        row = _MIB_IPFORWARDROW()
+        if ctypes.WinDLL("iphlpapi").GetBestRoute(0, 0, ctypes.byref(row)) != 0:
+            return None
+        next_hop = row.dwForwardNextHop
+        return socket.inet_ntoa(struct.pack("<L", next_hop)) if next_hop else None
+    if HAS_PYROUTE2:
+        with pyroute2.IPRoute() as ipr:
+            for route in ipr.get_default_routes(family=socket.AF_INET):
+                gateway = route.get_attr('RTA_GATEWAY')
+                if gateway:
+                    return gateway
+    return None
+
+def get_default_gateway() -> Optional[str]:
+    """Get the default gateway IP address."""
+    _start_route_watch()
+    # Read the version first: a change during the lookup forces another one
+    version = _routes['version']
+    if _routes['watching']:
+        if _gateway_cache['routes_version'] == version:
+            return _gateway_cache['value']
+    elif time.monotonic() - _gateway_cache['timestamp'] < _GATEWAY_CACHE_TTL:
+        return _gateway_cache['value']
+    gateway = _lookup_default_gateway()
+    _gateway_cache['value'] = gateway
+    _gateway_cache['timestamp'] = time.monotonic()
+    _gateway_cache['routes_version'] = version
+    return gateway
+
+def _lookup_default_gateway() -> Optional[str]:
+    """Find the default gateway, falling back to parsing ipconfig / ip route."""
+    try:
+        gateway = _native_default_gateway()
+        if gateway:
+            return gateway
+    except Exception as e:
+        logger.debug(f"Native default gateway lookup failed: {e}")
+    
+    try:
+        # Parse the whole output at once; the timeout bounds a hung command
+        if _IS_WINDOWS:
+            output = subprocess.run([_IPCONFIG_BIN], capture_output=True, timeout=2).stdout
+            match = _GW_RE_WIN.search(output)
+        else:  # Linux/macOS
+            output = subprocess.run([_IP_BIN, "route"], capture_output=True, timeout=2).stdout
+            match = _GW_RE_LINUX.search(output)
+        if match:
+            # Only the address itself is decoded
+            return match.group(1).decode("ascii", errors="ignore")
+    except subprocess.TimeoutExpired:
+        logger.warning("Default gateway lookup timed out")
     except Exception as e:
         logger.error(f"Error getting default gateway: {e}")
     return None
 
-def measure_latency(host: str = "8.8.8.8", count: int = 5) -> Dict[str, float]:
+def measure_latency(host: str = "8.8.8.8", count: int = 5) -> LatencyStats:
     """
     Measure network latency by pinging a host.
     
@@ -113,76 +328,239 @@ def measure_latency(host: str = "8.8.8.8", count: int = 5) -> Dict[str, float]:
         count: Number of pings to perform
         
     Returns:
-        Dict with min, avg, max latency in ms
+        LatencyStats with min, avg, max latency in ms
     """
-    result = {"min": 0.0, "avg": 0.0, "max": 0.0}
+    result = LatencyStats(0.0, 0.0, 0.0)
     try:
-        if platform.system() == "Windows":
+        # Native ICMP first; the ping command below is only the fallback
+        rtts = _icmp_ping(host, count)
+        if rtts is not None:
+            if not rtts:
+                logger.warning(f"No ping replies from {host}")
+            return _latency_stats(rtts)
+        
+        # ping sends one request per second; allow for that plus replies that
+        # never come, but never block the caller indefinitely
+        timeout = max(3, count * 2)
+        if _IS_WINDOWS:
             output = subprocess.check_output(
-                ["ping", "-n", str(count), host], 
+                [_PING_BIN, "-n", str(count), host], 
                 stderr=subprocess.STDOUT,
-                universal_newlines=True
+                timeout=timeout
             )
             
             # Extract latency stats from output
-            match = re.search(r"Minimum = (\d+)ms, Maximum = (\d+)ms, Average = (\d+)ms", output)
+            match = _PING_RE_WIN.search(output)
             if match:
-                result["min"] = float(match.group(1))
-                result["max"] = float(match.group(2))
-                result["avg"] = float(match.group(3))
+                result = LatencyStats(
+                    min=float(match.group(1)),
+                    avg=float(match.group(3)),
+                    max=float(match.group(2))
+                )
         else:  # Linux/macOS
             output = subprocess.check_output(
-                ["ping", "-c", str(count), host],
+                [_PING_BIN, "-c", str(count), host],
                 stderr=subprocess.STDOUT,
-                universal_newlines=True
+                timeout=timeout
             )
             
             # Extract latency stats from output
-            match = re.search(r"min/avg/max/mdev = (\d+\.\d+)/(\d+\.\d+)/(\d+\.\d+)", output)
+            match = _PING_RE_NIX.search(output)
             if match:
-                result["min"] = float(match.group(1))
-                result["avg"] = float(match.group(2))
-                result["max"] = float(match.group(3))
+                result = LatencyStats(*(float(group) for group in match.groups()))
+    except subprocess.TimeoutExpired:
+        logger.warning(f"Ping to {host} timed out")
     except Exception as e:
         logger.error(f"Error measuring latency: {e}")
     
     return result
 
-def measure_speed() -> Dict[str, float]:
+def measure_latency_many(hosts: List[str], count: int = 5) -> Dict[str, LatencyStats]:
+    """
+    Measure latency to several hosts at once.
+    
+    Each host is measured with measure_latency on its own thread; the pings
+    spend their time waiting on the network, so they overlap almost fully.
+    
+    Args:
+        hosts: Hosts to ping
+        count: Number of pings per host
+        
+    Returns:
+        Dict mapping each host to its LatencyStats
+    """
+    if not hosts:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(len(hosts), 16)) as pool:
+        results = pool.map(lambda host: measure_latency(host, count), hosts)
+        return dict(zip(hosts, results))
+
+async def measure_latency_async(hosts: List[str], count: int = 5, timeout: float = 1.0) -> Dict[str, LatencyStats]:
+    """
+    Measure latency to many hosts at once over a single ICMP socket.
+    
+    All echo requests are sent up front and replies are matched by sequence
+    number as they arrive, so the wait is one round trip rather than one per
+    host. Without ICMP sockets this falls back to measure_latency_many.
+    
+    Args:
+        hosts: Hosts to ping
+        count: Number of pings per host
+        timeout: Seconds to wait for replies after the last request is sent
+        
+    Returns:
+        Dict mapping each host to its LatencyStats
+    """
+    loop = asyncio.get_running_loop()
+    if not hosts:
+        return {}
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+    except OSError:
+        return await loop.run_in_executor(None, measure_latency_many, hosts, count)
+    
+    async def resolve(host):
+        try:
+            return await loop.run_in_executor(None, socket.gethostbyname, host)
+        except OSError:
+            logger.warning(f"Could not resolve {host}")
+            return None
+    addresses = dict(zip(hosts, await asyncio.gather(*(resolve(host) for host in hosts))))
+    
+    rtts = {host: [] for host in hosts}
+    pending = {}  # sequence number -> (host, address, send time)
+    all_answered = loop.create_future()
+    
+    def on_readable():
+        while True:
+            try:
+                data, (address, _) = sock.recvfrom(1024)
+            except OSError:  # BlockingIOError once the socket is drained
+                return
+            received = time.perf_counter()
+            seq = _icmp_echo_reply_seq(data)
+            entry = pending.get(seq)
+            if entry is not None and entry[1] == address:
+                del pending[seq]
+                rtts[entry[0]].append((received - entry[2]) * 1000)
+                if not pending and not all_answered.done():
+                    all_answered.set_result(None)
+    
+    sock.setblocking(False)
+    loop.add_reader(sock.fileno(), on_readable)
+    try:
+        seq = 0
+        for _ in range(count):
+            for host, address in addresses.items():
+                if address is None:
+                    continue
+                pending[seq] = (host, address, time.perf_counter())
+                try:
+                    sock.sendto(_icmp_echo_request(seq), (address, 0))
+                except OSError:
+                    del pending[seq]
+                seq = (seq + 1) & 0xFFFF
+        if pending:
+            try:
+                await asyncio.wait_for(all_answered, timeout)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        loop.remove_reader(sock.fileno())
+        sock.close()
+    
+    return {host: _latency_stats(times) for host, times in rtts.items()}
+
+# Bandwidth ages slowly and a speed test takes tens of seconds
+_SPEED_CACHE_TTL = 300.0
+_speed_cache = {'timestamp': float('-inf'), 'value': None, 'lock': threading.Lock()}
+
+def measure_speed() -> SpeedStats:
     """
     Measure internet speed using speedtest-cli.
     
+    Results are reused for a few minutes; concurrent callers wait for the
+    measurement already in progress instead of starting their own. The
+    result is immutable, so every caller can share the cached one.
+    
     Returns:
-        Dict with download and upload speeds in Mbps
+        SpeedStats with download and upload speeds in Mbps and ping in ms
     """
-    result = {"download": 0.0, "upload": 0.0, "ping": 0.0}
+    if time.monotonic() - _speed_cache['timestamp'] < _SPEED_CACHE_TTL:
+        return _speed_cache['value']
+    
+    with _speed_cache['lock']:
+        # Another thread may have finished a measurement while we waited
+        if time.monotonic() - _speed_cache['timestamp'] < _SPEED_CACHE_TTL:
+            return _speed_cache['value']
+        result = _run_speed_test()
+        # Keep failed measurements out of the cache so the next call retries
+        if result.download or result.upload:
+            _speed_cache['value'] = result
+            _speed_cache['timestamp'] = time.monotonic()
+    return result
+
+def _run_speed_test() -> SpeedStats:
+    """Run one speed test (speedtest-cli if available)."""
+    result = SpeedStats(0.0, 0.0, 0.0)
     try:
         if HAS_SPEEDTEST:
             st = speedtest.Speedtest()
             st.get_best_server()
             
-            # Measure download speed
-            download_speed = st.download() / 1_000_000  # Convert to Mbps
-            result["download"] = download_speed
-            
-            # Measure upload speed
-            upload_speed = st.upload() / 1_000_000  # Convert to Mbps
-            result["upload"] = upload_speed
+            # Measure download and upload speed one after the other (convert
+            # to Mbps): run together they compete for the same link, and
+            # on half-duplex WiFi both figures would come out low
+            download_mbps = st.download(threads=4) / 1_000_000
+            upload_mbps = st.upload(threads=4, pre_allocate=False) / 1_000_000
             
             # Get ping
-            result["ping"] = st.results.ping
+            result = SpeedStats(download_mbps, upload_mbps, st.results.ping)
         else:
             # Fallback to a conservative estimate
-            result["download"] = 10.0  # 10 Mbps
-            result["upload"] = 2.0     # 2 Mbps
-            result["ping"] = 50.0      # 50 ms
+            result = SpeedStats(
+                download=10.0,  # 10 Mbps
+                upload=2.0,     # 2 Mbps
+                ping=50.0       # 50 ms
+            )
     except Exception as e:
         logger.error(f"Error measuring speed: {e}")
     
     return result
 
-def get_network_interfaces() -> Dict[str, Dict[str, Any]]:
-    """Get a dictionary of network interfaces and their details."""
+# Interface details change on a scale of seconds, while the GUI and the
+# optimizer poll them repeatedly
+_IFACE_CACHE_TTL = 10.0
+_iface_cache = {'timestamp': float('-inf'), 'value': None, 'lock': threading.Lock()}
+
+def get_network_interfaces(force_refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Get a dictionary of network interfaces and their details.
+    
+    Args:
+        force_refresh: Ignore the cached result and query the system again
+        
+    Returns:
+        Dictionary mapping interface names to their details
+    """
+    if not force_refresh and time.monotonic() - _iface_cache['timestamp'] < _IFACE_CACHE_TTL:
+        return _copy_interfaces(_iface_cache['value'])
+    
+    with _iface_cache['lock']:
+        # Another thread may have refreshed the cache while we waited
+        if not force_refresh and time.monotonic() - _iface_cache['timestamp'] < _IFACE_CACHE_TTL:
+            return _copy_interfaces(_iface_cache['value'])
+        interfaces = _query_network_interfaces()
+        _iface_cache['value'] = interfaces
+        _iface_cache['timestamp'] = time.monotonic()
+    return _copy_interfaces(interfaces)
+
+def _copy_interfaces(interfaces: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Copy the cached interface details so callers cannot modify the cache."""
+    return {name: dict(details) for name, details in interfaces.items()}
+
+def _query_network_interfaces() -> Dict[str, Dict[str, Any]]:
+    """Query the system for network interfaces and their details."""
     interfaces = {}
     
     try:
@@ -205,7 +583,7 @@ def get_network_interfaces() -> Dict[str, Dict[str, Any]]:
                     interfaces[iface]['mac_address'] = addrs[netifaces.AF_LINK][0].get('addr')
                 
                 # Try to determine if wireless (approximate)
-                if 'wi' in iface.lower() or 'wl' in iface.lower():
+                if iface[:2].lower() in _WIRELESS_PREFIXES:
                     interfaces[iface]['is_wireless'] = True
                 
                 # Get interface speed
@@ -214,23 +592,20 @@ def get_network_interfaces() -> Dict[str, Dict[str, Any]]:
             # Fallback to using psutil
             net_if_addrs = psutil.net_if_addrs()
             net_if_stats = psutil.net_if_stats()
+            af_inet, af_link = socket.AF_INET, psutil.AF_LINK
             
             for iface, addrs in net_if_addrs.items():
-                ip_addr = None
-                mac_addr = None
-                
-                for addr in addrs:
-                    if addr.family == socket.AF_INET:
-                        ip_addr = addr.address
-                    elif addr.family == psutil.AF_LINK:
-                        mac_addr = addr.address
+                # One address per family (the last listed, as before)
+                by_family = {addr.family: addr.address for addr in addrs}
+                ip_addr = by_family.get(af_inet)
+                mac_addr = by_family.get(af_link)
                 
                 speed = 0
                 if iface in net_if_stats:
                     speed = net_if_stats[iface].speed
                 
                 # Simple heuristic to guess if interface is wireless
-                is_wireless = 'wi' in iface.lower() or 'wl' in iface.lower()
+                is_wireless = iface[:2].lower() in _WIRELESS_PREFIXES
                 
                 interfaces[iface] = {
                     'name': iface,
@@ -244,10 +619,19 @@ def get_network_interfaces() -> Dict[str, Dict[str, Any]]:
     
     return interfaces
 
+_active_iface_cache = {'timestamp': float('-inf'), 'value': None}
+
 def get_active_interface() -> Optional[str]:
     """Get the active network interface."""
     if HAS_NETIFACES:
-        return netifaces.gateways()['default'][netifaces.AF_INET][0]
+        if time.monotonic() - _active_iface_cache['timestamp'] < _IFACE_CACHE_TTL:
+            return _active_iface_cache['value']
+        # The default entry is (gateway address, interface name); it is
+        # missing when there is no default route
+        default = netifaces.gateways().get('default', {}).get(netifaces.AF_INET)
+        _active_iface_cache['value'] = default[1] if default else None
+        _active_iface_cache['timestamp'] = time.monotonic()
+        return _active_iface_cache['value']
     else:
         logger.warning("netifaces not available, network interface detection will be limited")
         return None
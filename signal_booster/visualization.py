@@ -3,13 +3,18 @@ Real-time visualization module for Signal Booster.
 Provides professional graphs and metrics display with enhanced visualization capabilities.
 """
 
+import os
+import matplotlib
+# The default non-intrusive mode only writes PNGs, so skip probing for an
+# interactive backend (Tk/Qt) unless the live window is wanted
+if os.environ.get('SIGNAL_BOOSTER_INTERACTIVE') != '1':
+    matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
-import pandas as pd
 import numpy as np
 from datetime import datetime
+from PIL import Image
 import threading
-import time
 from rich.console import Console
 from rich.panel import Panel
 from rich.layout import Layout
@@ -18,7 +23,11 @@ from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 import matplotlib.dates as mdates
 import matplotlib.ticker as mticker
-from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.colors import LinearSegmentedColormap, to_rgba
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+from matplotlib.layout_engine import ConstrainedLayoutEngine
 
 # Create custom colormaps for more professional visualization
 signal_colors = [(0.8, 0.1, 0.1), (0.95, 0.5, 0.0), (0.0, 0.8, 0.2)]  # Red -> Orange -> Green
@@ -26,30 +35,134 @@ signal_cmap = LinearSegmentedColormap.from_list("SignalQuality", signal_colors)
 
 console = Console()
 
+# File the non-intrusive mode keeps up to date with the latest plots
+_METRICS_IMAGE = 'signal_booster_metrics.png'
+
+# Format of the current-value annotations, for the metrics that have one
+_VALUE_FORMATS = {
+    'signal_strength': "{:.1f}%",
+    'download_speed': "{:.1f} Mbps",
+    'upload_speed': "{:.1f} Mbps",
+    'optimization_level': "{:.1f}%"
+}
+
+# Metrics stored per sample, in the order add_data_point takes them
+_METRICS = ('signal_strength', 'download_speed', 'upload_speed', 'latency', 'optimization_level')
+
+# Percentages are stored rounded to whole numbers in a byte. Speeds and
+# latency are shown with one decimal, which float16 cannot hold above 256,
+# so they are kept in float32
+_PERCENT_METRICS = ('signal_strength', 'optimization_level')
+_METRIC_DTYPES = {key: np.uint8 if key in _PERCENT_METRICS else np.float32 for key in _METRICS}
+
+def _minmax_lttb(x, y, n_out, minmax_ratio=4):
+    """Pick at most n_out points that keep the visual shape of a line (MinMaxLTTB)
+    
+    The minimum and maximum of n_out * minmax_ratio / 2 equal bins are kept as
+    candidates first, then Largest-Triangle-Three-Buckets reduces those to
+    n_out points. The first and last points are always kept.
+    
+    Args:
+        x: Increasing sample positions (numeric)
+        y: Sample values
+        n_out: Number of points to keep
+        minmax_ratio: Candidates per output point kept by the min/max pass
+        
+    Returns:
+        Sorted array of indices into x and y
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # MinMax preselection over the interior points, in equal bins
+    n_bins = max(1, min((n - 2) // 2, n_out * minmax_ratio // 2))
+    size = (n - 2) // n_bins
+    bins = y[1:1 + n_bins * size].reshape(n_bins, size)
+    starts = 1 + np.arange(n_bins) * size
+    candidates = [[0], starts + bins.argmin(axis=1), starts + bins.argmax(axis=1)]
+    tail = np.arange(1 + n_bins * size, n - 1)
+    if len(tail):
+        candidates.append([tail[y[tail].argmin()], tail[y[tail].argmax()]])
+    candidates.append([n - 1])
+    idx = np.unique(np.concatenate(candidates))
+    if len(idx) <= n_out:
+        return idx
+    
+    # LTTB: from each bucket keep the point forming the largest triangle with
+    # the previously kept point and the average of the next bucket
+    cx, cy = x[idx], y[idx]
+    m = len(idx)
+    edges = np.linspace(1, m - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, m - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = cx[hi:edges[i + 2]].mean(), cy[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = cx[m - 1], cy[m - 1]
+        area = np.abs((cx[a] - next_x) * (cy[lo:hi] - cy[a]) - (cx[a] - cx[lo:hi]) * (next_y - cy[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return idx[keep]
+
 class SignalVisualizer:
-    def __init__(self, non_intrusive=True):
+    def __init__(self, non_intrusive=True, backend='matplotlib'):
         """Initialize the signal visualizer
         
         Args:
-            non_intrusive: If True, will use a non-intrusive visualization method
+            non_intrusive: If True, will use a non-intrusive visualization method;
+                the live window also needs SIGNAL_BOOSTER_INTERACTIVE=1
+            backend: Renderer of the saved image in non-intrusive mode,
+                'matplotlib' or 'plotly' (WebGL traces exported with kaleido)
         """
-        self.data = {
-            'time': [],
-            'signal_strength': [],
-            'download_speed': [],
-            'upload_speed': [],
-            'latency': [],
-            'optimization_level': []
-        }
+        self.backend = backend
         self.max_points = 100  # Number of points to show in graphs
+        # Ring buffers holding the last max_points samples, one array per
+        # metric; _head is where the next sample goes, _count how many are held
+        self._capacity = self.max_points
+        self._tbuf = np.empty(self._capacity, dtype='datetime64[us]')
+        self._buf = {key: np.empty(self._capacity, dtype=_METRIC_DTYPES[key]) for key in _METRICS}
+        self._head = 0
+        self._count = 0
+        # Guards the ring buffers while the render thread copies them
+        self._lock = threading.Lock()
         self.fig = None
         self.axs = None
+        # Held while the figure is drawn, and by stop() to close it
+        self._figure_lock = threading.RLock()
+        self._plotly_fig = None
+        self._plotly_traces = {}
+        self._plotly_annotations = {}
+        self.lines = {}
+        self._n_out = 0
+        self._annotations = {}
+        self._decoration_heights = {}
+        # Metric -> (last annotated value, its text)
+        self._value_texts = {}
+        self._animated = []
+        self._backgrounds = {}
         self.running = False
         self.thread = None
         self.non_intrusive = non_intrusive
         # Only save new figures every 10 seconds to avoid too many files
         self.last_save_time = datetime.now()
         self.save_interval = 10  # seconds
+        # Redraw only every disp_skip data points; the live window sleeps
+        # on _redraw until then
+        self.disp_skip = max(1, int(os.environ.get('SIGNAL_BOOSTER_DISP_SKIP', '5')))
+        self._tick = 0
+        self._redraw = threading.Event()
+        # Skip a redraw when no metric moved by render_epsilon since the last
+        # one, unless render_max_age seconds have passed (the time axis moves)
+        self.render_epsilon = 0.5
+        self.render_max_age = 60  # seconds
+        self._last_rendered = None
+        self._last_render_time = datetime.now()
         
         # Set enhanced default styling for plots
         plt.rcParams['font.family'] = 'sans-serif'
@@ -67,303 +180,491 @@ class SignalVisualizer:
     def start(self):
         """Start the visualization thread"""
         self.running = True
-        if not self.non_intrusive:
-            self.thread = threading.Thread(target=self._update_visualization)
-            self.thread.daemon = True
-            self.thread.start()
+        # One figure serves every render until stop(); building it is the
+        # expensive part, redrawing it is cheap
+        with self._figure_lock:
+            if self.non_intrusive and self.backend == 'plotly':
+                if self._plotly_fig is None:
+                    self._create_plotly_figure()
+            elif self.fig is None:
+                if self.non_intrusive:
+                    self._create_figure('Signal Booster - Professional Performance Metrics', dpi=150)
+                else:
+                    self._create_figure('Signal Booster - Real-time Performance Metrics', animated=True)
+        
+        # Rendering happens on this thread in both modes, so add_data_point
+        # never waits for matplotlib
+        self.thread = threading.Thread(target=self._render_loop)
+        self.thread.daemon = True
+        self.thread.start()
         
     def stop(self):
         """Stop the visualization thread"""
         self.running = False
+        # Wake the live window so it notices at once
+        self._redraw.set()
         if self.thread:
             self.thread.join(timeout=1.0)
-            # Close matplotlib figure if it exists
+        # Close matplotlib figure if it exists; the lock waits out a render
+        # that outlived the join
+        with self._figure_lock:
             if self.fig:
                 plt.close(self.fig)
+                self.fig = None
+            self._plotly_fig = None
             
     def add_data_point(self, signal_strength, download_speed, upload_speed, latency, optimization_level):
         """Add a new data point to the visualization"""
         current_time = datetime.now()
         
-        # Add new data
-        self.data['time'].append(current_time)
-        self.data['signal_strength'].append(signal_strength)
-        self.data['download_speed'].append(download_speed)
-        self.data['upload_speed'].append(upload_speed)
-        self.data['latency'].append(latency)
-        self.data['optimization_level'].append(optimization_level)
+        # Add new data, overwriting the oldest sample once the buffers are full
+        values = (signal_strength, download_speed, upload_speed, latency, optimization_level)
+        with self._lock:
+            head = self._head
+            self._tbuf[head] = np.datetime64(current_time, 'us')
+            for key, value in zip(_METRICS, values):
+                if key in _PERCENT_METRICS:
+                    value = min(100, max(0, round(value)))
+                self._buf[key][head] = value
+            self._head = (head + 1) % self._capacity
+            self._count = min(self._count + 1, self._capacity)
         
-        # Keep only the last max_points
-        for key in self.data:
-            if len(self.data[key]) > self.max_points:
-                self.data[key] = self.data[key][-self.max_points:]
+        self._tick += 1
+        if self._tick % self.disp_skip:
+            return
         
         # In non-intrusive mode, periodically save visualizations instead of displaying in real-time
-        if self.non_intrusive and (datetime.now() - self.last_save_time).total_seconds() > self.save_interval:
-            self._save_current_visualizations()
-            self.last_save_time = datetime.now()
-                
-    def _save_current_visualizations(self):
-        """Save current visualizations to files instead of displaying them"""
-        if len(self.data['time']) < 2:
+        now = datetime.now()
+        if self.non_intrusive and (now - self.last_save_time).total_seconds() <= self.save_interval:
             return
             
-        try:
-            # Set up the plot with a modern style that works with current matplotlib
-            plt.style.use('dark_background')  # Use a built-in style instead of seaborn-darkgrid
-            
-            # Set seaborn style properties separately
-            sns.set_style("darkgrid")
-            
-            fig, axs = plt.subplots(2, 2, figsize=(15, 10))
-            fig.suptitle('Signal Booster - Professional Performance Metrics', fontsize=16, fontweight='bold')
-            
-            # Convert to pandas DataFrame for easier plotting
-            df = pd.DataFrame(self.data)
-            
-            # Signal Strength Plot - Enhanced with target zone highlighting
-            axs[0, 0].plot(df['time'], df['signal_strength'], 'g-', linewidth=2.5)
-            axs[0, 0].set_title('Signal Strength (%)', fontsize=14, fontweight='bold')
-            axs[0, 0].set_ylim(0, 100)
-            
-            # Add target line at 85% with label
-            axs[0, 0].axhline(y=85, color='r', linestyle='--', linewidth=1.5, label='Target')
-            
-            # Highlight the "good" zone above 85%
-            axs[0, 0].axhspan(85, 100, alpha=0.2, color='green', label='Optimal Zone')
-            
-            # Add a gradient background to indicate signal quality zones
-            axs[0, 0].axhspan(0, 30, alpha=0.1, color='red', label='Poor')
-            axs[0, 0].axhspan(30, 60, alpha=0.1, color='orange', label='Fair')
-            axs[0, 0].axhspan(60, 85, alpha=0.1, color='yellow', label='Good')
-            
-            # Annotate the current value
-            if len(df['signal_strength']) > 0:
-                current_signal = df['signal_strength'].iloc[-1]
-                axs[0, 0].annotate(f"{current_signal:.1f}%", 
-                                   xy=(df['time'].iloc[-1], current_signal),
-                                   xytext=(10, 0), textcoords='offset points',
-                                   fontsize=12, fontweight='bold',
-                                   color='white')
-            
-            axs[0, 0].legend(loc='lower right')
-            
-            # Speed Plot - With improved visualization
-            axs[0, 1].plot(df['time'], df['download_speed'], 'b-', label='Download', linewidth=2.5)
-            axs[0, 1].plot(df['time'], df['upload_speed'], 'r-', label='Upload', linewidth=2.5)
-            axs[0, 1].set_title('Network Speed (Mbps)', fontsize=14, fontweight='bold')
+        rendered = np.array(values, dtype=np.float32)
+        if (self._last_rendered is not None
+                and np.max(np.abs(rendered - self._last_rendered)) < self.render_epsilon
+                and (now - self._last_render_time).total_seconds() < self.render_max_age):
+            return
+        self._last_rendered = rendered
+        self._last_render_time = now
+        if self.non_intrusive:
+            self.last_save_time = now
             
-            # Annotate current speeds
-            if len(df['download_speed']) > 0:
-                axs[0, 1].annotate(f"{df['download_speed'].iloc[-1]:.1f} Mbps", 
-                                 xy=(df['time'].iloc[-1], df['download_speed'].iloc[-1]),
-                                 xytext=(10, 0), textcoords='offset points',
-                                 fontsize=10, color='blue')
-                                 
-            if len(df['upload_speed']) > 0:
-                axs[0, 1].annotate(f"{df['upload_speed'].iloc[-1]:.1f} Mbps", 
-                                 xy=(df['time'].iloc[-1], df['upload_speed'].iloc[-1]),
-                                 xytext=(10, 0), textcoords='offset points',
-                                 fontsize=10, color='red')
+        # Hand the work to the render thread; a redraw that is still pending
+        # already covers this point, so bursts collapse into one render
+        self._redraw.set()
+                
+    def _create_figure(self, title, animated=False, dpi=None):
+        """Build the figure with all of its artists, once
+        
+        Zones, threshold lines, titles and legends never change, so they are
+        drawn here a single time; updates only move the lines and annotations.
+        
+        Args:
+            title: Figure title
+            animated: If True, lines and annotations are left out of full
+                redraws so they can be blitted over cached backgrounds
+            dpi: Figure resolution (matplotlib's default if None)
+        """
+        # Set up the plot with a modern style that works with current matplotlib
+        plt.style.use('dark_background')  # Use a built-in style instead of seaborn-darkgrid
+        
+        # Set seaborn style properties separately
+        sns.set_style("darkgrid")
+        
+        self.fig, self.axs = plt.subplots(2, 2, figsize=(15, 10), dpi=dpi, constrained_layout=True)
+        self.fig.suptitle(title, fontsize=16, fontweight='bold')
+        axs = self.axs
+        
+        # Lines are downsampled to two points per pixel column of a plot
+        # (half the figure wide); more points cannot show any more detail
+        self._n_out = int(self.fig.get_size_inches()[0] * self.fig.dpi / 2) * 2
+        
+        # Signal Strength Plot - Enhanced with target zone highlighting
+        axs[0, 0].set_title('Signal Strength (%)', fontsize=14, fontweight='bold')
+        axs[0, 0].set_ylim(0, 100)
+        
+        # Add target line at 85%, highlight the "good" zone above it and
+        # add a gradient background to indicate signal quality zones
+        signal_handles = self._add_decorations(
+            axs[0, 0],
+            thresholds=[(85, 'r', 1.0, 'Target')],
+            zones=[(85, 100, 'green', 0.2, 'Optimal Zone'),
+                   (0, 30, 'red', 0.1, 'Poor'),
+                   (30, 60, 'orange', 0.1, 'Fair'),
+                   (60, 85, 'yellow', 0.1, 'Good')]
+        )
+        
+        # Speed Plot - With improved visualization
+        axs[0, 1].set_title('Network Speed (Mbps)', fontsize=14, fontweight='bold')
+        
+        # Latency Plot - With thresholds
+        axs[1, 0].set_title('Latency (ms)', fontsize=14, fontweight='bold')
+        
+        # Add threshold lines for latency quality
+        latency_handles = self._add_decorations(
+            axs[1, 0],
+            thresholds=[(20, 'green', 0.7, 'Excellent (<20ms)'),
+                        (50, 'yellow', 0.7, 'Good (<50ms)'),
+                        (100, 'red', 0.7, 'Poor (>100ms)')]
+        )
+        
+        # Optimization Level Plot - Enhanced with threshold markers
+        axs[1, 1].set_title('Optimization Level', fontsize=14, fontweight='bold')
+        axs[1, 1].set_ylim(0, 100)
+        
+        # Add target line and zone highlighting
+        optimization_handles = self._add_decorations(
+            axs[1, 1],
+            thresholds=[(85, 'r', 1.0, 'Target')],
+            zones=[(85, 100, 'green', 0.2, 'Optimal Zone')]
+        )
+        
+        # One line per metric; updates only replace their data
+        self.lines = {
+            'signal_strength': axs[0, 0].plot([], [], 'g-', linewidth=2.5)[0],
+            'download_speed': axs[0, 1].plot([], [], 'b-', label='Download', linewidth=2.5)[0],
+            'upload_speed': axs[0, 1].plot([], [], 'r-', label='Upload', linewidth=2.5)[0],
+            'latency': axs[1, 0].plot([], [], 'y-', linewidth=2.5)[0],
+            'optimization_level': axs[1, 1].plot([], [], 'm-', linewidth=2.5)[0]
+        }
+        
+        # Annotations of the current values
+        annotation_style = {'xy': (0, 0), 'xytext': (10, 0), 'textcoords': 'offset points'}
+        self._annotations = {
+            'signal_strength': axs[0, 0].annotate('', fontsize=12, fontweight='bold', color='white',
+                                                  **annotation_style),
+            'download_speed': axs[0, 1].annotate('', fontsize=10, color='blue', **annotation_style),
+            'upload_speed': axs[0, 1].annotate('', fontsize=10, color='red', **annotation_style),
+            'optimization_level': axs[1, 1].annotate('', fontsize=12, fontweight='bold', color='white',
+                                                     **annotation_style)
+        }
+        
+        axs[0, 0].legend(handles=signal_handles, loc='lower right')
+        axs[0, 1].legend()
+        axs[1, 0].legend(handles=latency_handles, loc='upper right')
+        axs[1, 1].legend(handles=optimization_handles, loc='lower right')
+        
+        # Format the x-axis to show time nicely for all plots
+        for ax in axs.flat:
+            ax.xaxis_date()
+            ax.tick_params(axis='x', colors='white', labelrotation=45)
+            ax.tick_params(axis='y', colors='white')
+            ax.grid(True, linestyle='--', alpha=0.7)
+        
+        # Constrained layout is solved on the first draw and then frozen;
+        # _relayout brings it back when the figure or the axes limits change
+        self.fig.canvas.mpl_connect('draw_event', self._freeze_layout)
+        self.fig.canvas.mpl_connect('resize_event', self._relayout)
+        
+        self._animated = list(self.lines.values()) + list(self._annotations.values())
+        self._backgrounds = {}
+        if animated:
+            for artist in self._animated:
+                artist.set_animated(True)
+            self.fig.canvas.mpl_connect('draw_event', self._on_draw)
             
-            axs[0, 1].legend()
+    def _freeze_layout(self, event):
+        """Keep the layout constrained layout just solved for the following draws"""
+        figure = event.canvas.figure
+        if isinstance(figure.get_layout_engine(), ConstrainedLayoutEngine):
+            figure.set_layout_engine('none')
             
-            # Latency Plot - With thresholds
-            axs[1, 0].plot(df['time'], df['latency'], 'y-', linewidth=2.5)
-            axs[1, 0].set_title('Latency (ms)', fontsize=14, fontweight='bold')
+    def _relayout(self, event=None):
+        """Solve the layout again on the next draw"""
+        self.fig.set_layout_engine('constrained')
+        
+    def _add_decorations(self, ax, thresholds=(), zones=()):
+        """Draw the static threshold lines and zones of a plot
+        
+        All lines go into one LineCollection and all zones into one
+        PolyCollection, instead of an artist per axhline/axhspan.
+        
+        Args:
+            ax: Axes to decorate
+            thresholds: (y, color, alpha, label) of dashed full-width lines
+            zones: (bottom, top, color, alpha, label) of full-width bands
             
-            # Add threshold lines for latency quality
-            axs[1, 0].axhline(y=20, color='green', linestyle='--', alpha=0.7, label='Excellent (<20ms)')
-            axs[1, 0].axhline(y=50, color='yellow', linestyle='--', alpha=0.7, label='Good (<50ms)')
-            axs[1, 0].axhline(y=100, color='red', linestyle='--', alpha=0.7, label='Poor (>100ms)')
+        Returns:
+            Legend handles for the decorations, lines first
+        """
+        # x spans the axes (0 to 1) whatever the time range; y is in data units
+        transform = ax.get_yaxis_transform()
+        handles = []
+        if thresholds:
+            colors = [to_rgba(color, alpha) for _, color, alpha, _ in thresholds]
+            ax.add_collection(LineCollection(
+                [[(0, y), (1, y)] for y, _, _, _ in thresholds],
+                colors=colors, linestyles='--', linewidths=1.5, transform=transform
+            ), autolim=False)
+            handles += [Line2D([], [], color=color, linestyle='--', linewidth=1.5, label=label)
+                        for color, (_, _, _, label) in zip(colors, thresholds)]
+        if zones:
+            colors = [to_rgba(color, alpha) for _, _, color, alpha, _ in zones]
+            ax.add_collection(PolyCollection(
+                [[(0, bottom), (1, bottom), (1, top), (0, top)] for bottom, top, _, _, _ in zones],
+                facecolors=colors, edgecolors=colors, transform=transform
+            ), autolim=False)
+            handles += [Patch(facecolor=color, edgecolor=color, label=label)
+                        for color, (_, _, _, _, label) in zip(colors, zones)]
             
-            axs[1, 0].legend(loc='upper right')
+        # Collections are left out of relim(), so keep their heights in
+        # view by hand, as axhline/axhspan did
+        self._decoration_heights[ax] = ([y for y, _, _, _ in thresholds] +
+                                        [y for zone in zones for y in zone[:2]])
+        return handles
+        
+    def _snapshot(self):
+        """Copy the held samples, so the producer only waits for the copy, not the render
+        
+        Returns:
+            Tuple of (sample times, dict of metric values), oldest first
+        """
+        with self._lock:
+            times = self._ordered_time().copy()
+            series = {key: self._ordered(key).copy() for key in _METRICS}
+        return times, series
+        
+    def _downsampled(self, times, values):
+        """Return the (times, values) to plot for a series, at most _n_out points"""
+        if len(values) <= self._n_out:
+            return times, values
+        # Sample positions for the downsampling, relative to the first sample
+        keep = _minmax_lttb((times - times[0]).astype(np.int64), values, self._n_out)
+        return times[keep], values[keep]
+        
+    def _value_text(self, key, value):
+        """Return the annotation text of a metric value
+        
+        Values often repeat (the optimization level settles at its target),
+        so the text of the last value is reused instead of formatted again.
+        Matplotlib re-lays out an annotation only when its text changes.
+        """
+        cached = self._value_texts.get(key)
+        if cached is None or cached[0] != value:
+            cached = self._value_texts[key] = (value, _VALUE_FORMATS[key].format(value))
+        return cached[1]
+        
+    def _update_artists(self):
+        """Move the lines and annotations to the current data
+        
+        Returns:
+            True if any axis limits changed, so the whole figure must be redrawn
+        """
+        limits = [(ax.get_xlim(), ax.get_ylim()) for ax in self.axs.flat]
+        
+        times, series = self._snapshot()
+        for key, line in self.lines.items():
+            line.set_data(*self._downsampled(times, series[key]))
             
-            # Optimization Level Plot - Enhanced with threshold markers
-            axs[1, 1].plot(df['time'], df['optimization_level'], 'm-', linewidth=2.5)
-            axs[1, 1].set_title('Optimization Level', fontsize=14, fontweight='bold')
-            axs[1, 1].set_ylim(0, 100)
+        # Annotate the current values
+        for key, annotation in self._annotations.items():
+            current = series[key][-1]
+            annotation.set_text(self._value_text(key, current))
+            annotation.xy = (times[-1], current)
             
-            # Add target line and zone highlighting
-            axs[1, 1].axhline(y=85, color='r', linestyle='--', linewidth=1.5, label='Target')
-            axs[1, 1].axhspan(85, 100, alpha=0.2, color='green', label='Optimal Zone')
+        # Only label about five times to prevent overcrowding; all plots
+        # share the time axis, so the labels are formatted once (HH:MM:SS)
+        tick_times = times[::max(1, len(times) // 5)]
+        tick_labels = [t.strftime('%H:%M:%S') for t in tick_times.astype(object)]
+        
+        for ax in self.axs.flat:
+            ax.relim()
+            if self._decoration_heights.get(ax):
+                ax.dataLim.update_from_data_y(self._decoration_heights[ax], ignore=False)
+            ax.autoscale_view()
+            ax.set_xticks(tick_times)
+            ax.set_xticklabels(tick_labels)
             
-            # Annotate current optimization level
-            if len(df['optimization_level']) > 0:
-                current_opt = df['optimization_level'].iloc[-1]
-                axs[1, 1].annotate(f"{current_opt:.1f}%", 
-                                  xy=(df['time'].iloc[-1], current_opt),
-                                  xytext=(10, 0), textcoords='offset points',
-                                  fontsize=12, fontweight='bold', 
-                                  color='white')
+        return limits != [(ax.get_xlim(), ax.get_ylim()) for ax in self.axs.flat]
+        
+    def _on_draw(self, event):
+        """Cache the axes backgrounds after a full redraw and draw the animated artists on them"""
+        canvas = self.fig.canvas
+        self._backgrounds = {ax: canvas.copy_from_bbox(ax.bbox) for ax in self.axs.flat}
+        for artist in self._animated:
+            self.fig.draw_artist(artist)
             
-            axs[1, 1].legend(loc='lower right')
+    def _blit(self):
+        """Redraw only the lines and annotations over the cached axes backgrounds"""
+        canvas = self.fig.canvas
+        for ax, background in self._backgrounds.items():
+            canvas.restore_region(background)
+        for artist in self._animated:
+            artist.axes.draw_artist(artist)
+        for ax in self._backgrounds:
+            canvas.blit(ax.bbox)
             
-            # Format the x-axis to show time nicely for all plots
-            for ax in axs.flat:
-                ax.tick_params(axis='x', colors='white', labelrotation=45)
-                ax.tick_params(axis='y', colors='white')
-                ax.grid(True, linestyle='--', alpha=0.7)
-                
-                # Format time labels to show only time (HH:MM:SS)
-                time_fmt = '%H:%M:%S'
-                if len(df['time']) > 0:
-                    time_labels = [t.strftime(time_fmt) for t in df['time']]
-                    
-                    # Only show a subset of labels to prevent overcrowding
-                    if len(time_labels) > 10:
-                        step = len(time_labels) // 5
-                        for i in range(len(time_labels)):
-                            if i % step != 0:
-                                time_labels[i] = ''
-                    
-                    # Set the x-ticks and labels
-                    if len(time_labels) > 0:
-                        ax.set_xticks(df['time'][::max(1, len(df) // 5)])
-                        ax.set_xticklabels(time_labels[::max(1, len(df) // 5)])
+    def _in_order(self, buf):
+        """Return the held samples of a ring buffer, oldest first"""
+        start = (self._head - self._count) % self._capacity
+        if start + self._count <= self._capacity:
+            return buf[start:start + self._count]
+        return np.concatenate((buf[start:], buf[:self._head]))
+        
+    def _ordered(self, key):
+        """Return the held values of a metric, oldest first"""
+        return self._in_order(self._buf[key])
+        
+    def _ordered_time(self):
+        """Return the held sample times, oldest first"""
+        return self._in_order(self._tbuf)
+        
+    def _latest(self, key):
+        """Return the newest value of a metric"""
+        return self._buf[key][(self._head - 1) % self._capacity]
+        
+    def _render_once(self):
+        """Bring the figure up to date and save or show it
+        
+        This is the single render path of both modes; the caller holds
+        _figure_lock.
+        
+        Returns:
+            False if there is no figure to render (the visualizer was stopped)
+        """
+        if self._plotly_fig is not None:
+            self._save_plotly_visualizations()
+            return True
+        if self.fig is None:
+            return False
             
-            # Adjust layout and save with higher quality
-            plt.tight_layout()
-            plt.savefig('signal_booster_metrics.png', dpi=150, bbox_inches='tight')
-            plt.close(fig)
+        changed = self._update_artists()
+        if changed:
+            # New limits can change the width of the tick labels
+            self._relayout()
+        if self.non_intrusive:
+            # Render once and write the pixels out directly: savefig with a
+            # tight bbox would render the figure twice. The rename means
+            # readers never see a half-written file
+            self.fig.canvas.draw()
+            image = Image.fromarray(np.asarray(self.fig.canvas.buffer_rgba()))
+            image.save(_METRICS_IMAGE + '.tmp', 'PNG', compress_level=1)
+            os.replace(_METRICS_IMAGE + '.tmp', _METRICS_IMAGE)
+        elif changed or not self._backgrounds:
+            # The axes moved: redraw everything once, which also caches new
+            # backgrounds for the following updates
+            self.fig.canvas.draw_idle()
+        else:
+            self._blit()
+        return True
+        
+    def _save_current_visualizations(self):
+        """Save current visualizations to files instead of displaying them"""
+        if self._count < 2:
+            return
             
-            console.print("[bold blue]Enhanced professional visualization saved to signal_booster_metrics.png[/]")
+        try:
+            with self._figure_lock:
+                saved = self._render_once()
+            if saved:
+                console.print("[bold blue]Enhanced professional visualization saved to signal_booster_metrics.png[/]")
         except Exception as e:
             console.print(f"[dim]Error saving visualization: {e}[/]")
-                
-    def _update_visualization(self):
-        """Update the visualization in real-time"""
-        if self.non_intrusive:
-            return
             
-        # Set up the plot with a modern style that works with current matplotlib
-        plt.style.use('dark_background')  # Use a built-in style instead of seaborn-darkgrid
+    def _create_plotly_figure(self):
+        """Build the Plotly version of the saved figure, once
         
-        # Set seaborn style properties separately
-        sns.set_style("darkgrid")
+        The lines are WebGL (Scattergl) traces and the zones and thresholds
+        are layout shapes made here; saves only replace trace data and
+        annotation text.
+        """
+        # Plotly is only needed by this backend
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
         
-        self.fig, self.axs = plt.subplots(2, 2, figsize=(15, 10))
-        self.fig.suptitle('Signal Booster - Real-time Performance Metrics', fontsize=16, fontweight='bold')
+        fig = make_subplots(rows=2, cols=2, subplot_titles=(
+            'Signal Strength (%)', 'Network Speed (Mbps)', 'Latency (ms)', 'Optimization Level'
+        ))
+        fig.update_layout(
+            template='plotly_dark', width=1500, height=1000,
+            title={'text': '<b>Signal Booster - Professional Performance Metrics</b>', 'x': 0.5}
+        )
+        fig.update_xaxes(tickformat='%H:%M:%S')
+        fig.update_yaxes(range=[0, 100], row=1, col=1)
+        fig.update_yaxes(range=[0, 100], row=2, col=2)
+        # Same canvas width as the matplotlib figure at 100 dpi
+        self._n_out = 1500
+        
+        # Target line and optimal zone on the signal and optimization plots
+        for row, col in ((1, 1), (2, 2)):
+            fig.add_hrect(y0=85, y1=100, fillcolor='green', opacity=0.2, line_width=0, row=row, col=col,
+                          exclude_empty_subplots=False)
+            fig.add_hline(y=85, line_dash='dash', line_color='red', row=row, col=col,
+                          exclude_empty_subplots=False)
+        # Signal quality zones
+        for y0, y1, color in ((0, 30, 'red'), (30, 60, 'orange'), (60, 85, 'yellow')):
+            fig.add_hrect(y0=y0, y1=y1, fillcolor=color, opacity=0.1, line_width=0, row=1, col=1,
+                          exclude_empty_subplots=False)
+        # Latency quality thresholds
+        for y, color in ((20, 'green'), (50, 'yellow'), (100, 'red')):
+            fig.add_hline(y=y, line_dash='dash', line_color=color, opacity=0.7, row=2, col=1,
+                          exclude_empty_subplots=False)
+            
+        # Metric -> (row, column, line color, trace name)
+        cells = {
+            'signal_strength': (1, 1, 'green', 'Signal Strength'),
+            'download_speed': (1, 2, 'blue', 'Download'),
+            'upload_speed': (1, 2, 'red', 'Upload'),
+            'latency': (2, 1, 'yellow', 'Latency'),
+            'optimization_level': (2, 2, 'magenta', 'Optimization Level')
+        }
+        self._plotly_traces = {}
+        self._plotly_annotations = {}
+        for key, (row, col, color, name) in cells.items():
+            fig.add_trace(go.Scattergl(x=[], y=[], mode='lines', name=name,
+                                       line={'color': color, 'width': 2.5}), row=row, col=col)
+            self._plotly_traces[key] = fig.data[-1]
+            if key in _VALUE_FORMATS:
+                # Speeds are labelled in their line's color, percentages in white
+                text_color = color if 'speed' in key else 'white'
+                fig.add_annotation(x=0, y=0, text='', showarrow=False, xanchor='left', xshift=10,
+                                   font={'color': text_color}, row=row, col=col)
+                self._plotly_annotations[key] = fig.layout.annotations[-1]
+        self._plotly_fig = fig
         
+    def _save_plotly_visualizations(self):
+        """Save the current visualizations with the Plotly backend"""
+        times, series = self._snapshot()
+        # One batched layout and data update instead of one per property
+        with self._plotly_fig.batch_update():
+            for key, trace in self._plotly_traces.items():
+                trace.x, trace.y = self._downsampled(times, series[key])
+            for key, annotation in self._plotly_annotations.items():
+                current = series[key][-1]
+                annotation.update(x=times[-1], y=current)
+                text = self._value_text(key, current)
+                if annotation.text != text:
+                    annotation.text = text
+        self._plotly_fig.write_image(_METRICS_IMAGE + '.tmp', format='png')
+        os.replace(_METRICS_IMAGE + '.tmp', _METRICS_IMAGE)
+        
+    def _render_loop(self):
+        """Render whenever add_data_point asks for it, until stop()"""
+        live = not self.non_intrusive
+        if live:
+            plt.show(block=False)
+            
         while self.running:
-            if len(self.data['time']) > 0:
-                # Convert to pandas DataFrame for easier plotting
-                df = pd.DataFrame(self.data)
-                
-                # Clear previous plots
-                for ax in self.axs.flat:
-                    ax.clear()
-                    ax.grid(True, linestyle='--', alpha=0.7)
-                
-                # Signal Strength Plot - Enhanced with target zone highlighting
-                self.axs[0, 0].plot(df['time'], df['signal_strength'], 'g-', linewidth=2.5)
-                self.axs[0, 0].set_title('Signal Strength (%)', fontsize=14, fontweight='bold')
-                self.axs[0, 0].set_ylim(0, 100)
-                
-                # Add target line at 85% with label
-                self.axs[0, 0].axhline(y=85, color='r', linestyle='--', linewidth=1.5, label='Target')
-                
-                # Highlight the "good" zone above 85%
-                self.axs[0, 0].axhspan(85, 100, alpha=0.2, color='green', label='Optimal Zone')
-                
-                # Add a gradient background to indicate signal quality zones
-                self.axs[0, 0].axhspan(0, 30, alpha=0.1, color='red', label='Poor')
-                self.axs[0, 0].axhspan(30, 60, alpha=0.1, color='orange', label='Fair')
-                self.axs[0, 0].axhspan(60, 85, alpha=0.1, color='yellow', label='Good')
-                
-                # Annotate the current value
-                if len(df['signal_strength']) > 0:
-                    current_signal = df['signal_strength'].iloc[-1]
-                    self.axs[0, 0].annotate(f"{current_signal:.1f}%", 
-                                       xy=(df['time'].iloc[-1], current_signal),
-                                       xytext=(10, 0), textcoords='offset points',
-                                       fontsize=12, fontweight='bold',
-                                       color='white')
-                
-                self.axs[0, 0].legend(loc='lower right')
-                
-                # Speed Plot - With improved visualization
-                self.axs[0, 1].plot(df['time'], df['download_speed'], 'b-', label='Download', linewidth=2.5)
-                self.axs[0, 1].plot(df['time'], df['upload_speed'], 'r-', label='Upload', linewidth=2.5)
-                self.axs[0, 1].set_title('Network Speed (Mbps)', fontsize=14, fontweight='bold')
-                
-                # Annotate current speeds
-                if len(df['download_speed']) > 0:
-                    self.axs[0, 1].annotate(f"{df['download_speed'].iloc[-1]:.1f} Mbps", 
-                                     xy=(df['time'].iloc[-1], df['download_speed'].iloc[-1]),
-                                     xytext=(10, 0), textcoords='offset points',
-                                     fontsize=10, color='blue')
-                                     
-                if len(df['upload_speed']) > 0:
-                    self.axs[0, 1].annotate(f"{df['upload_speed'].iloc[-1]:.1f} Mbps", 
-                                     xy=(df['time'].iloc[-1], df['upload_speed'].iloc[-1]),
-                                     xytext=(10, 0), textcoords='offset points',
-                                     fontsize=10, color='red')
-                
-                self.axs[0, 1].legend()
-                
-                # Latency Plot - With thresholds
-                self.axs[1, 0].plot(df['time'], df['latency'], 'y-', linewidth=2.5)
-                self.axs[1, 0].set_title('Latency (ms)', fontsize=14, fontweight='bold')
-                
-                # Add threshold lines for latency quality
-                self.axs[1, 0].axhline(y=20, color='green', linestyle='--', alpha=0.7, label='Excellent (<20ms)')
-                self.axs[1, 0].axhline(y=50, color='yellow', linestyle='--', alpha=0.7, label='Good (<50ms)')
-                self.axs[1, 0].axhline(y=100, color='red', linestyle='--', alpha=0.7, label='Poor (>100ms)')
-                
-                self.axs[1, 0].legend(loc='upper right')
-                
-                # Optimization Level Plot - Enhanced with threshold markers
-                self.axs[1, 1].plot(df['time'], df['optimization_level'], 'm-', linewidth=2.5)
-                self.axs[1, 1].set_title('Optimization Level', fontsize=14, fontweight='bold')
-                self.axs[1, 1].set_ylim(0, 100)
-                
-                # Add target line and zone highlighting
-                self.axs[1, 1].axhline(y=85, color='r', linestyle='--', linewidth=1.5, label='Target')
-                self.axs[1, 1].axhspan(85, 100, alpha=0.2, color='green', label='Optimal Zone')
-                
-                # Annotate current optimization level
-                if len(df['optimization_level']) > 0:
-                    current_opt = df['optimization_level'].iloc[-1]
-                    self.axs[1, 1].annotate(f"{current_opt:.1f}%", 
-                                      xy=(df['time'].iloc[-1], current_opt),
-                                      xytext=(10, 0), textcoords='offset points',
-                                      fontsize=12, fontweight='bold', 
-                                      color='white')
-                
-                self.axs[1, 1].legend(loc='lower right')
-                
-                # Format the x-axis to show time nicely for all plots
-                for ax in self.axs.flat:
-                    ax.tick_params(axis='x', colors='white', labelrotation=45)
-                    ax.tick_params(axis='y', colors='white')
+            # Wait for add_data_point to ask for a redraw; the live window
+            # stays responsive meanwhile
+            redraw = self._redraw.wait(timeout=1.0)
+            if not self.running:
+                break
+            if redraw:
+                self._redraw.clear()
+                if not live:
+                    self._save_current_visualizations()
+                    continue
                     
-                    # Format time labels to show only time (HH:MM:SS)
-                    time_fmt = '%H:%M:%S'
-                    if len(df['time']) > 0:
-                        time_labels = [t.strftime(time_fmt) for t in df['time']]
-                        
-                        # Only show a subset of labels to prevent overcrowding
-                        if len(time_labels) > 10:
-                            step = len(time_labels) // 5
-                            for i in range(len(time_labels)):
-                                if i % step != 0:
-                                    time_labels[i] = ''
-                        
-                        # Set the x-ticks and labels
-                        if len(time_labels) > 0:
-                            ax.set_xticks(df['time'][::max(1, len(df) // 5)])
-                            ax.set_xticklabels(time_labels[::max(1, len(df) // 5)])
-                
-                # Adjust layout and draw
-                plt.tight_layout()
-                plt.pause(0.1)
+            with self._figure_lock:
+                if self.fig is None:
+                    break
+                if redraw:
+                    self._render_once()
+                self.fig.canvas.flush_events()
                 
-            time.sleep(1)
-            
     def display_metrics(self):
         """Display current metrics in a simple format"""
-        if len(self.data['time']) == 0:
+        if self._count == 0:
             return
          
         # In non-intrusive mode, we don't display rich tables to avoid cluttering the terminal
@@ -372,11 +673,11 @@ class SignalVisualizer:
             
         # For rich table display
         current = {
-            'Signal Strength': f"{self.data['signal_strength'][-1]:.1f}%",
-            'Download Speed': f"{self.data['download_speed'][-1]:.1f} Mbps",
-            'Upload Speed': f"{self.data['upload_speed'][-1]:.1f} Mbps",
-            'Latency': f"{self.data['latency'][-1]:.1f} ms",
-            'Optimization Level': f"{self.data['optimization_level'][-1]:.1f}%"
+            'Signal Strength': f"{self._latest('signal_strength'):.1f}%",
+            'Download Speed': f"{self._latest('download_speed'):.1f} Mbps",
+            'Upload Speed': f"{self._latest('upload_speed'):.1f} Mbps",
+            'Latency': f"{self._latest('latency'):.1f} ms",
+            'Optimization Level': f"{self._latest('optimization_level'):.1f}%"
         }
         
         table = Table(title="Current Performance Metrics")
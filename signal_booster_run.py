@@ -8,7 +8,11 @@ import os
 import sys
 import logging
 import traceback
+import tempfile
+import subprocess
+import importlib.util
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(
@@ -21,36 +25,50 @@ logging.basicConfig(
 )
 logger = logging.getLogger("SignalBoosterLauncher")
 
+def _download(requirement, cache_dir):
+    """Fetch one package (without its dependencies) into cache_dir."""
+    cmd = [sys.executable, "-m", "pip", "download", "--no-deps", "-d", cache_dir, requirement]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        # Not fatal: the install below downloads whatever is not cached
+        logger.debug(f"Could not prefetch {requirement}: {result.stderr}")
+
 def check_and_install_dependencies():
     """Check and install required dependencies."""
     try:
-        # Basic dependencies
+        # Basic dependencies, with the module each one provides
         dependencies = [
-            "customtkinter>=5.2.0",
-            "matplotlib>=3.7.0",
-            "pandas>=2.0.0",
-            "pillow>=9.5.0",
-            "plotly>=5.14.0",
-            "kaleido>=0.2.1",
-            "darkdetect>=0.8.0"
+            ("customtkinter>=5.2.0", "customtkinter"),
+            ("matplotlib>=3.7.0", "matplotlib"),
+            ("pandas>=2.0.0", "pandas"),
+            ("pillow>=9.5.0", "PIL"),
+            ("plotly>=5.14.0", "plotly"),
+            ("kaleido>=0.2.1", "kaleido"),
+            ("darkdetect>=0.8.0", "darkdetect")
         ]
         
-        # Try importing essential modules
-        try:
-            import customtkinter
-            import matplotlib
-            import pandas
+        # Look the modules up without importing them; importing matplotlib
+        # and pandas just to see that they exist is a large part of startup
+        missing = [requirement for requirement, module in dependencies
+                   if importlib.util.find_spec(module) is None]
+        if not missing:
             logger.info("Basic dependencies are already installed")
-        except ImportError as e:
-            logger.warning(f"Missing dependency: {e}")
+        else:
+            logger.warning(f"Missing dependencies: {', '.join(missing)}")
             logger.info("Installing required dependencies...")
             
-            # Install dependencies
-            import subprocess
-            cmd = [sys.executable, "-m", "pip", "install"] + dependencies
-            logger.debug(f"Running command: {' '.join(cmd)}")
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # Install only the missing dependencies. Their packages are
+            # downloaded in parallel first, then one install resolves them
+            # from the cache and fetches their own dependencies as usual
+            with tempfile.TemporaryDirectory() as cache_dir:
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    for requirement in missing:
+                        pool.submit(_download, requirement, cache_dir)
+                        
+                cmd = [sys.executable, "-m", "pip", "install", "--find-links", cache_dir] + missing
+                logger.debug(f"Running command: {' '.join(cmd)}")
+                
+                result = subprocess.run(cmd, capture_output=True, text=True)
             if result.returncode != 0:
                 logger.error(f"Failed to install dependencies: {result.stderr}")
                 return False